@@ -1,11 +1,25 @@
+import asyncio
+from typing import List, Optional, Tuple
+
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import redirect, render
+from django.utils.timezone import now
+
+from booking.async_helpers import aread, arender, arequest_user
+from booking.models import Booking
+from booking.pagination import InvalidCursor, keyset_paginate
 
 from .forms import CustomPasswordChangeForm, LoginForm, ProfileUpdateForm, RegisterForm
 
+PROFILE_PAGE_SIZE = 10
+# Сортування історії: найближчі майбутні першими, найсвіжіші минулі першими
+UPCOMING_ORDERING = ['start_time', 'id']
+PAST_ORDERING = ['-start_time', '-id']
+
 
 def login_view(request: HttpRequest) -> HttpResponse:
     """
@@ -70,22 +84,84 @@ def logout_view(request: HttpRequest) -> HttpResponse:
     return redirect('booking:index')
 
 
+def booking_page(
+    request: HttpRequest, bookings: QuerySet, ordering: List[str], param: str
+) -> Tuple[List[Booking], Optional[str]]:
+    """
+    Повертає сторінку бронювань разом з локаціями та курсор наступної.
+
+    Args:
+        request (HttpRequest): Запит.
+        bookings (QuerySet): Бронювання користувача.
+        ordering (List[str]): Поля сортування.
+        param (str): Параметр запиту з курсором сторінки.
+
+    Raises:
+        InvalidCursor: Якщо курсор неможливо декодувати.
+
+    Returns:
+        Tuple[List[Booking], Optional[str]]: Бронювання та посилання на
+            наступну сторінку.
+    """
+    page, cursor = keyset_paginate(
+        bookings.select_related('location'),
+        ordering,
+        request.GET.get(param),
+        PROFILE_PAGE_SIZE,
+    )
+    if cursor is None:
+        return page, None
+
+    params = request.GET.copy()
+    params[param] = cursor
+    return page, f'?{params.urlencode()}'
+
+
 @login_required
-def profile_view(request: HttpRequest) -> HttpResponse:
+async def profile_view(request: HttpRequest) -> HttpResponse:
     """
     Відображає сторінку профілю користувача.
 
+    Майбутні та минулі бронювання виводяться окремими сторінками з
+    власними курсорами, тож кількість запитів не залежить від історії.
+    Обидві сторінки завантажуються одночасно.
+
     Args:
         request (HttpRequest): Запит.
 
     Returns:
         HttpResponse: Відповідь сервера.
     """
-    user = request.user
-    bookings = user.bookings.all()
+    user = await arequest_user(request)
+    current_time = now()
+    try:
+        (upcoming, upcoming_url), (past, past_url) = await asyncio.gather(
+            aread(booking_page)(
+                request,
+                user.bookings.filter(end_time__gte=current_time),
+                UPCOMING_ORDERING,
+                'upcoming',
+            ),
+            aread(booking_page)(
+                request,
+                user.bookings.filter(end_time__lt=current_time),
+                PAST_ORDERING,
+                'past',
+            ),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Некоректний курсор.')
 
-    return render(
-        request, 'accounts/profile.html', {'user': user, 'bookings': bookings}
+    return await arender(
+        request,
+        'accounts/profile.html',
+        {
+            'user': user,
+            'upcoming_bookings': upcoming,
+            'upcoming_next_url': upcoming_url,
+            'past_bookings': past,
+            'past_next_url': past_url,
+        },
     )
 
 
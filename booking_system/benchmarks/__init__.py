@@ -0,0 +1,12 @@
+"""
+Бенчмарки застосунку.
+
+Кожен модуль запускається з каталогу `booking_system`, наприклад:
+`python -m benchmarks.search --locations 100000`. Дані створюються в
+тимчасовій тестовій базі даних, робоча база не змінюється.
+
+Загальний набір сторінок запускається командою
+`python -m benchmarks.views --scale medium --output results.json`, а з
+`--baseline previous.json` порівнюється з попереднім запуском і завершується
+з кодом 1, якщо знайдено погіршення.
+"""
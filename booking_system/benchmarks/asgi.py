@@ -0,0 +1,203 @@
+"""Пропускна здатність сторінок під WSGI та ASGI за великої кількості запитів."""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.data import SCALES, seed
+from benchmarks.utils import benchmark_database, setup_django, summarize
+
+
+def wsgi_request(app: Callable, path: str, cookie: str) -> float:
+    """
+    Виконує один запит до WSGI-застосунку.
+
+    Args:
+        app (Callable): WSGI-застосунок.
+        path (str): Шлях сторінки.
+        cookie (str): Заголовок Cookie.
+
+    Raises:
+        RuntimeError: Якщо сторінка повернула код, відмінний від 200.
+
+    Returns:
+        float: Тривалість запиту в мс.
+    """
+    started = time.perf_counter()
+    environ = {'PATH_INFO': path, 'SERVER_NAME': 'testserver', 'HTTP_COOKIE': cookie}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = app(environ, lambda status, headers: statuses.append(status))
+    try:
+        b''.join(body)
+    finally:
+        body.close()
+    if not statuses[0].startswith('200'):
+        raise RuntimeError(f'Неочікуваний код відповіді {statuses[0]}')
+    return (time.perf_counter() - started) * 1000
+
+
+async def asgi_request(app: Callable, path: str, cookie: str) -> float:
+    """
+    Виконує один запит до ASGI-застосунку.
+
+    Args:
+        app (Callable): ASGI-застосунок.
+        path (str): Шлях сторінки.
+        cookie (str): Заголовок Cookie.
+
+    Raises:
+        RuntimeError: Якщо сторінка повернула код, відмінний від 200.
+
+    Returns:
+        float: Тривалість запиту в мс.
+    """
+    started = time.perf_counter()
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages: List[Dict] = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    finished = asyncio.Event()
+
+    async def receive() -> Dict:
+        if requests:
+            return requests.pop()
+        # Клієнт не від'єднується, доки не отримає відповідь
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Dict) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    finished.set()
+    status = messages[0]['status']
+    if status != 200:
+        raise RuntimeError(f'Неочікуваний код відповіді {status}')
+    return (time.perf_counter() - started) * 1000
+
+
+def run_wsgi(
+    app: Callable, path: str, cookie: str, concurrency: int, total: int
+) -> Tuple[List[float], float]:
+    """
+    Виконує запити з пулу потоків, як багатопотоковий WSGI-сервер.
+
+    Returns:
+        Tuple[List[float], float]: Тривалості запитів та загальний час у с.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        timings = list(
+            pool.map(lambda _: wsgi_request(app, path, cookie), range(total))
+        )
+    return timings, time.perf_counter() - started
+
+
+def run_asgi(
+    app: Callable, path: str, cookie: str, concurrency: int, total: int
+) -> Tuple[List[float], float]:
+    """
+    Виконує запити в одному циклі подій, як ASGI-сервер.
+
+    Returns:
+        Tuple[List[float], float]: Тривалості запитів та загальний час у с.
+    """
+
+    async def main() -> List[float]:
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited() -> float:
+            async with limit:
+                return await asgi_request(app, path, cookie)
+
+        return await asyncio.gather(*(limited() for _ in range(total)))
+
+    started = time.perf_counter()
+    timings = asyncio.run(main())
+    return timings, time.perf_counter() - started
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.test import Client
+    from django.urls import reverse
+
+    from booking.models import Location
+
+    with benchmark_database():
+        dataset = seed(args.scale)
+
+        client = Client()
+        client.force_login(User.objects.order_by('pk').first())
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.session.session_key}'
+        location_id = Location.objects.order_by('-rating', 'pk').values_list(
+            'pk', flat=True
+        )[0]
+        pages = {
+            'index': reverse('booking:index'),
+            'location_detail': reverse('booking:location_detail', args=[location_id]),
+            'profile': reverse('accounts:profile'),
+        }
+        servers = {
+            'wsgi': (get_wsgi_application(), run_wsgi),
+            'asgi': (get_asgi_application(), run_asgi),
+        }
+
+        results = {}
+        for page, path in pages.items():
+            results[page] = {}
+            for server, (app, run) in servers.items():
+                run(app, path, cookie, args.concurrency, args.concurrency)  # Прогрів
+                timings, elapsed = run(
+                    app, path, cookie, args.concurrency, args.requests
+                )
+                results[page][server] = {
+                    **summarize(timings),
+                    'requests_per_s': round(args.requests / elapsed, 1),
+                }
+
+    print(
+        json.dumps(
+            {
+                'scale': args.scale,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'dataset': dataset,
+                'results': results,
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
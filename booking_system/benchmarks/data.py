@@ -0,0 +1,211 @@
+"""Детермінований генератор даних для бенчмарків різного масштабу."""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator
+
+# Масштаби наборів даних: однаковий масштаб і зерно дають однакові дані
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {
+        'users': 200,
+        'locations': 1_000,
+        'bookings': 1_000,
+        'reactions': 10_000,
+        'reviews': 2_000,
+        'favourites': 1_000,
+    },
+    'medium': {
+        'users': 2_000,
+        'locations': 10_000,
+        'bookings': 100_000,
+        'reactions': 100_000,
+        'reviews': 20_000,
+        'favourites': 10_000,
+    },
+    'large': {
+        'users': 2_000,
+        'locations': 10_000,
+        'bookings': 1_000_000,
+        'reactions': 100_000,
+        'reviews': 20_000,
+        'favourites': 10_000,
+    },
+}
+BATCH_SIZE = 5000
+# Дані прив'язані до фіксованої дати, а не до поточного часу
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+WORDS = (
+    'затишний будинок квартира озеро море гори ліс центр парк річка вид тераса '
+    'басейн сад студія котедж вілла хата апартаменти лофт садиба'
+).split()
+CITIES = (
+    ('Київ', 'Київська'),
+    ('Львів', 'Львівська'),
+    ('Одеса', 'Одеська'),
+    ('Харків', 'Харківська'),
+    ('Дніпро', 'Дніпропетровська'),
+    ('Ужгород', 'Закарпатська'),
+    ('Чернівці', 'Чернівецька'),
+)
+
+
+def bulk_insert(model, objects: Iterable, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Зберігає об'єкти пакетами, не тримаючи їх усіх у пам'яті.
+
+    Args:
+        model: Модель Django.
+        objects (Iterable): Об'єкти для збереження.
+        batch_size (int): Розмір пакета.
+
+    Returns:
+        int: Кількість збережених об'єктів.
+    """
+    objects = iter(objects)
+    total = 0
+    while batch := list(islice(objects, batch_size)):
+        model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def distinct_pairs(
+    rng: random.Random, users: int, locations: int, count: int
+) -> Iterator[tuple]:
+    """
+    Генерує унікальні пари (користувач, локація).
+
+    Args:
+        rng (random.Random): Генератор випадкових чисел.
+        users (int): Кількість користувачів.
+        locations (int): Кількість локацій.
+        count (int): Кількість пар.
+
+    Returns:
+        Iterator[tuple]: Порядкові номери користувача та локації.
+    """
+    per_user, extra = divmod(count, users)
+    for user in range(users):
+        size = min(per_user + (user < extra), locations)
+        for location in rng.sample(range(locations), size):
+            yield user, location
+
+
+def seed(scale: str, seed_value: int = 42) -> Dict[str, float]:
+    """
+    Заповнює базу даних детермінованим набором даних.
+
+    Args:
+        scale (str): Назва масштабу з `SCALES`.
+        seed_value (int): Зерно генератора випадкових чисел.
+
+    Returns:
+        Dict[str, float]: Кількість записів кожного типу та час генерації.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+
+    from booking.availability import availability
+    from booking.facets import invalidate_facets
+    from booking.models import Booking, Favourite, Location, Reaction, Review
+
+    sizes = SCALES[scale]
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+
+    password = make_password('benchmark')
+    bulk_insert(
+        User,
+        (
+            User(username=f'user{number}', password=password)
+            for number in range(sizes['users'])
+        ),
+    )
+    user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+
+    def location(number: int) -> Location:
+        city, region = rng.choice(CITIES)
+        name = ' '.join(rng.choices(WORDS, k=2)).capitalize()
+        return Location(
+            name=f'{name} {number}',
+            country='Україна',
+            city=city,
+            region=region,
+            street=f'Вулиця {number}',
+            amount=rng.randint(1, 10),
+            description=' '.join(rng.choices(WORDS, k=30)),
+            photo=f'https://example.com/photos/{number}.jpg',
+            price_per_night=rng.randint(300, 5000),
+        )
+
+    bulk_insert(Location, (location(number) for number in range(sizes['locations'])))
+    location_ids = list(Location.objects.order_by('pk').values_list('pk', flat=True))
+    prices = dict(Location.objects.values_list('pk', 'price_per_night'))
+
+    def bookings() -> Iterator[Booking]:
+        # Бронювання кожної локації йдуть одне за одним без перетинів
+        per_location, extra = divmod(sizes['bookings'], len(location_ids))
+        for index, location_id in enumerate(location_ids):
+            start = EPOCH + timedelta(days=rng.randint(0, 30))
+            for _ in range(per_location + (index < extra)):
+                length = timedelta(days=rng.randint(1, 7))
+                yield Booking(
+                    user_id=rng.choice(user_ids),
+                    location_id=location_id,
+                    start_time=start,
+                    end_time=start + length,
+                    confirmed=rng.random() < 0.9,
+                    nightly_rate=prices[location_id],
+                    nights=length.days,
+                    price_total=prices[location_id] * length.days,
+                )
+                start += length + timedelta(days=rng.randint(0, 3))
+
+    bulk_insert(Booking, bookings())
+    bulk_insert(
+        Reaction,
+        (
+            Reaction(
+                user_id=user_ids[user],
+                location_id=location_ids[location],
+                reaction_type='like' if rng.random() < 0.7 else 'dislike',
+            )
+            for user, location in distinct_pairs(
+                rng, len(user_ids), len(location_ids), sizes['reactions']
+            )
+        ),
+    )
+    bulk_insert(
+        Review,
+        (
+            Review(
+                user_id=user_ids[user],
+                location_id=location_ids[location],
+                rating=rng.randint(1, 5),
+                comment=' '.join(rng.choices(WORDS, k=12)),
+            )
+            for user, location in distinct_pairs(
+                rng, len(user_ids), len(location_ids), sizes['reviews']
+            )
+        ),
+    )
+    bulk_insert(
+        Favourite,
+        (
+            Favourite(user_id=user_ids[user], location_id=location_ids[location])
+            for user, location in distinct_pairs(
+                rng, len(user_ids), len(location_ids), sizes['favourites']
+            )
+        ),
+    )
+
+    # bulk_create оминає сигнали, тому агрегати й кеші оновлюються окремо
+    Location.objects.rebuild_ratings()
+    Location.objects.rebuild_reactions()
+    availability.invalidate()
+    invalidate_facets()
+
+    return {**sizes, 'seed_seconds': round(time.perf_counter() - started, 3)}
@@ -0,0 +1,85 @@
+"""Швидкість підрахунку фасетів за індексом фасетів у пам'яті."""
+
+import argparse
+import json
+
+from benchmarks.utils import benchmark_database, measure, setup_django
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+
+    from benchmarks.search import seed
+    from booking.facets import (
+        facet_counts,
+        facet_index,
+        facet_key,
+        filter_by_facets,
+        invalidate_facets,
+    )
+    from booking.models import Location
+
+    with benchmark_database():
+        seed(args.locations)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        catalogue = Location.objects.all()
+        changed = catalogue.first()
+        # Кожна десята локація зайнята на обрані дати
+        booked = frozenset(
+            Location.objects.filter(
+                pk__in=range(1, args.locations + 1, 10)
+            ).values_list('pk', flat=True)
+        )
+        several = {
+            'city': ['Львів', 'Одеса'],
+            'price': ['500-1000'],
+            'capacity': ['3-4'],
+        }
+        results = {
+            # Побудова індексу одним запитом після зміни каталогу
+            'index_build': measure(
+                lambda: (invalidate_facets(), facet_index.rows()), args.repeat
+            ),
+            # Збереження однієї локації переносить її між групами без перебудови
+            'single_change': measure(
+                lambda: (
+                    facet_index.apply(changed.pk, facet_key(changed)),
+                    facet_index.rows(),
+                ),
+                args.repeat,
+            ),
+            'catalogue': measure(lambda: facet_counts({}), args.repeat),
+            'catalogue_city': measure(
+                lambda: facet_counts({'city': ['Львів']}), args.repeat
+            ),
+            'catalogue_several': measure(lambda: facet_counts(several), args.repeat),
+            # Ідентифікатори пошуку читаються під час першого виміру
+            'search': measure(lambda: facet_counts({}, 'озеро'), args.repeat),
+            'dates': measure(lambda: facet_counts({}, excluded=booked), args.repeat),
+            'search_dates_several': measure(
+                lambda: facet_counts(several, 'озеро', booked), args.repeat
+            ),
+            'page_several': measure(
+                lambda: list(
+                    filter_by_facets(catalogue, several).order_by(
+                        'price_per_night', 'id'
+                    )[:24]
+                ),
+                args.repeat,
+            ),
+        }
+
+    print(json.dumps({'locations': args.locations, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
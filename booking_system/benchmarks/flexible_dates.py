@@ -0,0 +1,139 @@
+"""Пошук найближчих вільних проміжків на щільному календарі бронювань."""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from benchmarks.utils import benchmark_database, measure, setup_django
+
+
+def seed(locations: int, days: int, occupancy: float) -> List[int]:
+    """
+    Створює локації з підтвердженими бронюваннями впритул одне до одного.
+
+    Args:
+        locations (int): Кількість локацій.
+        days (int): Скільки днів від сьогодні заповнювати.
+        occupancy (float): Частка зайнятих днів.
+
+    Returns:
+        List[int]: Ідентифікатори локацій.
+    """
+    from django.contrib.auth.models import User
+    from django.utils.timezone import localdate, make_aware
+
+    from booking.models import Booking, Location
+
+    rng = random.Random(42)
+    user = User.objects.create_user('benchmark')
+    created = Location.objects.bulk_create(
+        Location(
+            name=f'Локація {number}',
+            country='Україна',
+            city='Київ',
+            region='Київська',
+            street=f'Вулиця {number}',
+            amount=2,
+            description='Опис',
+            photo='https://example.com/photo.jpg',
+            price_per_night=1000,
+        )
+        for number in range(locations)
+    )
+
+    today = make_aware(datetime.combine(localdate(), datetime.min.time()))
+    bookings = []
+    for location in created:
+        day = 0
+        while day < days:
+            length = rng.randint(1, 7)
+            if rng.random() < occupancy:
+                bookings.append(
+                    Booking(
+                        user=user,
+                        location=location,
+                        start_time=today + timedelta(days=day),
+                        end_time=today + timedelta(days=day + length),
+                        confirmed=True,
+                    )
+                )
+            day += length
+    Booking.objects.bulk_create(bookings, batch_size=5000)
+    return [location.pk for location in created]
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--occupancy', type=float, default=0.9)
+    parser.add_argument('--nights', type=int, default=3)
+    parser.add_argument('--page-size', type=int, default=24)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils.timezone import localdate, make_aware
+
+    from booking.availability import FLEXIBLE_SEARCH_DAYS, availability, free_windows
+
+    with benchmark_database():
+        location_ids = seed(args.locations, args.days, args.occupancy)
+        page = location_ids[: args.page_size]
+        target = make_aware(
+            datetime.combine(localdate() + timedelta(days=30), datetime.min.time())
+        )
+        length = timedelta(days=args.nights)
+
+        def day_by_day() -> dict:
+            # Те, що робить користувач: перевіряє дати одну за одною
+            windows = {}
+            for location_id in page:
+                windows[location_id] = []
+                for shift in range(FLEXIBLE_SEARCH_DAYS + 1):
+                    for start in {
+                        target + timedelta(days=shift),
+                        target - timedelta(days=shift),
+                    }:
+                        if availability.is_free(
+                            location_id, start, start + length, strict=True
+                        ):
+                            windows[location_id].append(start)
+                    if len(windows[location_id]) >= 3:
+                        break
+            return windows
+
+        results = {}
+        for name, func in (
+            ('day_by_day_page', day_by_day),
+            ('gap_finding_page', lambda: free_windows(page, target, length)),
+            ('gap_finding_all', lambda: free_windows(location_ids, target, length)),
+        ):
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            results[name] = {
+                **measure(func, args.repeat),
+                'queries': len(queries),
+            }
+
+    print(
+        json.dumps(
+            {
+                'locations': args.locations,
+                'occupancy': args.occupancy,
+                'nights': args.nights,
+                'results': results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
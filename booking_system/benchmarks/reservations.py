@@ -0,0 +1,149 @@
+"""Пропускна здатність конкурентних бронювань з підтвердженням."""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import List
+
+from benchmarks.utils import benchmark_database, setup_django, summarize
+
+
+def worker(
+    seed: int,
+    attempts: int,
+    location_ids: List[int],
+    timings: List[float],
+    outcomes: Counter,
+    lock: threading.Lock,
+) -> None:
+    """
+    Бронює та підтверджує випадкові проміжки від імені одного потоку.
+
+    Args:
+        seed (int): Зерно генератора випадкових чисел.
+        attempts (int): Кількість спроб.
+        location_ids (List[int]): Локації, за які змагаються потоки.
+        timings (List[float]): Спільний список тривалостей спроб у мс.
+        outcomes (Counter): Спільні лічильники результатів.
+        lock (threading.Lock): Блокування спільних структур.
+    """
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.utils.timezone import now
+
+    from booking.models import Booking
+    from booking.reservations import (
+        BookingConflict,
+        ReservationBusy,
+        confirm_booking,
+        reserve_booking,
+    )
+
+    rng = random.Random(seed)
+    user = User.objects.get(username='benchmark')
+    start = now() + timedelta(days=1)
+    try:
+        for _ in range(attempts):
+            offset = rng.randrange(60)
+            booking = Booking(
+                user=user,
+                location_id=rng.choice(location_ids),
+                start_time=start + timedelta(days=offset),
+                end_time=start + timedelta(days=offset + rng.randint(1, 5)),
+            )
+            started = time.perf_counter()
+            try:
+                confirm_booking(reserve_booking(booking))
+                outcome = 'confirmed'
+            except BookingConflict:
+                outcome = 'conflicts'
+            except ReservationBusy:
+                outcome = 'busy'
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                timings.append(elapsed)
+                outcomes[outcome] += 1
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=2000)
+    parser.add_argument('--locations', type=int, default=2)
+    args = parser.parse_args()
+
+    setup_django()
+    # Повтори транзакцій під блокуванням перевищують ліміти запитів
+    logging.getLogger('booking.query_budget').setLevel(logging.ERROR)
+
+    with benchmark_database():
+        from django.contrib.auth.models import User
+
+        from booking.availability import availability
+        from booking.models import Location
+
+        User.objects.create_user('benchmark')
+        Location.objects.bulk_create(
+            Location(
+                name=f'Локація {number}',
+                country='Україна',
+                city='Київ',
+                region='Київська',
+                street='Вулиця',
+                amount=2,
+                description='Опис',
+                photo='https://example.com/photo.jpg',
+                price_per_night=1000,
+            )
+            for number in range(args.locations)
+        )
+        location_ids = list(Location.objects.values_list('pk', flat=True))
+        availability.invalidate()
+
+        timings: List[float] = []
+        outcomes: Counter = Counter()
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(
+                    seed,
+                    args.attempts // args.threads,
+                    location_ids,
+                    timings,
+                    outcomes,
+                    lock,
+                ),
+            )
+            for seed in range(args.threads)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    print(
+        json.dumps(
+            {
+                'attempts_per_s': round(len(timings) / elapsed, 1),
+                'attempts': summarize(timings),
+                'outcomes': dict(outcomes),
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
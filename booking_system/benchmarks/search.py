@@ -0,0 +1,100 @@
+"""Порівняння повнотекстового пошуку з `icontains` на великій кількості локацій."""
+
+import argparse
+import json
+import random
+from typing import List
+
+from benchmarks.utils import benchmark_database, measure, setup_django
+
+WORDS = (
+    'затишний будинок квартира озеро море гори ліс центр парк річка вид тераса '
+    'басейн сад студія котедж вілла хата апартаменти лофт садиба'
+).split()
+SYLLABLES = ('ка', 'ро', 'ли', 'ве', 'ту', 'мо', 'ні', 'ла', 'сен', 'дор', 'вин', 'бук')
+CITIES = ('Київ', 'Львів', 'Одеса', 'Харків', 'Дніпро', 'Ужгород', 'Чернівці')
+
+
+def seed(count: int) -> List[str]:
+    """
+    Створює локації з випадковими назвами та описами.
+
+    Args:
+        count (int): Кількість локацій.
+
+    Returns:
+        List[str]: Словник, від найчастішого слова до найрідшого.
+    """
+    from booking.models import Location
+
+    rng = random.Random(42)
+    # Рідкісні слова роблять частоти термінів схожими на реальний текст
+    vocabulary = WORDS + [
+        ''.join(rng.choices(SYLLABLES, k=3)) + str(number) for number in range(5000)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    batch = []
+    for number in range(count):
+        batch.append(
+            Location(
+                name=' '.join(rng.choices(vocabulary, weights, k=2)).capitalize()[:50],
+                country='Україна',
+                city=rng.choice(CITIES),
+                region='Область',
+                street=f'Вулиця {number}',
+                amount=rng.randint(1, 10),
+                description=' '.join(rng.choices(vocabulary, weights, k=30)),
+                photo='https://example.com/photo.jpg',
+                price_per_night=rng.randint(300, 5000),
+            )
+        )
+        if len(batch) == 5000:
+            Location.objects.bulk_create(batch)
+            batch = []
+    Location.objects.bulk_create(batch)
+    return vocabulary
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--locations', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=24)
+    args = parser.parse_args()
+
+    setup_django()
+    from booking import search
+    from booking.models import Location
+
+    with benchmark_database():
+        vocabulary = seed(args.locations)
+        results = {}
+        rare_word = vocabulary[-1]
+        for query in ('озеро', 'вілла тераса', 'Одеса басейн', 'апарт', rare_word):
+
+            def icontains(query=query) -> list:
+                locations = Location.objects.filter(name__icontains=query)
+                return list(locations.order_by('name', 'id')[: args.page_size])
+
+            def fts(query=query) -> list:
+                locations = search.search_locations(Location.objects.all(), query)
+                return list(locations.order_by('search_rank', 'id')[: args.page_size])
+
+            results[query] = {
+                'icontains_name': measure(icontains, args.repeat),
+                'fts5': measure(fts, args.repeat),
+                'icontains_name_matches': Location.objects.filter(
+                    name__icontains=query
+                ).count(),
+                'fts5_matches': search.search_locations(
+                    Location.objects.all(), query
+                ).count(),
+            }
+
+    print(json.dumps({'locations': args.locations, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""Конкурентні записи в SQLite зі стандартним та продакшн-профілем."""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List
+
+from benchmarks.data import EPOCH
+from benchmarks.utils import benchmark_database, setup_django, summarize
+
+PROFILES = ('default', 'production')
+
+
+def configure(profile: str, path: str) -> None:
+    """
+    Налаштовує основну базу даних на файл і обраний профіль SQLite.
+
+    Args:
+        profile (str): Назва профілю.
+        path (str): Шлях до файлу тестової бази даних.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    database = settings.DATABASES['default']
+    database['TEST'] = {**database.get('TEST', {}), 'NAME': path}
+    database['OPTIONS'] = (
+        {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(settings.SQLITE_PRODUCTION_PRAGMAS),
+        }
+        if profile == 'production'
+        else {}
+    )
+    connections.close_all()
+
+
+def writer(
+    number: int,
+    operations: int,
+    location_ids: List[int],
+    timings: List[float],
+    outcomes: Dict[str, int],
+    lock: threading.Lock,
+) -> None:
+    """
+    Виконує реакції та бронювання від імені одного користувача.
+
+    Args:
+        number (int): Номер записувача.
+        operations (int): Кількість операцій.
+        location_ids (List[int]): Локації, за які змагаються записувачі.
+        timings (List[float]): Спільний список тривалостей операцій у мс.
+        outcomes (Dict[str, int]): Спільні лічильники результатів.
+        lock (threading.Lock): Блокування спільних структур.
+    """
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from booking.models import Booking
+    from booking.reservations import BookingConflict, ReservationBusy, reserve_booking
+
+    rng = random.Random(number)
+    user = User.objects.get(username=f'writer{number}')
+    client = Client()
+    client.force_login(user)
+
+    try:
+        for _ in range(operations):
+            location_id = rng.choice(location_ids)
+            started = time.perf_counter()
+            try:
+                if rng.random() < 0.7:
+                    action = rng.choice(('like', 'dislike', 'favourite'))
+                    client.post(
+                        reverse(f'booking:{action}_location', args=[location_id])
+                    )
+                else:
+                    start = EPOCH + timedelta(days=rng.randint(0, 365))
+                    reserve_booking(
+                        Booking(
+                            user=user,
+                            location_id=location_id,
+                            start_time=start,
+                            end_time=start + timedelta(days=1),
+                        )
+                    )
+                outcome = 'ok'
+            except BookingConflict:
+                outcome = 'ok'
+            except ReservationBusy:
+                outcome = 'busy'
+            except OperationalError:
+                outcome = 'locked'
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                timings.append(elapsed)
+                outcomes[outcome] += 1
+    finally:
+        connections.close_all()
+
+
+def reader(stop: threading.Event, timings: List[float], errors: List[int]) -> None:
+    """
+    Читає сторінку локацій, поки працюють записувачі.
+
+    Args:
+        stop (threading.Event): Сигнал завершення.
+        timings (List[float]): Тривалості читань у мс.
+        errors (List[int]): Читання, які не дочекалися бази даних.
+    """
+    from django.db import OperationalError, connections
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                client.get(reverse('booking:index'))
+            except OperationalError:
+                errors.append(1)
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        connections.close_all()
+
+
+def run_profile(
+    profile: str, writers: int, readers: int, operations: int, locations: int
+) -> Dict:
+    """
+    Запускає записувачів і читачів на файловій базі з обраним профілем.
+
+    Returns:
+        Dict: Пропускна здатність, затримки та результати операцій.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        configure(profile, os.path.join(directory, 'benchmark.sqlite3'))
+        with benchmark_database():
+            from django.contrib.auth.models import User
+            from django.db import connection
+
+            from booking.availability import availability
+            from booking.models import Location
+
+            User.objects.bulk_create(
+                User(username=f'writer{number}') for number in range(writers)
+            )
+            Location.objects.bulk_create(
+                Location(
+                    name=f'Локація {number}',
+                    country='Україна',
+                    city='Київ',
+                    region='Київська',
+                    street='Вулиця',
+                    amount=2,
+                    description='Опис',
+                    photo='https://example.com/photo.jpg',
+                    price_per_night=1000,
+                )
+                for number in range(locations)
+            )
+            location_ids = list(Location.objects.values_list('pk', flat=True))
+            availability.invalidate()
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            connection.close()
+
+            lock = threading.Lock()
+            write_timings: List[float] = []
+            read_timings: List[float] = []
+            read_errors: List[int] = []
+            outcomes = {'ok': 0, 'busy': 0, 'locked': 0}
+            stop = threading.Event()
+            threads = [
+                threading.Thread(
+                    target=writer,
+                    args=(
+                        number,
+                        operations,
+                        location_ids,
+                        write_timings,
+                        outcomes,
+                        lock,
+                    ),
+                )
+                for number in range(writers)
+            ]
+            reader_threads = [
+                threading.Thread(target=reader, args=(stop, read_timings, read_errors))
+                for _ in range(readers)
+            ]
+
+            started = time.perf_counter()
+            for thread in threads + reader_threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+            stop.set()
+            for thread in reader_threads:
+                thread.join()
+
+    return {
+        'journal_mode': journal_mode,
+        'writes_per_s': round(len(write_timings) / elapsed, 1),
+        'writes': summarize(write_timings),
+        'reads': summarize(read_timings) if read_timings else None,
+        'reads_count': len(read_timings),
+        'read_errors': len(read_errors),
+        'outcomes': outcomes,
+    }
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--operations', type=int, default=200)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--profile', choices=PROFILES, action='append')
+    args = parser.parse_args()
+
+    setup_django()
+    # Повтори транзакцій перевищують ліміти запитів, а помилки блокувань
+    # стандартного профілю рахуються в результатах, тож журнал лише заважає
+    logging.getLogger('booking.query_budget').setLevel(logging.ERROR)
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    results = {
+        profile: run_profile(
+            profile, args.writers, args.readers, args.operations, args.locations
+        )
+        for profile in args.profile or PROFILES
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Байти статичних файлів на перший і повторний перегляд сторінки."""
+
+import argparse
+import json
+import tempfile
+from typing import Dict, List
+
+from benchmarks.utils import measure, setup_django
+
+PROFILES = {
+    # Звичайне сховище Django: без хешів та стиснення
+    'default': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    'compressed': 'booking.static_assets.CompressedManifestStaticFilesStorage',
+}
+ACCEPT_ENCODINGS = {'identity': '', 'gzip': 'gzip', 'br': 'gzip, deflate, br'}
+PROJECT_FINDERS = ['django.contrib.staticfiles.finders.FileSystemFinder']
+APP_FINDERS = PROJECT_FINDERS + [
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder'
+]
+
+
+def run_profile(backend: str, finders: List[str], repeat: int) -> Dict:
+    """
+    Збирає статичні файли обраним сховищем і завантажує їх через middleware.
+
+    Args:
+        backend (str): Шлях до класу сховища.
+        finders (List[str]): Пошукачі статичних файлів.
+        repeat (int): Кількість повторів для вимірювання часу.
+
+    Returns:
+        Dict: Байти першого перегляду, запити повторного перегляду та час
+            видачі для кожного `Accept-Encoding`.
+    """
+    from django.conf import settings
+    from django.contrib.staticfiles.finders import get_finders
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.core.management import call_command
+    from django.test import Client, override_settings
+
+    from booking.static_assets import STATIC_COMPRESSIBLE_EXTENSIONS
+
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        override_settings(
+            # У режимі DEBUG сховище повертає назви без хешу
+            DEBUG=False,
+            STATIC_ROOT=directory,
+            STATICFILES_FINDERS=finders,
+            STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': backend}},
+        ),
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        names = sorted(
+            {name for finder in get_finders() for name, _ in finder.list([])}
+        )
+        urls = [staticfiles_storage.url(name) for name in names]
+        client = Client()
+
+        results = {}
+        for label, header in ACCEPT_ENCODINGS.items():
+
+            def page_view(header: str = header) -> List:
+                return [client.get(url, HTTP_ACCEPT_ENCODING=header) for url in urls]
+
+            responses = page_view()
+            results[label] = {
+                'first_view_bytes': sum(
+                    len(response.content) for response in responses
+                ),
+                'text_bytes': sum(
+                    len(response.content)
+                    for name, response in zip(names, responses)
+                    if name.endswith(STATIC_COMPRESSIBLE_EXTENSIONS)
+                ),
+                # Файли без `immutable` браузер перевіряє після `max-age`
+                'repeat_view_requests': sum(
+                    'immutable' not in response.get('Cache-Control', '')
+                    for response in responses
+                ),
+                'page_view': measure(page_view, repeat),
+            }
+    return {'files': len(names), 'encodings': results}
+
+
+def main() -> None:
+    """Запускає бенчмарк та виводить результати у форматі JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--profile', choices=PROFILES, action='append')
+    parser.add_argument(
+        '--apps',
+        action='store_true',
+        help='Також статичні файли застосунків (адмінка, Jet)',
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    results = {
+        profile: run_profile(
+            PROFILES[profile],
+            APP_FINDERS if args.apps else PROJECT_FINDERS,
+            args.repeat,
+        )
+        for profile in args.profile or PROFILES
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
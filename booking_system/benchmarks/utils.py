@@ -0,0 +1,69 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List
+
+import django
+
+
+def setup_django() -> None:
+    """Налаштовує Django для запуску бенчмарків поза manage.py."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'booking_system.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    django.setup()
+
+
+@contextmanager
+def benchmark_database() -> Iterator[None]:
+    """Створює тимчасову тестову базу даних на час бенчмарку."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func: Callable[[], object], repeat: int = 20) -> Dict[str, float]:
+    """
+    Вимірює час виконання функції.
+
+    Args:
+        func (Callable[[], object]): Функція для вимірювання.
+        repeat (int): Кількість повторів.
+
+    Returns:
+        Dict[str, float]: Медіана, 95-й перцентиль та середнє значення в мс.
+    """
+    func()  # Прогрів кешів
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    return summarize(timings)
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """
+    Рахує статистику за вимірюваннями.
+
+    Args:
+        timings (List[float]): Тривалості в мс.
+
+    Returns:
+        Dict[str, float]: Медіана, 95-й перцентиль та середнє значення в мс.
+    """
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        'p50_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(p95, 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+    }
@@ -0,0 +1,219 @@
+"""Навантажувальний бенчмарк основних сторінок через тестовий клієнт Django."""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.data import EPOCH, SCALES, seed
+from benchmarks.utils import benchmark_database, setup_django, summarize
+
+# Назва, функція запиту (номер повтору -> відповідь), очікувані коди відповіді
+Endpoint = Tuple[str, Callable[[int], Any], Tuple[int, ...]]
+
+
+def endpoints(client, location_id: int, page_cursor_url: str) -> List[Endpoint]:
+    """
+    Описує сценарії запитів до справжніх представлень.
+
+    Args:
+        client: Тестовий клієнт з авторизованим користувачем.
+        location_id (int): Локація для сторінок деталей та реакцій.
+        page_cursor_url (str): Посилання на другу сторінку списку.
+
+    Returns:
+        List[Endpoint]: Сценарії запитів.
+    """
+    from django.urls import reverse
+
+    index = reverse('booking:index')
+    detail = reverse('booking:location_detail', args=[location_id])
+    start = EPOCH.date() + timedelta(days=60)
+    dates = {
+        'start_date': start.isoformat(),
+        'end_date': (start + timedelta(days=3)).isoformat(),
+    }
+
+    def create_booking(number: int) -> Any:
+        # Кожен повтор бронює новий вільний проміжок у далекому майбутньому
+        day = EPOCH.replace(year=2100) + timedelta(days=number * 2)
+        return client.post(
+            reverse('booking:create_booking', args=[location_id]),
+            {
+                'start_time': day.strftime('%Y-%m-%dT%H:%M'),
+                'end_time': (day + timedelta(days=1)).strftime('%Y-%m-%dT%H:%M'),
+            },
+        )
+
+    def get(url: str, params: Optional[Dict[str, str]] = None) -> Callable[[int], Any]:
+        return lambda number: client.get(url, params or {})
+
+    return [
+        ('index_name', get(index), (200,)),
+        ('index_price', get(index, {'sort_by': 'price'}), (200,)),
+        ('index_rating', get(index, {'sort_by': 'rating'}), (200,)),
+        ('index_search', get(index, {'q': 'озеро тераса'}), (200,)),
+        ('index_dates', get(index, dates), (200,)),
+        ('index_flexible', get(index, {**dates, 'flexible': '1'}), (200,)),
+        ('load_more', get(page_cursor_url), (200,)),
+        ('location_detail', get(detail), (200,)),
+        ('profile', get(reverse('accounts:profile')), (200,)),
+        ('create_booking', create_booking, (302,)),
+        ('like', get(reverse('booking:like_location', args=[location_id])), (302,)),
+        (
+            'dislike',
+            get(reverse('booking:dislike_location', args=[location_id])),
+            (302,),
+        ),
+        (
+            'favourite',
+            get(reverse('booking:favourite_location', args=[location_id])),
+            (302,),
+        ),
+    ]
+
+
+def run_endpoint(request: Callable[[int], Any], statuses, repeat: int) -> Dict:
+    """
+    Вимірює затримку, кількість запитів до бази та пік пам'яті сценарію.
+
+    Args:
+        request (Callable[[int], Any]): Функція запиту.
+        statuses: Очікувані коди відповіді.
+        repeat (int): Кількість повторів.
+
+    Raises:
+        RuntimeError: Якщо сторінка повернула неочікуваний код.
+
+    Returns:
+        Dict: Статистика сценарію.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    number = 0
+
+    def call() -> Any:
+        nonlocal number
+        response = request(number)
+        number += 1
+        if response.status_code not in statuses:
+            raise RuntimeError(f'Неочікуваний код відповіді {response.status_code}')
+        return response
+
+    call()  # Прогрів кешів
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        call()
+
+    tracemalloc.start()
+    call()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        **summarize(timings),
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Знаходить погіршення відносно попереднього запуску.
+
+    Args:
+        results (Dict): Поточні результати.
+        baseline (Dict): Попередні результати.
+        threshold (float): Допустиме відносне зростання p95 та пам'яті.
+
+    Returns:
+        List[str]: Опис погіршень.
+    """
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: запитів {previous["queries"]} -> {current["queries"]}'
+            )
+        for metric in ('p95_ms', 'peak_memory_kb'):
+            if current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f'{name}: {metric} {previous[metric]} -> {current[metric]}'
+                )
+    return regressions
+
+
+def main() -> None:
+    """Запускає бенчмарк, записує результати в JSON та порівнює з базовими."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Файл для результатів у форматі JSON.')
+    parser.add_argument('--baseline', help='Результати попереднього запуску.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.25,
+        help="Допустиме відносне погіршення p95 та пам'яті.",
+    )
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.test import Client
+    from django.urls import reverse
+
+    from booking.models import Location
+
+    with benchmark_database():
+        dataset = seed(args.scale, args.seed)
+
+        client = Client()
+        client.force_login(User.objects.order_by('pk').first())
+        location_id = Location.objects.order_by('-rating', 'pk').values_list(
+            'pk', flat=True
+        )[0]
+        next_url = client.get(reverse('booking:index')).context['next_page_url']
+
+        results = {
+            'scale': args.scale,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'dataset': dataset,
+            'endpoints': {},
+        }
+        for name, request, statuses in endpoints(client, location_id, next_url):
+            results['endpoints'][name] = run_endpoint(request, statuses, args.repeat)
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            stream.write(output + '\n')
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as stream:
+            regressions = compare(results, json.load(stream), args.threshold)
+        for regression in regressions:
+            print(f'Погіршення: {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Advertisement, Booking, Location, Review
+from .models import Advertisement, Booking, Location, OutboxEmail, Review
 
 
 @admin.register(Location)
@@ -23,7 +23,14 @@ class LocationAdmin(admin.ModelAdmin):
 class BookingAdmin(admin.ModelAdmin):
     """Адміністраторський клас для бронювань."""
 
-    list_display = ['user', 'location', 'start_time', 'end_time', 'confirmed']
+    list_display = [
+        'user',
+        'location',
+        'start_time',
+        'end_time',
+        'confirmed',
+        'expires_at',
+    ]
     list_filter = ['confirmed', 'location']
     search_fields = ['user__username', 'location__name']
     ordering = ['start_time']
@@ -43,6 +50,22 @@ class ReviewAdmin(admin.ModelAdmin):
 class AdvertisementAdmin(admin.ModelAdmin):
     """Адміністраторський клас для реклами."""
 
-    list_display = ('title', 'is_active', 'created_at')
+    list_display = (
+        'title',
+        'is_active',
+        'weight',
+        'impressions',
+        'max_impressions',
+        'created_at',
+    )
     list_filter = ('is_active',)
     search_fields = ('title', 'description')
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Адміністраторський клас для черги листів."""
+
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from .models import Advertisement
+
+ADVERTISEMENT_VERSION_KEY = 'booking:advertisements:version'
+ADVERTISEMENT_CACHE_TTL = getattr(settings, 'ADVERTISEMENT_CACHE_TTL', 60)
+
+
+class AliasTable:
+    """Таблиця псевдонімів для зваженого вибору за O(1) (метод Вокера)."""
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        """
+        Будує таблицю за O(n).
+
+        Args:
+            weights (Sequence[float]): Додатні ваги елементів.
+        """
+        size = len(weights)
+        total = sum(weights)
+        self.probabilities = [0.0] * size
+        self.aliases = [0] * size
+
+        scaled = [weight * size / total for weight in weights]
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+
+        # Залишки мають імовірність 1 з точністю до похибки округлення
+        for index in small + large:
+            self.probabilities[index] = 1.0
+
+    def sample(self, rng: random.Random = random) -> int:
+        """
+        Повертає випадковий індекс відповідно до ваг.
+
+        Args:
+            rng (random.Random): Генератор випадкових чисел.
+
+        Returns:
+            int: Індекс елемента.
+        """
+        index = rng.randrange(len(self.probabilities))
+        if rng.random() < self.probabilities[index]:
+            return index
+        return self.aliases[index]
+
+
+class AdvertisementPool:
+    """
+    Кеш активної реклами в пам'яті процесу.
+
+    Набір реклами перечитується після закінчення TTL або коли змінюється
+    версія в кеші (після збереження чи видалення реклами). Покази
+    накопичуються в пам'яті та записуються в базу під час оновлення набору.
+    """
+
+    def __init__(self, ttl: float = ADVERTISEMENT_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._ads: List[Advertisement] = []
+        self._table: Optional[AliasTable] = None
+        self._version: Optional[int] = None
+        self._expires_at = 0.0
+        self._pending: Counter = Counter()
+
+    def invalidate(self) -> None:
+        """Позначає набір реклами застарілим у всіх процесах."""
+        try:
+            cache.incr(ADVERTISEMENT_VERSION_KEY)
+        except ValueError:
+            cache.set(ADVERTISEMENT_VERSION_KEY, 1, timeout=None)
+
+    def flush_impressions(self) -> None:
+        """Записує накопичені покази в базу даних."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+
+        for advertisement_id, count in pending.items():
+            Advertisement.objects.filter(pk=advertisement_id).update(
+                impressions=F('impressions') + count
+            )
+
+    def _refresh(self, version: Optional[int]) -> None:
+        """
+        Перечитує активну рекламу з бази даних.
+
+        Args:
+            version (Optional[int]): Поточна версія реклами в кеші.
+        """
+        self.flush_impressions()
+        ads = list(Advertisement.objects.filter(is_active=True))
+        with self._lock:
+            self._ads = ads
+            self._version = version
+            self._expires_at = time.monotonic() + self.ttl
+            self._rebuild_table()
+
+    def _rebuild_table(self) -> None:
+        """Будує таблицю вибору з реклами, яка ще не вичерпала ліміт."""
+        self._ads = [ad for ad in self._ads if not self._exhausted(ad)]
+        self._table = AliasTable([ad.weight for ad in self._ads]) if self._ads else None
+
+    def _exhausted(self, ad: Advertisement) -> bool:
+        """
+        Перевіряє, чи вичерпала реклама ліміт показів.
+
+        Args:
+            ad (Advertisement): Реклама.
+
+        Returns:
+            bool: True, якщо рекламу більше не можна показувати.
+        """
+        if ad.max_impressions is None:
+            return False
+        return ad.impressions + self._pending[ad.pk] >= ad.max_impressions
+
+    def _ensure_fresh(self) -> None:
+        """Оновлює набір реклами, якщо минув TTL або змінилася версія."""
+        version = cache.get(ADVERTISEMENT_VERSION_KEY)
+        if time.monotonic() >= self._expires_at or version != self._version:
+            self._refresh(version)
+
+    def pick_pair(
+        self, rng: random.Random = random
+    ) -> Tuple[Optional[Advertisement], Optional[Advertisement]]:
+        """
+        Обирає рекламу для лівого та правого банерів з урахуванням ваг.
+
+        Args:
+            rng (random.Random): Генератор випадкових чисел.
+
+        Returns:
+            Tuple[Optional[Advertisement], Optional[Advertisement]]: Ліва та
+                права реклама.
+        """
+        self._ensure_fresh()
+
+        with self._lock:
+            ads, table = self._ads, self._table
+            if table is None:
+                return None, None
+
+            if len(ads) == 1:
+                # Єдина реклама показується випадково зліва або справа
+                pair = (ads[0], None) if rng.random() < 0.5 else (None, ads[0])
+            else:
+                first = table.sample(rng)
+                second = table.sample(rng)
+                # Повторний вибір з тієї ж таблиці зберігає пропорції ваг
+                for _ in range(8):
+                    if second != first:
+                        break
+                    second = table.sample(rng)
+                else:
+                    second = (first + 1 + rng.randrange(len(ads) - 1)) % len(ads)
+                pair = (ads[first], ads[second])
+
+            shown = [ad for ad in pair if ad is not None]
+            for ad in shown:
+                self._pending[ad.pk] += 1
+            if any(self._exhausted(ad) for ad in shown):
+                self._rebuild_table()
+
+        return pair
+
+
+advertisement_pool = AdvertisementPool()
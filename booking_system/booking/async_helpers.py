@@ -0,0 +1,88 @@
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, TypeVar, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.db import close_old_connections
+from django.http import HttpRequest, HttpResponse
+from django.shortcuts import render
+
+T = TypeVar('T')
+
+# Незалежні читання асинхронних представлень виконуються паралельно в
+# окремих потоках, кожен зі своїм з'єднанням з базою даних. Інакше вони по
+# черзі виконуються в потоці запиту (як асинхронна ORM)
+ASYNC_PARALLEL_READS = getattr(settings, 'ASYNC_PARALLEL_READS', False)
+
+
+def aread(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Обгортає синхронне читання з бази для асинхронного представлення.
+
+    З `ASYNC_PARALLEL_READS` функція виконується в пулі потоків, тож
+    `asyncio.gather` справді виконує читання одночасно. Окреме з'єднання
+    не бачить незафіксованих змін з'єднання запиту, тому так можна
+    обгортати лише читання поза транзакцією.
+
+    Args:
+        func (Callable[..., T]): Синхронна функція, яка лише читає дані.
+
+    Returns:
+        Callable[..., Awaitable[T]]: Асинхронна функція.
+    """
+    if not ASYNC_PARALLEL_READS:
+        return sync_to_async(func)
+
+    @wraps(func)
+    def read(*args, **kwargs) -> T:
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # Потоки пулу не отримують сигналів завершення запиту, тому
+            # застарілі з'єднання закриваються тут, як після запиту
+            close_old_connections()
+
+    return sync_to_async(read, thread_sensitive=False)
+
+
+async def arequest_user(
+    request: HttpRequest,
+) -> Union[AbstractBaseUser, AnonymousUser]:
+    """
+    Завантажує користувача запиту без блокування циклу подій.
+
+    `request.auser()` і лінивий `request.user` кешують користувача окремо,
+    тому після завантаження `request.user` замінюється готовим об'єктом, і
+    шаблони та процесори контексту не повторюють запит.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        Union[AbstractBaseUser, AnonymousUser]: Користувач запиту.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def arender(
+    request: HttpRequest, template_name: str, context: Dict[str, Any]
+) -> HttpResponse:
+    """
+    Рендерить шаблон поза циклом подій.
+
+    Процесори контексту (реклама) та ліниві зв'язки моделей у шаблонах
+    звертаються до бази синхронно, тому рендеринг виконується через
+    `aread`, а всі незалежні запити представлення - до нього.
+
+    Args:
+        request (HttpRequest): Запит.
+        template_name (str): Назва шаблону.
+        context (Dict[str, Any]): Контекст шаблону.
+
+    Returns:
+        HttpResponse: Відповідь сервера.
+    """
+    return await aread(render)(request, template_name, context)
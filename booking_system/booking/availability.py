@@ -0,0 +1,528 @@
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import localtime, now
+
+from .models import Booking
+from .routers import use_primary
+
+AVAILABILITY_VERSION_KEY = 'booking:availability:version'
+# Журнал змін: під ключем версії зберігається зміна, яка її створила
+AVAILABILITY_LOG_KEY = 'booking:availability:log:{}'
+AVAILABILITY_LOG_TTL = getattr(settings, 'AVAILABILITY_LOG_TTL', 60 * 60)
+# Скільки змін з журналу застосовувати, перш ніж просто перебудувати індекс
+AVAILABILITY_LOG_MAX = getattr(settings, 'AVAILABILITY_LOG_MAX', 1000)
+# Скільки днів минулого індекс тримає в пам'яті
+AVAILABILITY_HISTORY_DAYS = 30
+# Найдовший проміжок для календаря зайнятості
+CALENDAR_MAX_DAYS = 366
+# На скільки днів від бажаної дати шукати вільні проміжки
+FLEXIBLE_SEARCH_DAYS = 30
+DAY = timedelta(days=1)
+
+
+class LocationIntervals:
+    """Відсортовані за початком підтверджені інтервали однієї локації."""
+
+    __slots__ = ('starts', 'ends', 'booking_ids', 'max_ends')
+
+    def __init__(self) -> None:
+        self.starts: List[datetime] = []
+        self.ends: List[datetime] = []
+        self.booking_ids: List[int] = []
+        # max_ends[i] - найпізніший кінець серед перших i + 1 інтервалів
+        self.max_ends: List[datetime] = []
+
+    def _rebuild_max_ends(self, position: int) -> None:
+        """
+        Перераховує префіксні максимуми кінців починаючи з позиції.
+
+        Args:
+            position (int): Індекс, з якого потрібно перерахувати максимуми.
+        """
+        del self.max_ends[position:]
+        current = self.max_ends[-1] if self.max_ends else None
+        for end in self.ends[position:]:
+            current = end if current is None or end > current else current
+            self.max_ends.append(current)
+
+    def add(self, booking_id: int, start: datetime, end: datetime) -> None:
+        """
+        Додає інтервал бронювання.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+            start (datetime): Дата початку.
+            end (datetime): Дата закінчення.
+        """
+        position = bisect_left(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.booking_ids.insert(position, booking_id)
+        self._rebuild_max_ends(position)
+
+    def remove(self, booking_id: int) -> bool:
+        """
+        Видаляє інтервал бронювання.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+
+        Returns:
+            bool: True, якщо інтервал було видалено, інакше False.
+        """
+        try:
+            position = self.booking_ids.index(booking_id)
+        except ValueError:
+            return False
+
+        del self.starts[position]
+        del self.ends[position]
+        del self.booking_ids[position]
+        self._rebuild_max_ends(position)
+        return True
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """
+        Перевіряє, чи перетинається проміжок з хоча б одним інтервалом.
+
+        Args:
+            start (datetime): Початок проміжку.
+            end (datetime): Кінець проміжку.
+
+        Returns:
+            bool: True, якщо проміжок зайнятий, інакше False.
+        """
+        # Останній інтервал, що починається раніше за кінець проміжку
+        position = bisect_left(self.starts, end) - 1
+        return position >= 0 and self.max_ends[position] > start
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class AvailabilityIndex:
+    """
+    Індекс зайнятості локацій у пам'яті процесу.
+
+    Зберігає підтверджені бронювання за останні AVAILABILITY_HISTORY_DAYS днів
+    та майбутні, тому перевірка одного проміжку для локації коштує O(log n).
+    Запити, які зачіпають старіші дати, виконуються напряму в базі даних.
+    Узгодженість між процесами забезпечується лічильником версії в кеші,
+    тому кеш має бути спільним для всіх процесів (перевірка `booking.E001`).
+    Кожна зміна записується в журнал під ключем своєї версії, і процес, що
+    відстав, застосовує пропущені зміни з журналу. Повністю індекс
+    перебудовується лише тоді, коли запису в журналі немає (масові зміни,
+    очищений кеш) або змін забагато.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._locations: Dict[int, LocationIntervals] = {}
+        self._horizon: Optional[datetime] = None
+        self._version: Optional[int] = None
+
+    def _shared_version(self) -> int:
+        """
+        Повертає спільну версію індексу з кешу.
+
+        Returns:
+            int: Поточна версія.
+        """
+        return cache.get_or_set(AVAILABILITY_VERSION_KEY, 1, timeout=None)
+
+    def _bump_shared_version(self) -> int:
+        """
+        Збільшує спільну версію індексу.
+
+        Returns:
+            int: Нова версія.
+        """
+        try:
+            return cache.incr(AVAILABILITY_VERSION_KEY)
+        except ValueError:
+            cache.set(AVAILABILITY_VERSION_KEY, 1, timeout=None)
+            return 1
+
+    def _build(self) -> None:
+        """Будує індекс одним запитом до основної бази даних."""
+        version = self._shared_version()
+        horizon = now() - timedelta(days=AVAILABILITY_HISTORY_DAYS)
+        locations: Dict[int, LocationIntervals] = {}
+        bookings = (
+            Booking.objects.filter(confirmed=True, end_time__gt=horizon)
+            .order_by('location_id', 'start_time')
+            .values_list('id', 'location_id', 'start_time', 'end_time')
+        )
+        # Версія вже збільшена після запису, репліка може ще його не мати
+        with use_primary():
+            for booking_id, location_id, start, end in bookings.iterator(
+                chunk_size=5000
+            ):
+                intervals = locations.get(location_id)
+                if intervals is None:
+                    intervals = locations[location_id] = LocationIntervals()
+                # Дані вже відсортовані, тому додавання в кінець коштує O(1)
+                intervals.starts.append(start)
+                intervals.ends.append(end)
+                intervals.booking_ids.append(booking_id)
+
+        for intervals in locations.values():
+            intervals._rebuild_max_ends(0)
+
+        self._locations = locations
+        self._horizon = horizon
+        self._version = version
+
+    def _ensure_fresh(self) -> None:
+        """Наздоганяє зміни інших процесів за журналом або перебудовує індекс."""
+        shared = self._shared_version()
+        if self._version == shared:
+            return
+        if (
+            self._version is None
+            or shared < self._version
+            or shared - self._version > AVAILABILITY_LOG_MAX
+        ):
+            self._build()
+            return
+
+        keys = [
+            AVAILABILITY_LOG_KEY.format(version)
+            for version in range(self._version + 1, shared + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            # Запис витіснено, ще не записано або це масова зміна
+            self._build()
+            return
+        for key in keys:
+            self._change(*changes[key])
+        self._version = shared
+
+    def _covers(self, start: datetime) -> bool:
+        """
+        Перевіряє, чи містить індекс усі бронювання для проміжку.
+
+        Args:
+            start (datetime): Початок проміжку.
+
+        Returns:
+            bool: True, якщо проміжок можна перевірити за індексом.
+        """
+        return self._horizon is not None and start >= self._horizon
+
+    def is_free(
+        self,
+        location_id: int,
+        start: datetime,
+        end: datetime,
+        exclude_booking_id: Optional[int] = None,
+        strict: bool = False,
+    ) -> bool:
+        """
+        Перевіряє, чи вільна локація у вказаний проміжок.
+
+        Args:
+            location_id (int): Ідентифікатор локації.
+            start (datetime): Початок проміжку.
+            end (datetime): Кінець проміжку.
+            exclude_booking_id (Optional[int]): Бронювання, яке не враховується.
+            strict (bool): Перевіряти в базі даних, а не за індексом.
+                Потрібно для перевірки конфлікту під блокуванням локації:
+                інший процес оновлює версію індексу лише після коміту
+                (`on_commit`), тож між його комітом і оновленням версії
+                індекс виглядає актуальним, але не містить нового
+                підтвердження (або ще містить видалене). Тому індексу не
+                можна довіряти ні для відповіді «вільно», ні для «зайнято».
+
+        Returns:
+            bool: True, якщо локація вільна, інакше False.
+        """
+        if not strict:
+            with self._lock:
+                self._ensure_fresh()
+                if self._covers(start) and exclude_booking_id is None:
+                    intervals = self._locations.get(location_id)
+                    return intervals is None or not intervals.overlaps(start, end)
+
+        bookings = Booking.objects.filter(
+            location_id=location_id,
+            confirmed=True,
+            start_time__lt=end,
+            end_time__gt=start,
+        )
+        if exclude_booking_id is not None:
+            bookings = bookings.exclude(pk=exclude_booking_id)
+        return not bookings.exists()
+
+    def booked_location_ids(self, start: datetime, end: datetime) -> Set[int]:
+        """
+        Повертає ідентифікатори всіх локацій, зайнятих у вказаний проміжок.
+
+        Args:
+            start (datetime): Початок проміжку.
+            end (datetime): Кінець проміжку.
+
+        Returns:
+            Set[int]: Ідентифікатори зайнятих локацій.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            if self._covers(start):
+                return {
+                    location_id
+                    for location_id, intervals in self._locations.items()
+                    if intervals.overlaps(start, end)
+                }
+
+        return set(
+            Booking.objects.filter(
+                confirmed=True, start_time__lt=end, end_time__gt=start
+            ).values_list('location_id', flat=True)
+        )
+
+    def _change(
+        self,
+        booking_id: int,
+        location_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> None:
+        """
+        Змінює інтервали одного бронювання в індексі цього процесу.
+
+        Зміна ідемпотентна: інтервал спершу видаляється, тому повторне
+        застосування того самого запису журналу нічого не ламає.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+            location_id (int): Ідентифікатор локації.
+            start (Optional[datetime]): Новий початок, None - лише видалити.
+            end (Optional[datetime]): Новий кінець, None - лише видалити.
+        """
+        intervals = self._locations.get(location_id)
+        if intervals is not None:
+            intervals.remove(booking_id)
+        if start is None or end is None or end <= self._horizon:
+            return
+        if intervals is None:
+            intervals = self._locations[location_id] = LocationIntervals()
+        intervals.add(booking_id, start, end)
+
+    def _apply(
+        self,
+        booking_id: int,
+        location_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> None:
+        """
+        Записує зміну одного бронювання в журнал і застосовує її локально.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+            location_id (int): Ідентифікатор локації.
+            start (Optional[datetime]): Новий початок, None - лише видалити.
+            end (Optional[datetime]): Новий кінець, None - лише видалити.
+        """
+        with self._lock:
+            version = self._bump_shared_version()
+            cache.set(
+                AVAILABILITY_LOG_KEY.format(version),
+                (booking_id, location_id, start, end),
+                AVAILABILITY_LOG_TTL,
+            )
+            if self._version is not None and version == self._version + 1:
+                self._change(booking_id, location_id, start, end)
+                self._version = version
+            # Інакше пропущені зміни (разом із цією) прийдуть із журналу
+
+    def booking_saved(
+        self,
+        booking_id: int,
+        location_id: int,
+        start: datetime,
+        end: datetime,
+        confirmed: bool,
+    ) -> None:
+        """
+        Оновлює індекс після збереження бронювання.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+            location_id (int): Ідентифікатор локації.
+            start (datetime): Дата початку.
+            end (datetime): Дата закінчення.
+            confirmed (bool): Чи підтверджене бронювання.
+        """
+        if confirmed:
+            self._apply(booking_id, location_id, start, end)
+        else:
+            self._apply(booking_id, location_id)
+
+    def booking_deleted(self, booking_id: int, location_id: int) -> None:
+        """
+        Оновлює індекс після видалення бронювання.
+
+        Args:
+            booking_id (int): Ідентифікатор бронювання.
+            location_id (int): Ідентифікатор локації.
+        """
+        self._apply(booking_id, location_id)
+
+    def invalidate(self) -> None:
+        """Позначає індекс застарілим у всіх процесах (після масових змін)."""
+        with self._lock:
+            self._bump_shared_version()
+            self._version = None
+
+
+availability = AvailabilityIndex()
+
+
+def daily_status(
+    bookings: Iterable[Tuple[datetime, datetime]], first_day: date, last_day: date
+) -> List[bool]:
+    """
+    Визначає зайнятість кожного дня проміжку одним проходом.
+
+    Бронювання мають бути відсортовані за початком. Дні, вже позначені
+    попередніми бронюваннями, не переглядаються повторно, тому складність
+    становить O(днів + бронювань).
+
+    Args:
+        bookings (Iterable[Tuple[datetime, datetime]]): Початок і кінець
+            бронювань, відсортовані за початком.
+        first_day (date): Перший день проміжку.
+        last_day (date): Останній день проміжку (включно).
+
+    Returns:
+        List[bool]: True для кожного дня, який перетинається з бронюванням.
+    """
+    total = (last_day - first_day).days + 1
+    booked = [False] * total
+    # Дні до цієї позиції вже оброблені
+    swept = 0
+
+    for start, end in bookings:
+        first = max((localtime(start).date() - first_day).days, swept)
+        # Бронювання, яке закінчується опівночі, не займає наступний день
+        last = min(
+            (localtime(end - timedelta(microseconds=1)).date() - first_day).days + 1,
+            total,
+        )
+        for day in range(first, last):
+            booked[day] = True
+        swept = max(swept, last)
+
+    return booked
+
+
+def nearest_windows(
+    bookings: Iterable[Tuple[datetime, datetime]],
+    target: datetime,
+    length: timedelta,
+    count: int,
+    earliest: datetime,
+    latest: datetime,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Знаходить найближчі до бажаної дати вільні проміжки заданої тривалості.
+
+    Проміжки починаються в бажаний час зі зсувом на цілу кількість днів.
+    Бронювання проходяться один раз: між ними шукаються вільні розриви,
+    а з кожного розриву беруться зсуви, найближчі до бажаної дати.
+
+    Args:
+        bookings (Iterable[Tuple[datetime, datetime]]): Початок і кінець
+            бронювань, відсортовані за початком.
+        target (datetime): Бажаний початок перебування.
+        length (timedelta): Тривалість перебування.
+        count (int): Скільки проміжків повернути.
+        earliest (datetime): Найраніший допустимий початок.
+        latest (datetime): Найпізніший допустимий початок.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: Вільні проміжки від найближчого.
+    """
+    # Межі зсуву в днях: ціле ділення з округленням вгору та вниз
+    lowest = -((target - earliest) // DAY)
+    highest = (latest - target) // DAY
+    candidates: List[int] = []
+
+    def collect(gap_start: datetime, gap_end: datetime) -> None:
+        first = max(-((target - gap_start) // DAY), lowest)
+        last = min((gap_end - length - target) // DAY, highest)
+        if first > last:
+            return
+        if first <= 0 <= last:
+            candidates.extend(range(max(first, -count), min(last, count) + 1))
+        elif last < 0:
+            candidates.extend(range(max(first, last - count + 1), last + 1))
+        else:
+            candidates.extend(range(first, min(last, first + count - 1) + 1))
+
+    free_from = target + lowest * DAY
+    for start, end in bookings:
+        if start > free_from:
+            collect(free_from, start)
+        free_from = max(free_from, end)
+    collect(free_from, target + highest * DAY + length)
+
+    candidates.sort(key=lambda shift: (abs(shift), shift))
+    return [
+        (target + shift * DAY, target + shift * DAY + length)
+        for shift in candidates[:count]
+    ]
+
+
+def free_windows(
+    location_ids: Iterable[int],
+    target: datetime,
+    length: timedelta,
+    count: int = 3,
+    days: int = FLEXIBLE_SEARCH_DAYS,
+) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """
+    Знаходить найближчі вільні проміжки для кількох локацій одним запитом.
+
+    Args:
+        location_ids (Iterable[int]): Ідентифікатори локацій.
+        target (datetime): Бажаний початок перебування.
+        length (timedelta): Тривалість перебування.
+        count (int): Скільки проміжків повернути для кожної локації.
+        days (int): На скільки днів від бажаної дати шукати.
+
+    Returns:
+        Dict[int, List[Tuple[datetime, datetime]]]: Вільні проміжки локацій.
+    """
+    location_ids = list(location_ids)
+    earliest = max(target - days * DAY, now())
+    latest = target + days * DAY
+    bookings = (
+        Booking.objects.filter(
+            location_id__in=location_ids,
+            confirmed=True,
+            start_time__lt=latest + length,
+            end_time__gt=earliest,
+        )
+        .order_by('location_id', 'start_time')
+        .values_list('location_id', 'start_time', 'end_time')
+    )
+
+    by_location = {
+        location_id: [(start, end) for _, start, end in rows]
+        for location_id, rows in groupby(bookings, key=lambda row: row[0])
+    }
+    return {
+        location_id: nearest_windows(
+            by_location.get(location_id, ()), target, length, count, earliest, latest
+        )
+        for location_id in location_ids
+    }
@@ -0,0 +1,42 @@
+from typing import List
+
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import CheckMessage, Error, Tags, register
+
+# Кеші, які кожен процес тримає окремо: версії та лічильники в них не бачать
+# інші процеси
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def cache_is_shared(alias: str = 'default') -> bool:
+    """
+    Перевіряє, чи кеш спільний для всіх процесів застосунку.
+
+    Індекс зайнятості, набір реклами, улюблені та статистика кешу фрагментів
+    узгоджуються між процесами через версії й лічильники в кеші, тому з
+    кешем у пам'яті процесу інші процеси не бачать змін.
+
+    Args:
+        alias (str): Псевдонім кешу.
+
+    Returns:
+        bool: True, якщо кеш не прив'язаний до процесу.
+    """
+    return not isinstance(caches[alias], PROCESS_LOCAL_CACHES)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs) -> List[CheckMessage]:
+    """Забороняє розгортання з кешем у пам'яті процесу."""
+    if cache_is_shared():
+        return []
+    return [
+        Error(
+            "Кеш за замовчуванням існує лише в пам'яті процесу, тож робочі "
+            'процеси не бачать змін зайнятості, реклами та улюблених одне одного.',
+            hint='Задайте REDIS_URL або інший спільний бекенд у CACHES.',
+            id='booking.E001',
+        )
+    ]
@@ -1,34 +1,32 @@
-import random
+from functools import lru_cache
 from typing import Dict
 
 from django.http import HttpRequest
+from django.utils.functional import SimpleLazyObject
 
-from .models import Advertisement
+from .ads import advertisement_pool
 
 
-def advertisement_processor(request: HttpRequest) -> Dict[str, Advertisement]:
+def advertisement_processor(request: HttpRequest) -> Dict[str, SimpleLazyObject]:
     """
     Повертає контекст з рекламою.
 
+    Реклама обирається лише тоді, коли шаблон звертається до банерів.
+
     Args:
         request (HttpRequest): Запит.
 
     Returns:
-        Dict[str, Advertisement]: Контекст з рекламою.
+        Dict[str, SimpleLazyObject]: Контекст з рекламою.
     """
-    if request.user.is_staff:
-        return {}
-
-    ads = list(Advertisement.objects.filter(is_active=True))
-    left_advertisement = right_advertisement = None
 
-    if len(ads) >= 2:
-        left_advertisement, right_advertisement = random.sample(ads, 2)
-    elif ads:
-        left_advertisement = ads[0] if random.choice([True, False]) else None
-        right_advertisement = ads[0] if left_advertisement is None else None
+    @lru_cache(maxsize=None)
+    def pick_pair() -> tuple:
+        if request.user.is_staff:
+            return None, None
+        return advertisement_pool.pick_pair()
 
     return {
-        'left_advertisement': left_advertisement,
-        'right_advertisement': right_advertisement,
+        'left_advertisement': SimpleLazyObject(lambda: pick_pair()[0]),
+        'right_advertisement': SimpleLazyObject(lambda: pick_pair()[1]),
     }
@@ -0,0 +1,522 @@
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from functools import reduce
+from operator import or_
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.http import HttpRequest
+
+from .models import Location
+from .search import search_locations
+
+FACETS_VERSION_KEY = 'booking:facets:version'
+# Журнал змін: під ключем версії зберігається зміна однієї локації
+FACETS_LOG_KEY = 'booking:facets:log:{}'
+FACETS_LOG_TTL = getattr(settings, 'FACETS_LOG_TTL', 60 * 60)
+# Скільки змін з журналу застосовувати, перш ніж просто перебудувати індекс
+FACETS_LOG_MAX = getattr(settings, 'FACETS_LOG_MAX', 1000)
+# Скільки найпоширеніших значень країни, області та міста показувати
+FACET_BUCKET_LIMIT = getattr(settings, 'FACET_BUCKET_LIMIT', 20)
+# Скільки останніх пошукових запитів зберігає індекс фасетів
+FACET_SEARCH_CACHE_SIZE = getattr(settings, 'FACET_SEARCH_CACHE_SIZE', 8)
+
+# Діапазони ціни за ніч: ключ, назва, нижня межа (включно), верхня межа
+PRICE_BUCKETS: List[Tuple[str, str, int, Optional[int]]] = [
+    ('0-500', 'до 500 грн', 0, 500),
+    ('500-1000', '500–1000 грн', 500, 1000),
+    ('1000-2000', '1000–2000 грн', 1000, 2000),
+    ('2000-5000', '2000–5000 грн', 2000, 5000),
+    ('5000+', 'від 5000 грн', 5000, None),
+]
+# Діапазони місткості: ключ, назва, найменша кількість гостей, найбільша
+CAPACITY_BUCKETS: List[Tuple[str, str, int, Optional[int]]] = [
+    ('1-2', '1–2 гостей', 1, 2),
+    ('3-4', '3–4 гостей', 3, 4),
+    ('5-6', '5–6 гостей', 5, 6),
+    ('7+', 'від 7 гостей', 7, None),
+]
+# Фасети та їхні назви в порядку відображення
+FACETS = {
+    'country': 'Країна',
+    'region': 'Область',
+    'city': 'Місто',
+    'price': 'Ціна за ніч',
+    'capacity': 'Місткість',
+}
+
+
+def bucket_condition(field: str, low: int, high: Optional[int], inclusive: bool) -> Q:
+    """
+    Будує умову попадання значення поля в діапазон.
+
+    Args:
+        field (str): Назва поля.
+        low (int): Нижня межа (включно).
+        high (Optional[int]): Верхня межа або None.
+        inclusive (bool): Чи включати верхню межу.
+
+    Returns:
+        Q: Умова фільтрування.
+    """
+    condition = Q(**{f'{field}__gte': low})
+    if high is not None:
+        condition &= Q(**{f'{field}__{"lte" if inclusive else "lt"}': high})
+    return condition
+
+
+# Поле моделі, діапазони та чи включається верхня межа діапазону
+RANGE_FACETS = {
+    'price': ('price_per_night', PRICE_BUCKETS, False),
+    'capacity': ('amount', CAPACITY_BUCKETS, True),
+}
+
+
+def bucket_index(facet: str, value: Any) -> int:
+    """
+    Повертає номер діапазону для значення поля, як і `bucket_case`.
+
+    Args:
+        facet (str): Назва фасета з діапазонами.
+        value (Any): Значення поля.
+
+    Returns:
+        int: Номер діапазону або -1.
+    """
+    field, buckets, inclusive = RANGE_FACETS[facet]
+    value = Location._meta.get_field(field).to_python(value)
+    for index, (_, _, low, high) in enumerate(buckets):
+        if value >= low and (
+            high is None or (value <= high if inclusive else value < high)
+        ):
+            return index
+    return -1
+
+
+def facet_key(location: Location) -> Tuple:
+    """
+    Повертає значення фасетів локації (ключ групи в індексі).
+
+    Args:
+        location (Location): Локація.
+
+    Returns:
+        Tuple: Країна, область, місто та номери діапазонів ціни й місткості.
+    """
+    return tuple(
+        bucket_index(facet, getattr(location, RANGE_FACETS[facet][0]))
+        if facet in RANGE_FACETS
+        else getattr(location, facet)
+        for facet in FACETS
+    )
+
+
+def selected_facets(request: HttpRequest) -> Dict[str, List[str]]:
+    """
+    Читає обрані значення фасетів із параметрів запиту.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        Dict[str, List[str]]: Обрані значення кожного фасета.
+    """
+    selected = {}
+    for facet in FACETS:
+        values = [value for value in request.GET.getlist(facet) if value]
+        if facet in RANGE_FACETS:
+            keys = {key for key, *_ in RANGE_FACETS[facet][1]}
+            values = [value for value in values if value in keys]
+        if values:
+            selected[facet] = values
+    return selected
+
+
+def facet_condition(facet: str, values: List[str]) -> Q:
+    """
+    Будує умову для обраних значень одного фасета (значення об'єднуються OR).
+
+    Args:
+        facet (str): Назва фасета.
+        values (List[str]): Обрані значення.
+
+    Returns:
+        Q: Умова фільтрування.
+    """
+    if facet not in RANGE_FACETS:
+        return Q(**{f'{facet}__in': values})
+
+    field, buckets, inclusive = RANGE_FACETS[facet]
+    return reduce(
+        or_,
+        (
+            bucket_condition(field, low, high, inclusive)
+            for key, _, low, high in buckets
+            if key in values
+        ),
+    )
+
+
+def filter_by_facets(locations: QuerySet, selected: Dict[str, List[str]]) -> QuerySet:
+    """
+    Фільтрує локації за обраними фасетами (фасети об'єднуються AND).
+
+    Args:
+        locations (QuerySet): Локації.
+        selected (Dict[str, List[str]]): Обрані значення фасетів.
+
+    Returns:
+        QuerySet: Відфільтровані локації.
+    """
+    for facet, values in selected.items():
+        locations = locations.filter(facet_condition(facet, values))
+    return locations
+
+
+def bucket_case(facet: str) -> Case:
+    """
+    Будує SQL-вираз, який повертає номер діапазону для фасета.
+
+    Args:
+        facet (str): Назва фасета з діапазонами.
+
+    Returns:
+        Case: Номер діапазону або -1.
+    """
+    field, buckets, inclusive = RANGE_FACETS[facet]
+    return Case(
+        *(
+            When(bucket_condition(field, low, high, inclusive), then=Value(index))
+            for index, (_, _, low, high) in enumerate(buckets)
+        ),
+        default=Value(-1),
+        output_field=IntegerField(),
+    )
+
+
+def matches(row: Dict[str, Any], facet: str, values: List[str]) -> bool:
+    """
+    Перевіряє, чи відповідає згрупований рядок обраним значенням фасета.
+
+    Args:
+        row (Dict[str, Any]): Рядок згрупованого запиту.
+        facet (str): Назва фасета.
+        values (List[str]): Обрані значення.
+
+    Returns:
+        bool: True, якщо рядок проходить фільтр фасета.
+    """
+    if facet in RANGE_FACETS:
+        buckets = RANGE_FACETS[facet][1]
+        return row[facet] >= 0 and buckets[row[facet]][0] in values
+    return row[facet] in values
+
+
+class FacetIndex:
+    """
+    Групи фасетів усіх локацій у пам'яті процесу.
+
+    Зберігає згруповані рядки каталогу та номер групи кожної локації, тому
+    кількості для набору, звуженого пошуком чи датами, рахуються за
+    ідентифікаторами локацій без згрупованого запиту до бази даних.
+    Ідентифікатори останніх `FACET_SEARCH_CACHE_SIZE` пошукових запитів
+    зберігаються до перебудови індексу, тож перемикання фасетів і гортання
+    сторінок одного пошуку не повторюють запит.
+
+    Узгодженість між процесами забезпечується лічильником версії в кеші та
+    журналом змін: збереження чи видалення локації переносить її з однієї
+    групи в іншу в усіх процесах. Індекс перебудовується лише тоді, коли
+    запису в журналі немає (масові зміни, очищений кеш) або змін забагато.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._rows: List[Dict[str, Any]] = []
+        self._groups: Dict[int, int] = {}
+        self._positions: Dict[Tuple, int] = {}
+        self._searches: OrderedDict[str, FrozenSet[int]] = OrderedDict()
+        self._version: Optional[int] = None
+
+    def _build(self, version: int) -> None:
+        """
+        Будує індекс одним запитом до бази даних.
+
+        Args:
+            version (int): Версія фасетів, для якої будується індекс.
+        """
+        rows: List[Dict[str, Any]] = []
+        groups: Dict[int, int] = {}
+        positions: Dict[Tuple, int] = {}
+        locations = (
+            Location.objects.order_by()
+            .annotate(price=bucket_case('price'), capacity=bucket_case('capacity'))
+            .values_list('pk', *FACETS)
+        )
+        for pk, *values in locations.iterator(chunk_size=5000):
+            key = tuple(values)
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = len(rows)
+                rows.append({**dict(zip(FACETS, key)), 'total': 0})
+            rows[position]['total'] += 1
+            groups[pk] = position
+
+        self._rows = rows
+        self._groups = groups
+        self._positions = positions
+        self._searches.clear()
+        self._version = version
+
+    def _ensure_fresh(self, version: int) -> None:
+        """
+        Наздоганяє зміни інших процесів за журналом або перебудовує індекс.
+
+        Args:
+            version (int): Поточна спільна версія фасетів.
+        """
+        if self._version == version:
+            return
+        if (
+            self._version is None
+            or version < self._version
+            or version - self._version > FACETS_LOG_MAX
+        ):
+            self._build(version)
+            return
+
+        keys = [
+            FACETS_LOG_KEY.format(number)
+            for number in range(self._version + 1, version + 1)
+        ]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            # Запис витіснено, ще не записано або це масова зміна
+            self._build(version)
+            return
+        for key in keys:
+            self._change(*changes[key])
+        self._version = version
+
+    def _change(self, location_id: int, key: Optional[Tuple] = None) -> None:
+        """
+        Переносить одну локацію в групу з новими значеннями фасетів.
+
+        Args:
+            location_id (int): Ідентифікатор локації.
+            key (Optional[Tuple]): Нові значення фасетів, None - видалити.
+        """
+        position = self._groups.pop(location_id, None)
+        if position is not None:
+            self._rows[position]['total'] -= 1
+        if key is not None:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = len(self._rows)
+                self._rows.append({**dict(zip(FACETS, key)), 'total': 0})
+            self._rows[position]['total'] += 1
+            self._groups[location_id] = position
+        # Назва чи опис могли змінитися, тому збережені пошуки застаріли
+        self._searches.clear()
+
+    def apply(self, location_id: int, key: Optional[Tuple] = None) -> None:
+        """
+        Записує зміну однієї локації в журнал і застосовує її локально.
+
+        Args:
+            location_id (int): Ідентифікатор локації.
+            key (Optional[Tuple]): Нові значення фасетів, None - видалити.
+        """
+        with self._lock:
+            version = bump_facets_version()
+            cache.set(
+                FACETS_LOG_KEY.format(version), (location_id, key), FACETS_LOG_TTL
+            )
+            if self._version is not None and version == self._version + 1:
+                self._change(location_id, key)
+                self._version = version
+            # Інакше пропущені зміни (разом із цією) прийдуть із журналу
+
+    def search(self, query: str, version: int) -> FrozenSet[int]:
+        """
+        Повертає ідентифікатори локацій, знайдених пошуком.
+
+        Args:
+            query (str): Пошуковий запит.
+            version (int): Версія фасетів, для якої зберігається результат.
+
+        Returns:
+            FrozenSet[int]: Знайдені локації.
+        """
+        with self._lock:
+            found = self._searches.get(query)
+            if found is not None:
+                self._searches.move_to_end(query)
+                return found
+
+        found = frozenset(
+            search_locations(Location.objects.order_by(), query).values_list(
+                'pk', flat=True
+            )
+        )
+        with self._lock:
+            # Результат для застарілої версії не зберігається
+            if self._version == version:
+                self._searches[query] = found
+                while len(self._searches) > FACET_SEARCH_CACHE_SIZE:
+                    self._searches.popitem(last=False)
+        return found
+
+    def rows(
+        self, query: str = '', excluded: FrozenSet[int] = frozenset()
+    ) -> List[Dict[str, Any]]:
+        """
+        Повертає згруповані рядки для набору локацій.
+
+        Args:
+            query (str): Пошуковий запит або порожній рядок для всього
+                каталогу.
+            excluded (FrozenSet[int]): Локації, які не входять у набір
+                (наприклад, зайняті на обрані дати).
+
+        Returns:
+            List[Dict[str, Any]]: Рядки з країною, областю, містом, номерами
+                діапазонів ціни та місткості і кількістю локацій (`total`).
+        """
+        version = cache.get_or_set(FACETS_VERSION_KEY, 1, timeout=None)
+        with self._lock:
+            self._ensure_fresh(version)
+        found = self.search(query, version) - excluded if query else None
+
+        # Зміни з журналу оновлюють групи на місці, тому вони читаються під
+        # блокуванням
+        with self._lock:
+            rows, groups = self._rows, self._groups
+            if found is not None:
+                counts = Counter(map(groups.get, found))
+                totals = [counts[position] for position in range(len(rows))]
+            else:
+                totals = [row['total'] for row in rows]
+                # Зайнятих локацій зазвичай менше, ніж усіх, тож вони
+                # віднімаються
+                for position in map(groups.get, excluded):
+                    if position is not None:
+                        totals[position] -= 1
+
+            return [
+                {**row, 'total': total} for row, total in zip(rows, totals) if total
+            ]
+
+
+def bump_facets_version() -> int:
+    """
+    Збільшує спільну версію фасетів.
+
+    Returns:
+        int: Нова версія.
+    """
+    try:
+        return cache.incr(FACETS_VERSION_KEY)
+    except ValueError:
+        cache.set(FACETS_VERSION_KEY, 1, timeout=None)
+        return 1
+
+
+facet_index = FacetIndex()
+
+
+def invalidate_facets() -> None:
+    """Позначає індекс фасетів застарілим у всіх процесах (масові зміни)."""
+    bump_facets_version()
+
+
+def top_buckets(
+    counts: Dict[Any, int], chosen: List[str], limit: int = FACET_BUCKET_LIMIT
+) -> List[Tuple[Any, int]]:
+    """
+    Обирає найпоширеніші значення фасета та всі обрані користувачем.
+
+    Args:
+        counts (Dict[Any, int]): Кількість локацій для кожного значення.
+        chosen (List[str]): Обрані значення.
+        limit (int): Найбільша кількість необраних значень.
+
+    Returns:
+        List[Tuple[Any, int]]: Значення та кількості від найпоширенішого.
+    """
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    top = ordered[:limit]
+    shown = {value for value, _ in top}
+    # Обране значення лишається у списку, щоб вибір можна було зняти
+    top.extend((value, counts.get(value, 0)) for value in chosen if value not in shown)
+    return top
+
+
+def facet_counts(
+    selected: Dict[str, List[str]],
+    query: str = '',
+    excluded: FrozenSet[int] = frozenset(),
+) -> List[Dict[str, Any]]:
+    """
+    Рахує кількість локацій для кожного значення всіх фасетів.
+
+    Локації групуються за країною, областю, містом і номерами діапазонів ціни
+    та місткості. Кількість для значення фасета враховує обрані значення
+    всіх інших фасетів, але не його власні, тому видно, скільки локацій
+    додасть вибір ще одного значення. Згруповані рядки будуються з
+    `facet_index`: пошук додає лише запит ідентифікаторів знайдених
+    локацій (один раз для кожного запиту), а фільтр за датами не додає
+    запитів. Для країни, області та
+    міста показуються `FACET_BUCKET_LIMIT` найпоширеніших значень.
+
+    Args:
+        selected (Dict[str, List[str]]): Обрані значення фасетів.
+        query (str): Пошуковий запит або порожній рядок для всього каталогу.
+        excluded (FrozenSet[int]): Локації, які не входять у набір (зайняті на
+            обрані дати).
+
+    Returns:
+        List[Dict[str, Any]]: Фасети з назвою та значеннями (`buckets`), для
+            кожного значення вказано назву, кількість та ознаку вибору.
+    """
+    rows = facet_index.rows(query, excluded)
+
+    counts: Dict[str, Dict[Any, int]] = {facet: defaultdict(int) for facet in FACETS}
+    for row in rows:
+        failed = [
+            facet
+            for facet, values in selected.items()
+            if not matches(row, facet, values)
+        ]
+        # Рядок, який не проходить два фасети, не впливає на жоден з них
+        if len(failed) > 1:
+            continue
+        for facet in failed or FACETS:
+            counts[facet][row[facet]] += row['total']
+
+    facets = []
+    for facet, title in FACETS.items():
+        chosen = selected.get(facet, [])
+        if facet in RANGE_FACETS:
+            buckets = [
+                {
+                    'value': key,
+                    'label': label,
+                    'count': counts[facet].get(index, 0),
+                    'selected': key in chosen,
+                }
+                for index, (key, label, _, _) in enumerate(RANGE_FACETS[facet][1])
+            ]
+        else:
+            buckets = [
+                {
+                    'value': value,
+                    'label': value,
+                    'count': count,
+                    'selected': value in chosen,
+                }
+                for value, count in top_buckets(counts[facet], chosen)
+            ]
+        facets.append({'name': facet, 'title': title, 'buckets': buckets})
+    return facets
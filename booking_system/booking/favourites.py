@@ -0,0 +1,96 @@
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Favourite, Location
+
+FAVOURITES_CACHE_TTL = getattr(settings, 'FAVOURITES_CACHE_TTL', 60 * 60)
+
+
+def favourites_key(user_id: int) -> str:
+    """
+    Повертає ключ кешу набору улюблених локацій користувача.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        str: Ключ кешу.
+    """
+    return f'booking:favourites:{user_id}'
+
+
+def favourite_ids(user_id: int) -> FrozenSet[int]:
+    """
+    Повертає ідентифікатори улюблених локацій користувача.
+
+    Набір зберігається в кеші до зміни улюблених, тож перевірка
+    `location.pk in ids` коштує O(1) і не звертається до бази даних.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        FrozenSet[int]: Ідентифікатори локацій.
+    """
+    ids = cache.get(favourites_key(user_id))
+    if ids is None:
+        ids = frozenset(
+            Favourite.objects.filter(user_id=user_id).values_list(
+                'location_id', flat=True
+            )
+        )
+        cache.set(favourites_key(user_id), ids, FAVOURITES_CACHE_TTL)
+    return ids
+
+
+def favourite_locations(user_id: int) -> Tuple[FrozenSet[int], List[Location]]:
+    """
+    Завантажує улюблені локації користувача зі статусом зайнятості.
+
+    Якщо набір ідентифікаторів не закешовано, він будується з того самого
+    запиту, а користувач без улюблених не робить жодного запиту.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        Tuple[FrozenSet[int], List[Location]]: Ідентифікатори та локації.
+    """
+    ids = cache.get(favourites_key(user_id))
+    if ids is not None and not ids:
+        return ids, []
+
+    locations = list(
+        Location.objects.with_booking_status().filter(favourites__user_id=user_id)
+    )
+    if ids is None:
+        ids = frozenset(location.pk for location in locations)
+        cache.set(favourites_key(user_id), ids, FAVOURITES_CACHE_TTL)
+    return ids, locations
+
+
+def mark_favourites(
+    locations: Iterable[Location], ids: Optional[FrozenSet[int]]
+) -> None:
+    """
+    Позначає локації атрибутом `is_favourite` для шаблонів.
+
+    Args:
+        locations (Iterable[Location]): Локації сторінки.
+        ids (Optional[FrozenSet[int]]): Улюблені локації або None для
+            анонімного користувача.
+    """
+    for location in locations:
+        location.is_favourite = ids is not None and location.pk in ids
+
+
+def invalidate_favourites(user_id: int) -> None:
+    """
+    Скидає кешований набір улюблених користувача.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+    """
+    cache.delete(favourites_key(user_id))
@@ -46,7 +46,7 @@ class BookingForm(forms.ModelForm):
         """Метаклас форми, який визначає метадані форми."""
 
         model = Booking
-        exclude = ['user', 'location', 'confirmed']
+        exclude = ['user', 'location', 'confirmed', 'expires_at']
 
 
 class ReviewForm(forms.ModelForm):
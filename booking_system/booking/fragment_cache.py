@@ -0,0 +1,67 @@
+import hashlib
+from typing import Any, Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+
+FRAGMENT_CACHE_TIMEOUT = getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 24 * 60 * 60)
+HITS_KEY = 'booking:fragments:hits'
+MISSES_KEY = 'booking:fragments:misses'
+
+
+def fragment_key(name: str, obj: Any, vary_on: Iterable[Any] = ()) -> str:
+    """
+    Формує ключ фрагмента з урахуванням версії вмісту об'єкта.
+
+    Args:
+        name (str): Назва фрагмента.
+        obj (Any): Об'єкт з полями `pk` та `content_version`.
+        vary_on (Iterable[Any]): Додаткові значення, від яких залежить фрагмент.
+
+    Returns:
+        str: Ключ кешу.
+    """
+    key = f'fragment:{name}:{obj.pk}:{obj.content_version}'
+    vary_on = [str(value) for value in vary_on]
+    if not vary_on:
+        return key
+    # Значення можуть містити пробіли та довгий текст, тому ключ містить хеш
+    digest = hashlib.md5(':'.join(vary_on).encode(), usedforsecurity=False)
+    return f'{key}:{digest.hexdigest()}'
+
+
+def count(key: str) -> None:
+    """
+    Збільшує лічильник звернень до кешу фрагментів.
+
+    Args:
+        key (str): Ключ лічильника.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def stats() -> Dict[str, int]:
+    """
+    Повертає статистику кешу фрагментів.
+
+    Returns:
+        Dict[str, int]: Кількість влучань, промахів та частка влучань.
+    """
+    values = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_stats() -> None:
+    """Обнуляє статистику кешу фрагментів."""
+    cache.delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,153 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import IO, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import QuerySet
+from django.utils.timezone import now
+
+from .models import Booking
+from .routers import use_primary
+from .sqlite import retry_on_lock
+from .transfer import TRANSFER_FIELDS, serialize_row
+
+logger = logging.getLogger(__name__)
+
+# Скільки секунд непідтверджене бронювання чекає на активацію
+HOLD_TTL = getattr(settings, 'BOOKING_HOLD_TTL', 30 * 60)
+SWEEP_BATCH_SIZE = getattr(settings, 'BOOKING_HOLD_SWEEP_BATCH_SIZE', 500)
+# Пауза між прибираннями у фоновому потоці (у секундах, 0 - потік вимкнено)
+SWEEP_INTERVAL = getattr(settings, 'BOOKING_HOLD_SWEEP_INTERVAL', 0)
+
+
+def hold_expiry() -> datetime:
+    """
+    Повертає термін дії нового непідтвердженого бронювання.
+
+    Returns:
+        datetime: Час, після якого бронювання вважається простроченим.
+    """
+    return now() + timedelta(seconds=HOLD_TTL)
+
+
+def expired_holds() -> QuerySet:
+    """
+    Повертає прострочені непідтверджені бронювання.
+
+    Умова збігається з частковим індексом `booking_hold_expiry_idx`, тому
+    запит не переглядає підтверджені бронювання.
+
+    Returns:
+        QuerySet: Прострочені бронювання.
+    """
+    return Booking.objects.filter(confirmed=False, expires_at__lte=now())
+
+
+def sweep_batch(batch_size: int, archive: Optional[IO[str]] = None) -> int:
+    """
+    Видаляє один пакет прострочених бронювань в окремій короткій транзакції.
+
+    Args:
+        batch_size (int): Найбільша кількість бронювань у пакеті.
+        archive (Optional[IO[str]]): Потік, куди видалені бронювання
+            записуються у форматі JSONL команди `export_data`.
+
+    Returns:
+        int: Кількість видалених бронювань.
+    """
+    _, names = TRANSFER_FIELDS['bookings']
+
+    def sweep() -> List[Tuple]:
+        with use_primary(), transaction.atomic():
+            holds = expired_holds().order_by('expires_at')
+            rows = list(holds.values_list(*names)[:batch_size])
+            if rows:
+                # Умова повторюється, щоб не видалити щойно підтверджене
+                expired_holds().filter(pk__in=[row[0] for row in rows]).delete()
+            return rows
+
+    rows = retry_on_lock(sweep)
+    # Архів пишеться після фіксації, щоб повтор транзакції не дублював рядки
+    if archive is not None:
+        for row in rows:
+            archive.write(
+                json.dumps(dict(zip(names, serialize_row(row))), default=str) + '\n'
+            )
+        archive.flush()
+    return len(rows)
+
+
+def sweep_expired_holds(
+    batch_size: int = SWEEP_BATCH_SIZE, archive: Optional[IO[str]] = None
+) -> int:
+    """
+    Видаляє всі прострочені бронювання пакетами обмеженого розміру.
+
+    Args:
+        batch_size (int): Найбільша кількість бронювань у пакеті.
+        archive (Optional[IO[str]]): Потік для архіву видалених бронювань.
+
+    Returns:
+        int: Кількість видалених бронювань.
+    """
+    total = 0
+    while True:
+        swept = sweep_batch(batch_size, archive)
+        total += swept
+        if swept < batch_size:
+            return total
+
+
+class HoldSweeper(threading.Thread):
+    """Фоновий потік, який періодично видаляє прострочені бронювання."""
+
+    def __init__(self, interval: float, batch_size: int = SWEEP_BATCH_SIZE) -> None:
+        super().__init__(name='booking-hold-sweeper', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        """Прибирає бронювання кожні `interval` секунд до зупинки."""
+        while not self.stopped.wait(self.interval):
+            try:
+                swept = sweep_expired_holds(self.batch_size)
+            except DatabaseError as error:
+                logger.warning('Не вдалося прибрати прострочені бронювання: %s', error)
+            else:
+                if swept:
+                    logger.info('Видалено прострочених бронювань: %s', swept)
+            finally:
+                close_old_connections()
+
+    def stop(self) -> None:
+        """Зупиняє потік після поточного прибирання."""
+        self.stopped.set()
+
+
+_sweeper: Optional[HoldSweeper] = None
+_sweeper_lock = threading.Lock()
+
+
+def start_sweeper(interval: float = SWEEP_INTERVAL) -> Optional[HoldSweeper]:
+    """
+    Запускає фоновий прибиральник один раз на процес.
+
+    Args:
+        interval (float): Пауза між прибираннями (у секундах).
+
+    Returns:
+        Optional[HoldSweeper]: Потік або None, якщо прибиральник вимкнено.
+    """
+    global _sweeper
+
+    if interval <= 0:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = HoldSweeper(interval)
+            _sweeper.start()
+    return _sweeper
@@ -0,0 +1,267 @@
+import hashlib
+import http.client
+import io
+import os
+import re
+import tempfile
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Каталог і URL згенерованих зображень (файли не змінюються після запису)
+IMAGE_CACHE_ROOT = Path(
+    getattr(settings, 'IMAGE_CACHE_ROOT', settings.BASE_DIR / 'media' / 'images')
+)
+IMAGE_CACHE_URL = getattr(settings, 'IMAGE_CACHE_URL', '/images/')
+# Ширини варіантів для srcset; вужчі оригінали не збільшуються
+IMAGE_WIDTHS: List[int] = getattr(settings, 'IMAGE_WIDTHS', [320, 640, 1280])
+IMAGE_QUALITY = getattr(settings, 'IMAGE_QUALITY', 80)
+# Функція завантаження оригіналу: URL -> байти
+IMAGE_FETCHER = getattr(settings, 'IMAGE_FETCHER', 'booking.images.fetch_url')
+IMAGE_FETCH_TIMEOUT = getattr(settings, 'IMAGE_FETCH_TIMEOUT', 10)
+IMAGE_MAX_BYTES = getattr(settings, 'IMAGE_MAX_BYTES', 20 * 1024 * 1024)
+# Варіанти адресуються хешем вмісту, тому кешуються назавжди
+IMAGE_CACHE_MAX_AGE = getattr(settings, 'IMAGE_CACHE_MAX_AGE', 365 * 24 * 60 * 60)
+
+# Формат Pillow, розширення файлу та MIME-тип кожного варіанта
+IMAGE_FORMATS: Dict[str, Tuple[str, str]] = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+VARIANT_PATTERN = re.compile(r'^(?P<width>\d+)\.(?P<extension>webp|jpg)$')
+
+
+class ImageError(Exception):
+    """Зображення неможливо завантажити або обробити."""
+
+
+def fetch_url(url: str) -> bytes:
+    """
+    Завантажує зображення за HTTP(S).
+
+    Args:
+        url (str): Адреса зображення.
+
+    Raises:
+        ImageError: Якщо адреса не HTTP(S) або файл завеликий.
+
+    Returns:
+        bytes: Вміст файлу.
+    """
+    if urlparse(url).scheme not in ('http', 'https'):
+        raise ImageError(f'Непідтримувана адреса зображення: {url}')
+
+    request = urllib.request.Request(url, headers={'User-Agent': 'booking-images'})
+    with urllib.request.urlopen(request, timeout=IMAGE_FETCH_TIMEOUT) as response:
+        data = response.read(IMAGE_MAX_BYTES + 1)
+    if len(data) > IMAGE_MAX_BYTES:
+        raise ImageError(f'Зображення завелике: {url}')
+    return data
+
+
+def fetch_file(url: str) -> bytes:
+    """
+    Читає зображення з локального файлу (`file://` або шлях).
+
+    Використовується для тестів та заздалегідь завантажених фото.
+
+    Args:
+        url (str): Шлях або адреса `file://`.
+
+    Returns:
+        bytes: Вміст файлу.
+    """
+    parsed = urlparse(url)
+    path = parsed.path if parsed.scheme == 'file' else url
+    with open(path, 'rb') as stream:
+        return stream.read(IMAGE_MAX_BYTES + 1)
+
+
+def content_digest(data: bytes) -> str:
+    """
+    Повертає хеш вмісту, за яким зберігаються варіанти зображення.
+
+    Args:
+        data (bytes): Вміст оригіналу.
+
+    Returns:
+        str: SHA-256 у шістнадцятковому вигляді.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def variant_path(
+    digest: str, width: int, extension: str, root: Optional[Path] = None
+) -> Path:
+    """
+    Повертає шлях до файлу варіанта.
+
+    Args:
+        digest (str): Хеш оригіналу.
+        width (int): Ширина варіанта.
+        extension (str): Розширення (`webp` або `jpg`).
+        root (Optional[Path]): Каталог зображень (типово `IMAGE_CACHE_ROOT`).
+
+    Returns:
+        Path: Шлях до файлу.
+    """
+    return (root or IMAGE_CACHE_ROOT) / digest[:2] / digest / f'{width}.{extension}'
+
+
+def variant_url(digest: str, width: int, extension: str) -> str:
+    """
+    Повертає URL варіанта зображення.
+
+    Args:
+        digest (str): Хеш оригіналу.
+        width (int): Ширина варіанта.
+        extension (str): Розширення (`webp` або `jpg`).
+
+    Returns:
+        str: URL варіанта.
+    """
+    return f'{IMAGE_CACHE_URL}{digest}/{width}.{extension}'
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    Записує файл через тимчасовий, щоб читачі не бачили неповний вміст.
+
+    Args:
+        path (Path): Шлях до файлу.
+        data (bytes): Вміст.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as stream:
+            stream.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def variant_widths(
+    original_width: int, widths: Sequence[int] = IMAGE_WIDTHS
+) -> List[int]:
+    """
+    Повертає ширини варіантів, які генеруються для оригіналу.
+
+    Ширини, не менші за оригінал, замінюються одним варіантом у його
+    власній ширині, тож srcset не обіцяє браузеру більше пікселів, ніж є.
+
+    Args:
+        original_width (int): Ширина оригіналу.
+        widths (Sequence[int]): Бажані ширини варіантів.
+
+    Returns:
+        List[int]: Ширини варіантів за зростанням.
+    """
+    produced = sorted(width for width in widths if width < original_width)
+    if len(produced) < len(widths):
+        produced.append(original_width)
+    return produced
+
+
+def render_variants(
+    data: bytes, digest: str, widths: Sequence[int], quality: int, root: Path
+) -> int:
+    """
+    Генерує варіанти всіх ширин і форматів, яких ще немає на диску.
+
+    Args:
+        data (bytes): Вміст оригіналу.
+        digest (str): Хеш оригіналу.
+        widths (Sequence[int]): Бажані ширини варіантів.
+        quality (int): Якість стиснення.
+        root (Path): Каталог зображень.
+
+    Raises:
+        ImageError: Якщо файл не є зображенням.
+
+    Returns:
+        int: Ширина оригіналу (з урахуванням повороту з EXIF).
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        original = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ImageError(f'Файл не є зображенням: {error}') from error
+
+    missing = [
+        (width, extension)
+        for width in variant_widths(original.width, widths)
+        for extension in IMAGE_FORMATS
+        if not variant_path(digest, width, extension, root).exists()
+    ]
+    if missing:
+        original = original.convert('RGB')
+    for width, extension in missing:
+        image = original.copy()
+        # Пропорції зберігаються, а вужчий оригінал не збільшується
+        image.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, IMAGE_FORMATS[extension][0], quality=quality, optimize=True)
+        write_atomic(variant_path(digest, width, extension, root), buffer.getvalue())
+    return original.width
+
+
+def process_source(
+    url: str,
+    fetcher_path: str = IMAGE_FETCHER,
+    widths: Sequence[int] = tuple(IMAGE_WIDTHS),
+    quality: int = IMAGE_QUALITY,
+    root: Optional[str] = None,
+) -> Tuple[str, Optional[str], int, str]:
+    """
+    Завантажує оригінал один раз і генерує його варіанти.
+
+    Функція не звертається до бази даних і приймає всі налаштування
+    аргументами, тому її можна виконувати в пулі процесів.
+
+    Args:
+        url (str): Адреса оригіналу.
+        fetcher_path (str): Шлях імпорту функції завантаження.
+        widths (Sequence[int]): Ширини варіантів.
+        quality (int): Якість стиснення.
+        root (Optional[str]): Каталог зображень.
+
+    Returns:
+        Tuple[str, Optional[str], int, str]: Адреса, хеш вмісту (None у разі
+            помилки), ширина оригіналу та опис помилки.
+    """
+    fetcher: Callable[[str], bytes] = import_string(fetcher_path)
+    try:
+        data = fetcher(url)
+        digest = content_digest(data)
+        width = render_variants(
+            data, digest, widths, quality, Path(root) if root else IMAGE_CACHE_ROOT
+        )
+    # OSError охоплює й мережеві помилки urllib (URLError, тайм-аути)
+    except (ImageError, OSError, http.client.HTTPException) as error:
+        return url, None, 0, str(error)
+    return url, digest, width, ''
+
+
+def srcset(digest: str, extension: str, widths: Sequence[int]) -> str:
+    """
+    Формує значення атрибута `srcset` для формату.
+
+    Args:
+        digest (str): Хеш оригіналу.
+        extension (str): Розширення (`webp` або `jpg`).
+        widths (Sequence[int]): Ширини згенерованих варіантів.
+
+    Returns:
+        str: Варіанти з шириною.
+    """
+    return ', '.join(
+        f'{variant_url(digest, width, extension)} {width}w' for width in widths
+    )
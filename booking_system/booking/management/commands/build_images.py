@@ -0,0 +1,106 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from booking import images
+from booking.ads import advertisement_pool
+from booking.models import Advertisement, Location
+
+
+class Command(BaseCommand):
+    """Команда для генерації зменшених варіантів фото локацій та реклами."""
+
+    help = 'Завантажує оригінали зображень і генерує варіанти WebP та JPEG.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Кількість процесів, які обробляють зображення.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Обробити всі зображення, а не лише нові.',
+        )
+
+    def sources(self, force: bool) -> Set[str]:
+        """
+        Збирає унікальні адреси зображень, які потрібно обробити.
+
+        Args:
+            force (bool): Чи обробляти зображення з уже відомим хешем.
+
+        Returns:
+            Set[str]: Адреси оригіналів.
+        """
+        locations = Location.objects.exclude(photo='')
+        advertisements = Advertisement.objects.exclude(image_url='')
+        if not force:
+            locations = locations.filter(Q(photo_digest='') | Q(photo_width=0))
+            advertisements = advertisements.filter(
+                Q(image_digest='') | Q(image_width=0)
+            )
+        return set(locations.values_list('photo', flat=True)) | set(
+            advertisements.values_list('image_url', flat=True)
+        )
+
+    def process(
+        self, urls: Iterable[str], workers: int
+    ) -> Iterator[Tuple[str, Optional[str], int, str]]:
+        """
+        Обробляє зображення в пулі процесів або в поточному процесі.
+
+        Args:
+            urls (Iterable[str]): Адреси оригіналів.
+            workers (int): Кількість процесів.
+
+        Returns:
+            Iterator[Tuple[str, Optional[str], int, str]]: Результати `process_source`.
+        """
+        process = partial(
+            images.process_source,
+            fetcher_path=images.IMAGE_FETCHER,
+            widths=tuple(images.IMAGE_WIDTHS),
+            quality=images.IMAGE_QUALITY,
+            root=str(images.IMAGE_CACHE_ROOT),
+        )
+        if workers <= 1:
+            yield from map(process, urls)
+            return
+
+        # spawn: дочірні процеси не успадковують з'єднань і потоків Django
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            yield from pool.map(process, urls)
+
+    def handle(self, *args, **options) -> None:
+        """Генерує варіанти та зберігає хеші в локаціях і рекламі."""
+        urls = sorted(self.sources(options['force']))
+        processed = failed = 0
+
+        for url, digest, width, error in self.process(urls, options['workers']):
+            if digest is None:
+                failed += 1
+                self.stderr.write(f'{url}: {error}')
+                continue
+
+            processed += 1
+            Location.objects.filter(photo=url).exclude(
+                photo_digest=digest, photo_width=width
+            ).bump_version(photo_digest=digest, photo_width=width)
+            Advertisement.objects.filter(image_url=url).exclude(
+                image_digest=digest, image_width=width
+            ).update(image_digest=digest, image_width=width)
+
+        advertisement_pool.invalidate()
+        self.stdout.write(
+            self.style.SUCCESS(f'Оброблено зображень: {processed}, помилок: {failed}')
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from booking.transfer import FORMATS, TRANSFER_FIELDS, export_rows
+
+
+class Command(BaseCommand):
+    """Команда для потокового експорту локацій та бронювань."""
+
+    help = 'Експортує локації або бронювання в CSV чи JSONL.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument('kind', choices=TRANSFER_FIELDS, help='Тип даних.')
+        parser.add_argument(
+            '--output', help='Шлях до файлу (типово стандартний вивід).'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', help='Формат файлу.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Кількість записів, які читаються з бази за раз.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Записує всі записи у файл або стандартний вивід."""
+        if not options['output']:
+            export_rows(
+                options['kind'], self.stdout, options['format'], options['chunk_size']
+            )
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as stream:
+            exported = export_rows(
+                options['kind'], stream, options['format'], options['chunk_size']
+            )
+        self.stdout.write(self.style.SUCCESS(f'Експортовано записів: {exported}'))
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.checks import cache_is_shared
+from booking.fragment_cache import reset_stats, stats
+
+
+class Command(BaseCommand):
+    """Команда для перегляду статистики кешу фрагментів."""
+
+    help = 'Виводить кількість влучань та промахів кешу фрагментів шаблонів.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулити статистику після виводу.'
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Виводить статистику у форматі JSON."""
+        if not cache_is_shared():
+            # Лічильники веб-процесів недоступні процесу команди
+            raise CommandError(
+                'Статистика зберігається в кеші процесу. Налаштуйте спільний кеш '
+                '(REDIS_URL), щоб бачити звернення веб-процесів.'
+            )
+        self.stdout.write(json.dumps(stats()))
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,62 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.transfer import FORMATS, TRANSFER_FIELDS, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    """Команда для потокового імпорту локацій та бронювань."""
+
+    help = 'Імпортує локації або бронювання з CSV чи JSONL пакетами.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument('kind', choices=TRANSFER_FIELDS, help='Тип даних.')
+        parser.add_argument('path', help='Шлях до файлу або "-" для stdin.')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файлу (типово визначається за розширенням).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Кількість записів у пакеті та транзакції.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Імпортує записи та виводить помилки для кожного рядка."""
+        path = options['path']
+        data_format = options['format'] or os.path.splitext(path)[1].lstrip('.')
+        if data_format not in FORMATS:
+            raise CommandError('Вкажіть формат файлу через --format.')
+
+        errors = 0
+
+        def report(line: int, message: str) -> None:
+            nonlocal errors
+            errors += 1
+            self.stderr.write(f'Рядок {line}: {message}')
+
+        if path == '-':
+            created = import_rows(
+                options['kind'],
+                read_rows(sys.stdin, data_format),
+                report,
+                options['batch_size'],
+            )
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                created = import_rows(
+                    options['kind'],
+                    read_rows(stream, data_format),
+                    report,
+                    options['batch_size'],
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Імпортовано записів: {created}, помилок: {errors}')
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.models import Location
+
+
+class Command(BaseCommand):
+    """Команда для перерахунку рейтингів усіх локацій."""
+
+    help = 'Перераховує суму, кількість оцінок та рейтинг усіх локацій.'
+
+    def handle(self, *args, **options) -> None:
+        """Перераховує рейтинги одним згрупованим запитом."""
+        updated = Location.objects.rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS(f'Оновлено локацій: {updated}'))
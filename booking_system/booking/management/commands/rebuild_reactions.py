@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from booking.models import Location
+
+
+class Command(BaseCommand):
+    """Команда для перерахунку лічильників реакцій усіх локацій."""
+
+    help = 'Перераховує кількість лайків та дизлайків усіх локацій.'
+
+    def handle(self, *args, **options) -> None:
+        """Перераховує лічильники одним згрупованим запитом."""
+        updated = Location.objects.rebuild_reactions()
+        self.stdout.write(self.style.SUCCESS(f'Оновлено локацій: {updated}'))
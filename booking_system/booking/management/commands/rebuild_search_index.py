@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from booking.search import fts_available, rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Команда для перебудови повнотекстового індексу локацій."""
+
+    help = 'Перебудовує повнотекстовий індекс локацій (SQLite FTS5).'
+
+    def handle(self, *args, **options) -> None:
+        """Перебудовує індекс, якщо база даних його підтримує."""
+        rebuild_search_index()
+        if fts_available():
+            self.stdout.write(self.style.SUCCESS('Індекс перебудовано.'))
+        else:
+            self.stdout.write(self.style.WARNING('FTS5 недоступний для цієї бази.'))
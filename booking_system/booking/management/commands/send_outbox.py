@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from booking.outbox import send_pending
+
+
+class Command(BaseCommand):
+    """Команда для надсилання листів з черги."""
+
+    help = 'Надсилає листи з черги пакетами через одне з’єднання.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--batch-size', type=int, default=50, help='Розмір пакета листів.'
+        )
+        parser.add_argument(
+            '--loop', action='store_true', help='Працювати безперервно.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Пауза між перевірками порожньої черги (у секундах).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Надсилає листи один раз або безперервно."""
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            processed = send_pending(batch_size)
+            total += processed
+            if not options['loop']:
+                if processed < batch_size:
+                    break
+            elif not processed:
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Оброблено листів: {total}'))
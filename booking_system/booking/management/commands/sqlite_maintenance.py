@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from booking.sqlite import CHECKPOINT_MODES, analyze, checkpoint
+
+
+class Command(BaseCommand):
+    """Команда для планового обслуговування бази даних SQLite."""
+
+    help = 'Переносить журнал WAL в основний файл (checkpoint) та виконує ANALYZE.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS, help='Псевдонім бази даних.'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=CHECKPOINT_MODES,
+            default='TRUNCATE',
+            help='Режим контрольної точки WAL.',
+        )
+        parser.add_argument(
+            '--skip-analyze',
+            action='store_true',
+            help='Не оновлювати статистику індексів.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Виконує контрольну точку та оновлює статистику."""
+        alias = options['database']
+        if connections[alias].vendor != 'sqlite':
+            raise CommandError(f'База даних {alias} не є SQLite.')
+
+        result = checkpoint(alias, options['mode'])
+        self.stdout.write(
+            f'Контрольна точка {options["mode"]}: сторінок у журналі '
+            f'{result["log"]}, перенесено {result["checkpointed"]}'
+            + (', завадили активні читачі' if result['busy'] else '')
+        )
+        if not options['skip_analyze']:
+            analyze(alias)
+            self.stdout.write('Статистику індексів оновлено.')
+
+        self.stdout.write(self.style.SUCCESS('Обслуговування завершено.'))
@@ -0,0 +1,49 @@
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from booking.holds import SWEEP_BATCH_SIZE, sweep_expired_holds
+
+
+class Command(BaseCommand):
+    """Команда для видалення прострочених непідтверджених бронювань."""
+
+    help = 'Видаляє непідтверджені бронювання, термін дії яких минув.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SWEEP_BATCH_SIZE,
+            help='Кількість бронювань, які видаляються в одній транзакції.',
+        )
+        parser.add_argument(
+            '--archive',
+            help='Файл JSONL, до якого дописуються видалені бронювання.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true', help='Працювати безперервно.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60.0,
+            help='Пауза між прибираннями (у секундах).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Видаляє прострочені бронювання один раз або безперервно."""
+        archive_path = options['archive']
+        with (
+            open(archive_path, 'a', encoding='utf-8') if archive_path else nullcontext()
+        ) as archive:
+            while True:
+                swept = sweep_expired_holds(options['batch_size'], archive)
+                self.stdout.write(
+                    self.style.SUCCESS(f'Видалено прострочених бронювань: {swept}')
+                )
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from booking.routers import copy_database, mark_replica_synced, replica_aliases
+
+
+class Command(BaseCommand):
+    """Команда для оновлення локальних SQLite-реплік з основної бази."""
+
+    help = 'Копіює основну базу даних у файли реплік з DATABASE_REPLICAS.'
+
+    def add_arguments(self, parser) -> None:
+        """Додає аргументи команди."""
+        parser.add_argument(
+            '--loop', action='store_true', help='Оновлювати репліки безперервно.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Пауза між оновленнями (у секундах), тобто відставання реплік.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Оновлює репліки один раз або безперервно."""
+        replicas = replica_aliases()
+        if not replicas:
+            self.stdout.write('Репліки не налаштовано (BOOKING_REPLICAS).')
+            return
+
+        while True:
+            for alias in replicas:
+                # Копія містить усе, що зафіксовано до початку копіювання
+                started = time.time()
+                copy_database(DEFAULT_DB_ALIAS, settings.DATABASES[alias]['NAME'])
+                mark_replica_synced(alias, started)
+            self.stdout.write(self.style.SUCCESS(f'Оновлено реплік: {len(replicas)}'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -1,10 +1,206 @@
 import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    FloatField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils.timezone import now
 
+# Можливі оцінки відгуків
+RATING_STARS = range(1, 6)
+
+
+def rating_stars_field(rating: int) -> str:
+    """
+    Повертає назву поля локації з кількістю відгуків із заданою оцінкою.
+
+    Args:
+        rating (int): Оцінка від 1 до 5.
+
+    Returns:
+        str: Назва поля.
+    """
+    return f'rating_{rating}_count'
+
+
+def rating_expression(rating_sum: Any, rating_count: Any) -> Coalesce:
+    """
+    Будує SQL-вираз середнього рейтингу із суми та кількості оцінок.
+
+    Args:
+        rating_sum (Any): Вираз суми оцінок.
+        rating_count (Any): Вираз кількості оцінок.
+
+    Returns:
+        Coalesce: Середній рейтинг або 0, якщо оцінок немає.
+    """
+    return Coalesce(
+        Cast(rating_sum, FloatField()) / NullIf(rating_count, 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+class LocationQuerySet(models.QuerySet):
+    """Набір запитів для локацій."""
+
+    def bump_version(self, **fields: Any) -> int:
+        """
+        Оновлює поля локацій та збільшує версію їхнього вмісту.
+
+        Args:
+            **fields (Any): Додаткові поля для оновлення.
+
+        Returns:
+            int: Кількість оновлених локацій.
+        """
+        return self.update(content_version=F('content_version') + 1, **fields)
+
+    def adjust_rating(
+        self, added: Optional[int] = None, removed: Optional[int] = None
+    ) -> int:
+        """
+        Атомарно змінює агрегати рейтингу та розподіл оцінок без читання відгуків.
+
+        Args:
+            added (Optional[int]): Оцінка, яка додається.
+            removed (Optional[int]): Оцінка, яка прибирається.
+
+        Returns:
+            int: Кількість оновлених локацій.
+        """
+        stars: Dict[str, Any] = {}
+        for rating, delta in ((added, 1), (removed, -1)):
+            if rating is not None:
+                field = rating_stars_field(rating)
+                stars[field] = stars.get(field, F(field)) + delta
+
+        rating_sum = F('rating_sum') + (added or 0) - (removed or 0)
+        rating_count = (
+            F('rating_count') + int(added is not None) - int(removed is not None)
+        )
+        return self.bump_version(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_expression(rating_sum, rating_count),
+            **stars,
+        )
+
+    def adjust_reactions(self, like_delta: int = 0, dislike_delta: int = 0) -> int:
+        """
+        Атомарно змінює лічильники лайків та дизлайків.
+
+        Args:
+            like_delta (int): Зміна кількості лайків.
+            dislike_delta (int): Зміна кількості дизлайків.
+
+        Returns:
+            int: Кількість оновлених локацій.
+        """
+        fields = {}
+        if like_delta:
+            fields['like_count'] = F('like_count') + like_delta
+        if dislike_delta:
+            fields['dislike_count'] = F('dislike_count') + dislike_delta
+        return self.bump_version(**fields) if fields else 0
+
+    def rebuild_reactions(self) -> int:
+        """
+        Перераховує лічильники реакцій одним згрупованим UPDATE.
+
+        Returns:
+            int: Кількість оновлених локацій.
+        """
+        reactions = (
+            Reaction.objects.filter(location=OuterRef('pk'))
+            .order_by()
+            .values('location')
+        )
+
+        def count(reaction_type: str) -> Coalesce:
+            return Coalesce(
+                Subquery(
+                    reactions.filter(reaction_type=reaction_type)
+                    .annotate(total=Count('pk'))
+                    .values('total')
+                ),
+                0,
+            )
+
+        return self.bump_version(
+            like_count=count('like'), dislike_count=count('dislike')
+        )
+
+    def rebuild_ratings(self) -> int:
+        """
+        Перераховує агрегати рейтингу одним згрупованим UPDATE.
+
+        Returns:
+            int: Кількість оновлених локацій.
+        """
+        reviews = (
+            Review.objects.filter(location=OuterRef('pk')).order_by().values('location')
+        )
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0
+        )
+        rating_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+        )
+        stars = {
+            rating_stars_field(rating): Coalesce(
+                Subquery(
+                    reviews.filter(rating=rating)
+                    .annotate(total=Count('pk'))
+                    .values('total')
+                ),
+                0,
+            )
+            for rating in RATING_STARS
+        }
+        return self.bump_version(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_expression(rating_sum, rating_count),
+            **stars,
+        )
+
+    def with_booking_status(self, at: Optional[datetime] = None) -> 'LocationQuerySet':
+        """
+        Додає до кожної локації ознаку зайнятості `booked_now` одним запитом.
+
+        Args:
+            at (Optional[datetime]): Момент перевірки, за замовчуванням зараз.
+
+        Returns:
+            LocationQuerySet: Локації з анотацією `booked_now`.
+        """
+        at = at or now()
+        return self.annotate(
+            booked_now=Exists(
+                Booking.objects.filter(
+                    location=OuterRef('pk'),
+                    confirmed=True,
+                    start_time__lte=at,
+                    end_time__gte=at,
+                )
+            )
+        )
+
 
 class Location(models.Model):
     """Локація, яку можна забронювати."""
@@ -17,50 +213,102 @@ class Location(models.Model):
     amount = models.PositiveIntegerField('Місткість локації')
     description = models.TextField('Опис локації')
     photo = models.URLField('Зображення')
+    # Хеш вмісту фото, за яким віддаються зменшені варіанти (команда build_images)
+    photo_digest = models.CharField(
+        'Хеш зображення', max_length=64, blank=True, editable=False
+    )
+    photo_width = models.PositiveIntegerField(
+        'Ширина зображення', default=0, editable=False
+    )
     price_per_night = models.DecimalField(
         'Ціна за ніч', max_digits=10, decimal_places=2
     )
-    rating = models.PositiveSmallIntegerField(
+    rating = models.DecimalField(
         'Рейтинг',
+        max_digits=3,
+        decimal_places=2,
         validators=[MinValueValidator(0), MaxValueValidator(5)],
         default=0,
         editable=False,
     )
+    rating_sum = models.PositiveIntegerField('Сума оцінок', default=0, editable=False)
+    rating_count = models.PositiveIntegerField(
+        'Кількість оцінок', default=0, editable=False
+    )
+    # Розподіл оцінок для гістограми рейтингу
+    rating_1_count = models.PositiveIntegerField(
+        'Кількість оцінок 1', default=0, editable=False
+    )
+    rating_2_count = models.PositiveIntegerField(
+        'Кількість оцінок 2', default=0, editable=False
+    )
+    rating_3_count = models.PositiveIntegerField(
+        'Кількість оцінок 3', default=0, editable=False
+    )
+    rating_4_count = models.PositiveIntegerField(
+        'Кількість оцінок 4', default=0, editable=False
+    )
+    rating_5_count = models.PositiveIntegerField(
+        'Кількість оцінок 5', default=0, editable=False
+    )
     like_count = models.PositiveIntegerField(
         'Кількість лайків', default=0, editable=False
     )
     dislike_count = models.PositiveIntegerField(
         'Кількість дизлайків', default=0, editable=False
     )
+    content_version = models.PositiveIntegerField(
+        'Версія вмісту', default=0, editable=False
+    )
 
-    def update_rating(self) -> None:
-        """Оновлює рейтинг локації на основі всіх відгуків."""
-        reviews = self.reviews.all()
-        total_rating = sum(review.rating for review in reviews)
-        self.rating = total_rating / reviews.count() if reviews.exists() else 0.0
-        self.save()
-
-    def update_like_count(self) -> None:
-        """Оновлює кількість лайків для локації."""
-        self.like_count = Reaction.objects.filter(reaction_type='like').count()
-        self.save()
+    objects = LocationQuerySet.as_manager()
 
-    def update_dislike_count(self) -> None:
-        """Оновлює кількість дизлайків для локації."""
-        self.dislike_count = Reaction.objects.filter(reaction_type='dislike').count()
-        self.save()
+    def save(self, *args, **kwargs) -> None:
+        """Зберігає локацію та збільшує версію її вмісту."""
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+
+        if Location.objects.filter(pk=self.pk).exclude(photo=self.photo).exists():
+            # Варіанти старого фото більше не відповідають локації
+            self.photo_digest = ''
+            self.photo_width = 0
+        self.content_version = F('content_version') + 1
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['content_version'])
 
     def is_booked(self) -> bool:
         """
         Перевіряє, чи заброньована локація в даний момент.
 
+        Якщо локацію отримано через `with_booking_status`, запит не виконується.
+
         Returns:
             bool: True, якщо локація заброньована, інакше False.
         """
+        if hasattr(self, 'booked_now'):
+            return self.booked_now
+
+        current_time = now()
         return self.bookings.filter(
-            start_time__lte=now(), end_time__gte=now(), confirmed=True
+            start_time__lte=current_time, end_time__gte=current_time, confirmed=True
         ).exists()
 
+    def rating_histogram(self) -> List[Tuple[int, int, int]]:
+        """
+        Повертає розподіл оцінок без читання відгуків.
+
+        Returns:
+            List[Tuple[int, int, int]]: Оцінка (від 5 до 1), кількість відгуків
+                та їхня частка у відсотках.
+        """
+        histogram = []
+        for rating in reversed(RATING_STARS):
+            count = getattr(self, rating_stars_field(rating))
+            share = round(count * 100 / self.rating_count) if self.rating_count else 0
+            histogram.append((rating, count, share))
+        return histogram
+
     def __str__(self) -> str:
         """
         Магічний метод, який повертає рядок з назвою локації.
@@ -76,6 +324,18 @@ class Location(models.Model):
         verbose_name = 'Локація'
         verbose_name_plural = 'Локації'
         ordering = ['amount']
+        # Індекси для посторінкового виведення за кожним варіантом сортування
+        indexes = [
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['price_per_night', 'id']),
+            models.Index(fields=['-rating', 'id']),
+            # Покриває групування фасетів і фільтри країна → область → місто
+            models.Index(
+                fields=['country', 'region', 'city', 'price_per_night', 'amount']
+            ),
+            models.Index(fields=['city', 'price_per_night']),
+            models.Index(fields=['amount', 'price_per_night']),
+        ]
 
 
 class Booking(models.Model):
@@ -91,6 +351,40 @@ class Booking(models.Model):
     activation_code = models.UUIDField(
         'Код активації', default=uuid.uuid4, editable=False, unique=True
     )
+    # Непідтверджене бронювання тримає проміжок лише до цього часу
+    expires_at = models.DateTimeField('Бронь діє до', null=True, blank=True)
+    # Ціна на момент бронювання: подальші зміни тарифу локації її не змінюють
+    nightly_rate = models.DecimalField(
+        'Ціна за ніч', max_digits=10, decimal_places=2, null=True, editable=False
+    )
+    nights = models.PositiveIntegerField('Кількість ночей', null=True, editable=False)
+    price_total = models.DecimalField(
+        'Загальна вартість', max_digits=12, decimal_places=2, null=True, editable=False
+    )
+
+    # Чи було бронювання підтверджене в базі даних на момент завантаження
+    _confirmed_in_db = False
+
+    @classmethod
+    def from_db(cls, db: str, field_names: List[str], values: List) -> 'Booking':
+        """Запам'ятовує стан підтвердження, завантажений з бази даних."""
+        instance = super().from_db(db, field_names, values)
+        # Без завантаженого поля стан невідомий, тож вважається підтвердженим
+        instance._confirmed_in_db = instance.__dict__.get('confirmed', True)
+        return instance
+
+    def is_expired(self) -> bool:
+        """
+        Перевіряє, чи минув час на підтвердження бронювання.
+
+        Returns:
+            bool: True для непідтвердженого бронювання з минулим терміном.
+        """
+        return (
+            not self.confirmed
+            and self.expires_at is not None
+            and self.expires_at <= now()
+        )
 
     def total_days(self) -> int:
         """
@@ -101,13 +395,24 @@ class Booking(models.Model):
         """
         return (self.end_time - self.start_time).days
 
-    def total_price(self) -> float:
+    def capture_price(self) -> None:
+        """Фіксує поточну ціну локації та вартість бронювання."""
+        self.nightly_rate = self.location.price_per_night
+        self.nights = self.total_days()
+        self.price_total = self.nightly_rate * self.nights
+
+    def total_price(self) -> Decimal:
         """
         Повертає загальну вартість бронювання.
 
+        Бронювання без зафіксованої ціни (створені до її появи)
+        розраховуються за поточною ціною локації.
+
         Returns:
-            float: Вартість бронювання.
+            Decimal: Вартість бронювання.
         """
+        if self.price_total is not None:
+            return self.price_total
         return self.total_days() * self.location.price_per_night
 
     def __str__(self) -> str:
@@ -125,6 +430,16 @@ class Booking(models.Model):
         verbose_name = 'Бронювання'
         verbose_name_plural = 'Бронювання'
         ordering = ['start_time']
+        indexes = [
+            # Історія бронювань у профілі: майбутні та минулі по сторінках
+            models.Index(fields=['user', 'start_time', 'id']),
+            # Лише живі непідтверджені бронювання, які перебирає прибиральник
+            models.Index(
+                fields=['expires_at'],
+                name='booking_hold_expiry_idx',
+                condition=Q(confirmed=False),
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -141,9 +456,31 @@ class Review(models.Model):
     created_at = models.DateTimeField('Дата створення', auto_now_add=True)
 
     def save(self, *args, **kwargs) -> None:
-        """Зберігає відгук та оновлює рейтинг локації."""
-        super().save(*args, **kwargs)
-        self.location.update_rating()
+        """Зберігає відгук та оновлює рейтинг і версію локації в одній транзакції."""
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = (
+                    Review.objects.filter(pk=self.pk)
+                    .values_list('location_id', 'rating')
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+            locations = Location.objects.filter(pk=self.location_id)
+            if previous is None:
+                locations.adjust_rating(added=self.rating)
+            elif previous[0] != self.location_id:
+                Location.objects.filter(pk=previous[0]).adjust_rating(
+                    removed=previous[1]
+                )
+                locations.adjust_rating(added=self.rating)
+            elif previous[1] != self.rating:
+                locations.adjust_rating(added=self.rating, removed=previous[1])
+            else:
+                # Змінився лише текст, але фрагмент відгуку залежить від версії
+                locations.bump_version()
 
     def __str__(self) -> str:
         """
@@ -161,6 +498,8 @@ class Review(models.Model):
         verbose_name_plural = 'Відгуки'
         unique_together = ('user', 'location')
         ordering = ['-created_at']
+        # Сторінки відгуків локації від найновіших
+        indexes = [models.Index(fields=['location', 'created_at', 'id'])]
 
 
 class Reaction(models.Model):
@@ -221,7 +560,22 @@ class Advertisement(models.Model):
     title = models.CharField('Заголовок реклами', max_length=255)
     link = models.URLField('Посилання на вебсайт')
     image_url = models.URLField('Зображення')
+    image_digest = models.CharField(
+        'Хеш зображення', max_length=64, blank=True, editable=False
+    )
+    image_width = models.PositiveIntegerField(
+        'Ширина зображення', default=0, editable=False
+    )
     is_active = models.BooleanField('Активне', default=True)
+    weight = models.PositiveSmallIntegerField(
+        'Вага показу', default=1, validators=[MinValueValidator(1)]
+    )
+    max_impressions = models.PositiveIntegerField(
+        'Ліміт показів', null=True, blank=True
+    )
+    impressions = models.PositiveIntegerField(
+        'Кількість показів', default=0, editable=False
+    )
     created_at = models.DateTimeField('Дата створення', auto_now_add=True)
 
     def __str__(self) -> str:
@@ -233,8 +587,101 @@ class Advertisement(models.Model):
         """
         return self.title
 
+    def save(self, *args, **kwargs) -> None:
+        """Зберігає рекламу, скидаючи хеш і ширину зображення після зміни адреси."""
+        if (
+            not self._state.adding
+            and Advertisement.objects.filter(pk=self.pk)
+            .exclude(image_url=self.image_url)
+            .exists()
+        ):
+            self.image_digest = ''
+            self.image_width = 0
+        super().save(*args, **kwargs)
+
     class Meta:
         """Метаклас моделі, який визначає метадані моделі."""
 
         verbose_name = 'Реклама'
         verbose_name_plural = 'Реклама'
+
+
+class OutboxEmail(models.Model):
+    """Лист, який очікує надсилання фоновим обробником."""
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_OPTIONS = (
+        (PENDING, 'Очікує надсилання'),
+        (SENT, 'Надіслано'),
+        (FAILED, 'Помилка'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст', blank=True)
+    html_message = models.TextField('HTML', blank=True)
+    from_email = models.CharField('Відправник', max_length=255, blank=True)
+    recipients = models.JSONField('Отримувачі', default=list)
+    status = models.CharField(
+        'Статус', max_length=7, choices=STATUS_OPTIONS, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Кількість спроб', default=0)
+    next_attempt_at = models.DateTimeField('Наступна спроба', default=now)
+    claimed_by = models.UUIDField('Обробник', null=True, blank=True, editable=False)
+    last_error = models.TextField('Остання помилка', blank=True)
+    created_at = models.DateTimeField('Дата створення', auto_now_add=True)
+    sent_at = models.DateTimeField('Дата надсилання', null=True, blank=True)
+
+    def __str__(self) -> str:
+        """
+        Магічний метод, який повертає опис листа.
+
+        Returns:
+            str: Опис листа.
+        """
+        return f'{self.subject} ({", ".join(self.recipients)})'
+
+    class Meta:
+        """Метаклас моделі, який визначає метадані моделі."""
+
+        verbose_name = 'Лист у черзі'
+        verbose_name_plural = 'Черга листів'
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+
+class SearchDocumentField(models.TextField):
+    """Прихований стовпець FTS5-таблиці, який підтримує пошук `match`."""
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    """Умова повнотекстового пошуку FTS5 (`MATCH`)."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection) -> tuple:
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class LocationSearchDocument(models.Model):
+    """Запис повнотекстового індексу локації (віртуальна таблиця SQLite FTS5)."""
+
+    location = models.OneToOneField(
+        Location,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='search_document',
+    )
+    document = SearchDocumentField(db_column='booking_location_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        """Метаклас моделі, який визначає метадані моделі."""
+
+        managed = False
+        db_table = 'booking_location_fts'
@@ -0,0 +1,171 @@
+import logging
+import smtplib
+import uuid
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils.timezone import now
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+RETRY_DELAY = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 30)
+MAX_RETRY_DELAY = getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 3600)
+# Скільки секунд лист вважається зайнятим обробником
+CLAIM_TIMEOUT = getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 300)
+# Помилки доставки, після яких лист надсилається повторно; решта (помилки в
+# коді) не ховаються за повторами
+DELIVERY_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def enqueue_email(
+    subject: str,
+    body: str,
+    from_email: Optional[str],
+    recipients: List[str],
+    html_message: str = '',
+) -> OutboxEmail:
+    """
+    Додає лист до черги. Виклик варто робити в транзакції разом з даними.
+
+    Args:
+        subject (str): Тема листа.
+        body (str): Текст листа.
+        from_email (Optional[str]): Відправник.
+        recipients (List[str]): Отримувачі.
+        html_message (str): HTML-версія листа.
+
+    Returns:
+        OutboxEmail: Створений запис черги.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_message=html_message,
+        from_email=from_email or '',
+        recipients=recipients,
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Розраховує затримку перед наступною спробою (експоненційно).
+
+    Args:
+        attempts (int): Кількість уже зроблених спроб.
+
+    Returns:
+        timedelta: Затримка.
+    """
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def claim_batch(batch_size: int) -> List[OutboxEmail]:
+    """
+    Резервує пакет листів за обробником без блокувань рядків.
+
+    Args:
+        batch_size (int): Максимальна кількість листів.
+
+    Returns:
+        List[OutboxEmail]: Зарезервовані листи.
+    """
+    current_time = now()
+    token = uuid.uuid4()
+    due = OutboxEmail.objects.filter(
+        status=OutboxEmail.PENDING, next_attempt_at__lte=current_time
+    )
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    # Рядки, які встиг забрати інший обробник, не оновляться
+    due.filter(pk__in=ids).update(
+        claimed_by=token,
+        next_attempt_at=current_time + timedelta(seconds=CLAIM_TIMEOUT),
+    )
+    return list(OutboxEmail.objects.filter(claimed_by=token))
+
+
+def send_pending(batch_size: int = 50) -> int:
+    """
+    Надсилає пакет листів з черги через одне з'єднання з поштовим сервером.
+
+    Args:
+        batch_size (int): Максимальна кількість листів.
+
+    Returns:
+        int: Кількість оброблених листів.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except DELIVERY_ERRORS as error:
+        logger.warning('Не вдалося підключитися до поштового сервера: %s', error)
+        for email in emails:
+            mark_failed(email, error)
+        return len(emails)
+
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                email.subject,
+                email.body,
+                email.from_email or None,
+                email.recipients,
+                connection=connection,
+            )
+            if email.html_message:
+                message.attach_alternative(email.html_message, 'text/html')
+
+            try:
+                message.send()
+            except DELIVERY_ERRORS as error:
+                logger.warning('Не вдалося надіслати лист %s: %s', email.pk, error)
+                mark_failed(email, error)
+            else:
+                email.status = OutboxEmail.SENT
+                email.sent_at = now()
+                email.attempts += 1
+                email.claimed_by = None
+                email.save(
+                    update_fields=['status', 'sent_at', 'attempts', 'claimed_by']
+                )
+    finally:
+        connection.close()
+
+    return len(emails)
+
+
+def mark_failed(email: OutboxEmail, error: Exception) -> None:
+    """
+    Записує невдалу спробу та планує повторну з експоненційною затримкою.
+
+    Args:
+        email (OutboxEmail): Лист.
+        error (Exception): Помилка надсилання.
+    """
+    email.attempts += 1
+    email.last_error = str(error)
+    email.claimed_by = None
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = now() + retry_delay(email.attempts)
+    email.save(
+        update_fields=[
+            'attempts',
+            'last_error',
+            'claimed_by',
+            'status',
+            'next_attempt_at',
+        ]
+    )
@@ -0,0 +1,105 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Model, Q, QuerySet
+
+
+class InvalidCursor(ValueError):
+    """Курсор сторінки пошкоджений або не відповідає сортуванню."""
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Кодує значення ключа сортування останнього запису в курсор.
+
+    Args:
+        values (List[Any]): Значення полів сортування.
+
+    Returns:
+        str: Курсор для URL.
+    """
+    data = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Декодує курсор сторінки.
+
+    Args:
+        cursor (str): Курсор з URL.
+        size (int): Очікувана кількість значень.
+
+    Raises:
+        InvalidCursor: Якщо курсор неможливо декодувати.
+
+    Returns:
+        List[str]: Значення полів сортування.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return values
+
+
+def keyset_paginate(
+    queryset: QuerySet,
+    ordering: List[str],
+    cursor: Optional[str],
+    page_size: int,
+) -> Tuple[List[Model], Optional[str]]:
+    """
+    Повертає сторінку записів після курсора без використання OFFSET.
+
+    Останнє поле сортування має бути унікальним (наприклад, `id`), тоді
+    вартість будь-якої сторінки однакова і визначається індексом.
+
+    Args:
+        queryset (QuerySet): Відфільтровані записи.
+        ordering (List[str]): Поля сортування, `-` означає спадання.
+        cursor (Optional[str]): Курсор попередньої сторінки.
+        page_size (int): Розмір сторінки.
+
+    Raises:
+        InvalidCursor: Якщо курсор неможливо декодувати.
+
+    Returns:
+        Tuple[List[Model], Optional[str]]: Записи та курсор наступної сторінки.
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    queryset = queryset.order_by(*ordering)
+
+    try:
+        if cursor:
+            values = decode_cursor(cursor, len(fields))
+            # (a > x) OR (a = x AND b > y) OR ...
+            condition = Q()
+            for position, field in enumerate(ordering):
+                lookup = 'lt' if field.startswith('-') else 'gt'
+                step = Q(**{f'{fields[position]}__{lookup}': values[position]})
+                for previous in range(position):
+                    step &= Q(**{fields[previous]: values[previous]})
+                condition |= step
+            queryset = queryset.filter(condition)
+        items = list(queryset[: page_size + 1])
+    except InvalidCursor:
+        raise
+    # Значення неправильного типу відхиляє поле під час побудови фільтра
+    # (ValueError, TypeError) або під час виконання запиту (ValidationError)
+    except (ValueError, TypeError, ValidationError) as error:
+        raise InvalidCursor(cursor) from error
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in fields])
+
+    return items, next_cursor
@@ -0,0 +1,227 @@
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from typing import Callable, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+# Скільки кадрів стеку переглядати в пошуках вузла шаблону
+TEMPLATE_FRAME_DEPTH = 80
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Нормалізує SQL, щоб однакові запити з різними параметрами збігалися.
+
+    Args:
+        sql (str): SQL з плейсхолдерами параметрів.
+
+    Returns:
+        str: Відбиток запиту.
+    """
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    # Списки IN різної довжини дають той самий відбиток
+    return re.sub(r'IN \((?:%s, )*%s\)', 'IN (...)', sql)
+
+
+def template_line() -> Optional[str]:
+    """
+    Знаходить рядок шаблону, під час рендерингу якого виконується запит.
+
+    Returns:
+        Optional[str]: `шаблон:рядок` або None, якщо запит не з шаблону.
+    """
+    frame = sys._getframe(2)
+    for _ in range(TEMPLATE_FRAME_DEPTH):
+        if frame is None:
+            break
+        node = frame.f_locals.get('self')
+        # type() не обчислює ліниві об'єкти, на відміну від isinstance()
+        if issubclass(type(node), Node) and getattr(node, 'token', None) is not None:
+            return f'{node.origin.name}:{node.token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """Записує запити до бази даних: кількість, час і місце виклику."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+        # Рядки шаблонів, з яких виконувався кожен відбиток
+        self.template_lines: Dict[str, List[str]] = {}
+
+    def __call__(self, execute: Callable, sql: str, params, many: bool, context):
+        """Обгортка `execute_wrapper`, яка вимірює кожен запит."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] += 1
+            # Рядок шукається й для першого виконання: заздалегідь невідомо,
+            # чи повториться запит, а перше виконання може бути з іншого рядка
+            line = template_line()
+            if line is not None:
+                lines = self.template_lines.setdefault(key, [])
+                if line not in lines:
+                    lines.append(line)
+
+    def duplicates(self) -> Dict[str, int]:
+        """
+        Повертає відбитки, які виконувалися більше одного разу.
+
+        Returns:
+            Dict[str, int]: Відбиток та кількість виконань.
+        """
+        return {key: count for key, count in self.fingerprints.items() if count > 1}
+
+    def report(self) -> str:
+        """
+        Формує опис запитів для журналу чи повідомлення тесту.
+
+        Returns:
+            str: Кількість запитів, час і повторювані запити з рядками шаблонів.
+        """
+        lines = [f'{self.count} запитів, {self.duration * 1000:.1f} мс у базі даних']
+        for key, count in sorted(self.duplicates().items(), key=lambda item: -item[1]):
+            lines.append(f'  {count}× {key}')
+            for line in self.template_lines.get(key, []):
+                lines.append(f'      шаблон {line}')
+        return '\n'.join(lines)
+
+
+class record_queries(ContextDecorator):
+    """Записує запити до всіх баз даних у межах блоку."""
+
+    def __enter__(self) -> QueryRecorder:
+        self.recorder = QueryRecorder()
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self.recorder))
+        return self.recorder
+
+    def __exit__(self, *exc_info) -> None:
+        self._stack.close()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Блок коду виконав більше запитів, ніж дозволено."""
+
+
+class query_budget(record_queries):
+    """
+    Перевіряє, що блок коду чи тест виконує не більше N запитів.
+
+    Використовується як менеджер контексту (`with query_budget(5):`) або
+    декоратор (`@query_budget(5)`). Повідомлення про порушення містить
+    повторювані запити та рядки шаблонів, з яких вони виконувалися.
+    """
+
+    def __init__(self, max_queries: int) -> None:
+        self.max_queries = max_queries
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        super().__exit__(exc_type, *exc_info)
+        if exc_type is None and self.recorder.count > self.max_queries:
+            raise QueryBudgetExceeded(
+                f'Перевищено ліміт {self.max_queries} запитів: {self.recorder.report()}'
+            )
+
+
+class QueryBudgetMiddleware:
+    """
+    Записує запити кожного HTTP-запиту та журналює перевищення ліміту.
+
+    Ліміти задаються в `QUERY_BUDGETS` для назв маршрутів (наприклад,
+    `booking:index`), `QUERY_BUDGET_DEFAULT` діє для решти маршрутів.
+    Працює лише з `QUERY_BUDGET_ENABLED` (типово дорівнює `DEBUG`), щоб
+    облік кожного запиту не сповільнював продакшн. Підтримує синхронний і
+    асинхронний ланцюжки, тому під ASGI не додає перемикань між потоками.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        self.default = getattr(settings, 'QUERY_BUDGET_DEFAULT', None)
+        enabled = getattr(settings, 'QUERY_BUDGET_ENABLED', settings.DEBUG)
+        if not enabled or (not self.budgets and self.default is None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Виконує запит і перевіряє кількість звернень до бази даних.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Асинхронна версія `__call__`.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        # З'єднання з базою прив'язані до потоку, тому запити записуються
+        # в потоці, де асинхронна ORM виконує запити цього HTTP-запиту
+        recording = record_queries()
+        recorder = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+        self.check(request, recorder)
+        return response
+
+    def check(self, request: HttpRequest, recorder: QueryRecorder) -> None:
+        """
+        Журналює перевищення ліміту запитів маршруту.
+
+        Args:
+            request (HttpRequest): Запит.
+            recorder (QueryRecorder): Записані запити.
+        """
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        budget = self.budgets.get(view_name, self.default)
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                'Перевищено ліміт запитів для %s (%s, ліміт %s): %s',
+                view_name,
+                request.path,
+                budget,
+                recorder.report(),
+            )
@@ -0,0 +1,174 @@
+from typing import Callable, Optional, TypeVar
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from .availability import availability
+from .holds import hold_expiry
+from .models import Booking, Location
+from .routers import use_primary
+from .sqlite import is_lock_error, retry_on_lock
+
+T = TypeVar('T')
+
+
+class ReservationError(Exception):
+    """Бронювання неможливо зберегти."""
+
+
+class BookingConflict(ReservationError):
+    """Проміжок уже зайнятий підтвердженим бронюванням."""
+
+    def __init__(self) -> None:
+        super().__init__('Цей час уже зайнятий. Будь ласка, оберіть інший період.')
+
+
+class HoldExpired(ReservationError):
+    """Час на підтвердження бронювання минув."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            'Час на підтвердження бронювання минув. Будь ласка, забронюйте ще раз.'
+        )
+
+
+class ReservationBusy(ReservationError):
+    """Не вдалося отримати блокування локації."""
+
+    def __init__(self) -> None:
+        super().__init__('Сервіс зараз перевантажений. Будь ласка, спробуйте ще раз.')
+
+
+def lock_location(location_id: int) -> None:
+    """
+    Блокує локацію для запису до кінця поточної транзакції.
+
+    Там, де є `SELECT ... FOR UPDATE`, блокується рядок локації. SQLite його
+    не підтримує, тому рядок оновлюється без змін: перший запис у транзакції
+    одразу захоплює блокування бази даних.
+
+    Args:
+        location_id (int): Ідентифікатор локації.
+    """
+    locations = Location.objects.filter(pk=location_id)
+    if connection.features.has_select_for_update:
+        list(locations.select_for_update().values_list('pk', flat=True))
+    else:
+        locations.update(content_version=F('content_version'))
+
+
+def run_locked(location_id: int, func: Callable[[], T]) -> T:
+    """
+    Виконує функцію в транзакції під блокуванням локації.
+
+    Якщо база даних зайнята, транзакція повторюється з випадковою
+    експоненційною затримкою. Усі читання всередині йдуть до основної бази,
+    бо репліка може ще не містити конкурентних бронювань.
+
+    Args:
+        location_id (int): Ідентифікатор локації.
+        func (Callable[[], T]): Функція, яка виконується під блокуванням.
+
+    Raises:
+        ReservationBusy: Якщо блокування не вдалося отримати.
+
+    Returns:
+        T: Результат функції.
+    """
+
+    def attempt() -> T:
+        with use_primary(), transaction.atomic():
+            lock_location(location_id)
+            return func()
+
+    try:
+        return retry_on_lock(attempt)
+    except OperationalError as error:
+        # Всередині зовнішньої транзакції помилка передається далі як є
+        if is_lock_error(error) and not connection.in_atomic_block:
+            raise ReservationBusy() from error
+        raise
+
+
+def reserve_booking(
+    booking: Booking, on_reserved: Optional[Callable[[Booking], None]] = None
+) -> Booking:
+    """
+    Зберігає непідтверджене бронювання, якщо проміжок вільний.
+
+    Бронювання без терміну дії отримує його від моменту збереження
+    (`BOOKING_HOLD_TTL`), після чого його видаляє прибиральник. Ціна
+    фіксується за тарифом локації на момент бронювання.
+
+    Args:
+        booking (Booking): Нове бронювання.
+        on_reserved (Optional[Callable[[Booking], None]]): Дія в тій самій
+            транзакції після збереження (наприклад, лист з кодом активації).
+
+    Raises:
+        BookingConflict: Якщо проміжок уже зайнятий.
+        ReservationBusy: Якщо блокування не вдалося отримати.
+
+    Returns:
+        Booking: Збережене бронювання.
+    """
+
+    def reserve() -> Booking:
+        if not availability.is_free(
+            booking.location_id, booking.start_time, booking.end_time, strict=True
+        ):
+            raise BookingConflict()
+
+        if not booking.confirmed and booking.expires_at is None:
+            booking.expires_at = hold_expiry()
+        booking.capture_price()
+        booking.save()
+        if on_reserved is not None:
+            on_reserved(booking)
+        return booking
+
+    return run_locked(booking.location_id, reserve)
+
+
+def confirm_booking(booking: Booking) -> Booking:
+    """
+    Підтверджує бронювання, повторно перевіряючи перетини під блокуванням.
+
+    Args:
+        booking (Booking): Бронювання.
+
+    Raises:
+        BookingConflict: Якщо проміжок уже підтвердив хтось інший.
+        HoldExpired: Якщо час на підтвердження минув.
+        ReservationBusy: Якщо блокування не вдалося отримати.
+
+    Returns:
+        Booking: Підтверджене бронювання.
+    """
+
+    def confirm() -> Booking:
+        try:
+            booking.refresh_from_db(fields=['confirmed', 'expires_at'])
+        except Booking.DoesNotExist:
+            # Прибиральник уже видалив прострочене бронювання
+            raise HoldExpired() from None
+        if booking.confirmed:
+            return booking
+        if booking.is_expired():
+            raise HoldExpired()
+
+        if not availability.is_free(
+            booking.location_id,
+            booking.start_time,
+            booking.end_time,
+            exclude_booking_id=booking.pk,
+            strict=True,
+        ):
+            raise BookingConflict()
+
+        booking.confirmed = True
+        booking.expires_at = None
+        booking.save(update_fields=['confirmed', 'expires_at'])
+        return booking
+
+    return run_locked(booking.location_id, confirm)
@@ -0,0 +1,237 @@
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Type
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+
+# Cookie з часом останнього запису клієнта, яке закріплює читання за
+# основною базою, доки репліки не оновляться після цього запису
+PRIMARY_COOKIE = 'use_primary'
+# Час початку останнього оновлення кожної репліки (команда sync_replicas)
+REPLICA_SYNCED_KEY = 'booking:replicas:synced:{}'
+# Застосунки, які завжди читаються з основної бази: сесії, користувачі та
+# права мають бути актуальними одразу після входу чи зміни пароля
+PRIMARY_APP_LABELS = frozenset(('auth', 'sessions', 'contenttypes'))
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_use_primary: ContextVar[bool] = ContextVar('use_primary', default=False)
+
+
+def replica_aliases() -> List[str]:
+    """
+    Повертає псевдоніми реплік бази даних лише для читання.
+
+    Returns:
+        List[str]: Псевдоніми з `DATABASE_REPLICAS`.
+    """
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def mark_replica_synced(alias: str, synced_at: float) -> None:
+    """
+    Запам'ятовує, що репліка містить усі записи до вказаного часу.
+
+    Args:
+        alias (str): Псевдонім репліки.
+        synced_at (float): Час початку копіювання (Unix-час).
+    """
+    cache.set(REPLICA_SYNCED_KEY.format(alias), synced_at, timeout=None)
+
+
+def replicas_synced_at() -> Optional[float]:
+    """
+    Повертає час, до якого всі репліки містять записи основної бази.
+
+    Returns:
+        Optional[float]: Час найстарішого оновлення або None, якщо якусь
+            репліку ще не оновлювали.
+    """
+    replicas = replica_aliases()
+    synced = cache.get_many([REPLICA_SYNCED_KEY.format(alias) for alias in replicas])
+    if len(synced) != len(replicas):
+        return None
+    return min(synced.values())
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """
+    Спрямовує всі читання в межах блоку до основної бази даних.
+
+    Використовується як менеджер контексту або декоратор синхронних функцій.
+    """
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор, який читає з реплік, а записує в основну базу.
+
+    Читання повертаються до основної бази всередині `use_primary()` та
+    одразу після запису того самого клієнта (див. `ReplicaPinningMiddleware`).
+    """
+
+    def db_for_read(self, model: Type[Model], **hints) -> str:
+        """Обирає випадкову репліку або основну базу для читання."""
+        replicas = replica_aliases()
+        if (
+            not replicas
+            or _use_primary.get()
+            or model._meta.app_label in PRIMARY_APP_LABELS
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model: Type[Model], **hints) -> str:
+        """Усі записи йдуть в основну базу."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> Optional[bool]:
+        """Дозволяє зв'язки між об'єктами з основної бази та реплік."""
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> Optional[bool]:
+        """Репліки отримують схему разом із даними, а не міграціями."""
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """
+    Забезпечує читання власних записів під час роботи з репліками.
+
+    Запит, який змінює дані (не GET/HEAD), повністю працює з основною базою
+    і записує час запису в cookie. Запити цього клієнта читають з основної
+    бази, доки `sync_replicas` не почне оновлення всіх реплік після цього
+    часу: відставання реплік нічим не обмежене, тож фіксований строк не
+    гарантував би, що клієнт побачить свої зміни. Після оновлення cookie
+    видаляється.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def pinned(self, request: HttpRequest) -> bool:
+        """
+        Перевіряє, чи запит має читати з основної бази.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            bool: True для запитів із записом та клієнтів, чий останній запис
+                ще може бути відсутній у репліках.
+        """
+        if request.method not in SAFE_METHODS:
+            return True
+        written = request.COOKIES.get(PRIMARY_COOKIE)
+        if written is None:
+            return False
+        try:
+            written_at = float(written)
+        except ValueError:
+            return True
+        synced_at = replicas_synced_at()
+        return synced_at is None or synced_at <= written_at
+
+    def pin(
+        self, request: HttpRequest, response: HttpResponse, pinned: bool
+    ) -> HttpResponse:
+        """
+        Закріплює клієнта за основною базою після запиту із записом.
+
+        Args:
+            request (HttpRequest): Запит.
+            response (HttpResponse): Відповідь сервера.
+            pinned (bool): Чи читав запит з основної бази.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        if request.method not in SAFE_METHODS:
+            # Час після відповіді: транзакції запиту вже зафіксовані
+            response.set_cookie(PRIMARY_COOKIE, repr(time.time()), httponly=True)
+        elif not pinned and PRIMARY_COOKIE in request.COOKIES:
+            response.delete_cookie(PRIMARY_COOKIE)
+        return response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Виконує запит з потрібною базою для читання.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not replica_aliases():
+            return self.get_response(request)
+        if not self.pinned(request):
+            return self.pin(request, self.get_response(request), False)
+        with use_primary():
+            return self.pin(request, self.get_response(request), True)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Асинхронна версія `__call__`.
+
+        Змінна контексту копіюється в потоки `sync_to_async`, тому запити
+        асинхронної ORM теж бачать закріплення.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        if not replica_aliases():
+            return await self.get_response(request)
+        if not self.pinned(request):
+            return self.pin(request, await self.get_response(request), False)
+        with use_primary():
+            return self.pin(request, await self.get_response(request), True)
+
+
+def copy_database(alias: str, target: str) -> None:
+    """
+    Копіює SQLite-базу псевдоніма у файл через API резервного копіювання.
+
+    Використовується для локальної репліки: копія узгоджена навіть під час
+    записів в основну базу.
+
+    Args:
+        alias (str): Псевдонім бази-джерела.
+        target (str): Шлях до файлу репліки.
+    """
+    source = connections[alias]
+    source.ensure_connection()
+    destination = sqlite3.connect(target)
+    try:
+        source.connection.backup(destination)
+    finally:
+        destination.close()
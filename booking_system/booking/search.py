@@ -0,0 +1,181 @@
+import logging
+import re
+from functools import reduce
+from operator import or_
+from typing import List
+
+from django.db import DatabaseError, connection
+from django.db.models import Case, F, FloatField, Q, QuerySet, Value, When
+
+from .models import Location, LocationSearchDocument
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = LocationSearchDocument._meta.db_table
+# Поля повнотекстового індексу та їхня вага для ранжування bm25
+SEARCH_FIELDS = {
+    'name': 10.0,
+    'city': 4.0,
+    'region': 2.0,
+    'street': 2.0,
+    'description': 1.0,
+}
+
+_fts_available = None
+
+
+def fts_statements() -> List[str]:
+    """
+    Повертає SQL для створення FTS5-таблиці та тригерів синхронізації.
+
+    Returns:
+        List[str]: SQL-інструкції.
+    """
+    table = Location._meta.db_table
+    columns = ', '.join(SEARCH_FIELDS)
+    new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+    old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+
+    return [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {columns},
+            content='{table}',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns}
+        ON {table} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+    ]
+
+
+def install_search_index(using=connection) -> bool:
+    """
+    Створює повнотекстовий індекс локацій, якщо база даних його підтримує.
+
+    Args:
+        using: З'єднання з базою даних.
+
+    Returns:
+        bool: True, якщо індекс доступний.
+    """
+    global _fts_available
+
+    if using.vendor != 'sqlite':
+        _fts_available = False
+        return False
+
+    try:
+        with using.cursor() as cursor:
+            created = FTS_TABLE not in using.introspection.table_names(cursor)
+            for statement in fts_statements():
+                cursor.execute(statement)
+            if created:
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+                )
+            # Стовпець rank рахується за bm25 з вагами полів
+            weights = ', '.join(str(weight) for weight in SEARCH_FIELDS.values())
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES (%s, %s)',
+                ['rank', f'bm25({weights})'],
+            )
+    except DatabaseError as error:
+        logger.warning('FTS5 недоступний, пошук працюватиме без індексу: %s', error)
+        _fts_available = False
+        return False
+
+    _fts_available = True
+    return True
+
+
+def rebuild_search_index() -> None:
+    """Повністю перебудовує повнотекстовий індекс з таблиці локацій."""
+    if install_search_index():
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def fts_available() -> bool:
+    """
+    Перевіряє, чи можна використовувати повнотекстовий індекс.
+
+    Returns:
+        bool: True, якщо індекс доступний.
+    """
+    if _fts_available is None:
+        return install_search_index()
+    return _fts_available
+
+
+def match_expression(query: str) -> str:
+    """
+    Перетворює пошуковий запит на вираз FTS5 з префіксним пошуком.
+
+    Args:
+        query (str): Пошуковий запит користувача.
+
+    Returns:
+        str: Вираз MATCH, порожній, якщо у запиті немає слів.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_locations(locations: QuerySet, query: str) -> QuerySet:
+    """
+    Фільтрує локації за пошуковим запитом та додає релевантність.
+
+    Менше значення `search_rank` означає релевантніший результат. Без FTS5
+    пошук виконується через `icontains` по всіх полях, а назва має пріоритет.
+
+    Args:
+        locations (QuerySet): Локації.
+        query (str): Пошуковий запит.
+
+    Returns:
+        QuerySet: Знайдені локації з анотацією `search_rank`.
+    """
+    if fts_available():
+        match = match_expression(query)
+        if not match:
+            return locations.none()
+
+        return locations.filter(search_document__document__match=match).annotate(
+            search_rank=F('search_document__rank')
+        )
+
+    terms = query.split()
+    if not terms:
+        return locations.none()
+
+    conditions = [
+        reduce(or_, (Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS))
+        for term in terms
+    ]
+    return locations.filter(*conditions).annotate(
+        search_rank=Case(
+            When(name__icontains=query, then=Value(0.0)),
+            default=Value(1.0),
+            output_field=FloatField(),
+        )
+    )
@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Iterator
+
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .ads import advertisement_pool
+from .availability import availability
+from .facets import facet_index, facet_key
+from .favourites import invalidate_favourites
+from .models import Advertisement, Booking, Favourite, Location, Reaction, Review
+from .search import install_search_index
+
+# Видалення реакцій, лічильники яких зменшує сам викликач за кількістю рядків
+_reactions_counted: ContextVar[bool] = ContextVar('reactions_counted', default=False)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance: Booking, **kwargs) -> None:
+    """Оновлює індекс зайнятості та версію локації після збереження бронювання."""
+    was_confirmed = instance._confirmed_in_db
+    instance._confirmed_in_db = instance.confirmed
+    if not instance.confirmed and not was_confirmed:
+        # Непідтверджене бронювання не займає проміжок, тож нова бронь не
+        # скидає індекс у всіх процесах і кеш фрагментів локації
+        return
+    Location.objects.filter(pk=instance.location_id).bump_version()
+    transaction.on_commit(
+        partial(
+            availability.booking_saved,
+            instance.pk,
+            instance.location_id,
+            instance.start_time,
+            instance.end_time,
+            instance.confirmed,
+        )
+    )
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance: Booking, **kwargs) -> None:
+    """Оновлює індекс зайнятості та версію локації після видалення бронювання."""
+    if not instance.confirmed:
+        # Непідтверджені бронювання не займають проміжок, тож прибирання
+        # прострочених не скидає індекс і кеш фрагментів локацій
+        return
+    Location.objects.filter(pk=instance.location_id).bump_version()
+    transaction.on_commit(
+        partial(availability.booking_deleted, instance.pk, instance.location_id)
+    )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance: Review, **kwargs) -> None:
+    """Віднімає оцінку видаленого відгуку в транзакції видалення."""
+    Location.objects.filter(pk=instance.location_id).adjust_rating(
+        removed=instance.rating
+    )
+
+
+def reaction_delta(reaction: Reaction, delta: int) -> dict:
+    """
+    Повертає зміну лічильника для типу реакції.
+
+    Args:
+        reaction (Reaction): Реакція.
+        delta (int): Зміна (+1 або -1).
+
+    Returns:
+        dict: Аргументи для `LocationQuerySet.adjust_reactions`.
+    """
+    return {f'{reaction.reaction_type}_delta': delta}
+
+
+@contextmanager
+def reactions_counted() -> Iterator[None]:
+    """
+    Вимикає зменшення лічильників у `reaction_deleted` всередині блоку.
+
+    Використовується, коли викликач сам віднімає кількість справді
+    видалених рядків: post_delete спрацьовує і для рядка, який уже видалив
+    конкурентний запит, тож сигнал відняв би реакцію двічі.
+
+    Yields:
+        None: Блок, у якому видалення не змінюють лічильники.
+    """
+    token = _reactions_counted.set(True)
+    try:
+        yield
+    finally:
+        _reactions_counted.reset(token)
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance: Reaction, created: bool, **kwargs) -> None:
+    """Збільшує лічильник реакцій локації в транзакції створення."""
+    if created:
+        Location.objects.filter(pk=instance.location_id).adjust_reactions(
+            **reaction_delta(instance, 1)
+        )
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance: Reaction, **kwargs) -> None:
+    """
+    Зменшує лічильник реакцій локації в транзакції видалення.
+
+    Охоплює каскадні видалення (користувача, локації), адмінку та інший
+    код. `views.toggle_reaction` віднімає сам у блоці `reactions_counted`.
+    """
+    if not _reactions_counted.get():
+        Location.objects.filter(pk=instance.location_id).adjust_reactions(
+            **reaction_delta(instance, -1)
+        )
+
+
+@receiver(post_migrate)
+def create_search_index(sender, using: str, **kwargs) -> None:
+    """Створює повнотекстовий індекс локацій після міграцій."""
+    if sender.name == 'booking':
+        install_search_index(connections[using])
+
+
+@receiver(post_save, sender=Advertisement)
+@receiver(post_delete, sender=Advertisement)
+def advertisement_changed(sender, instance: Advertisement, **kwargs) -> None:
+    """Скидає кеш реклами в усіх процесах після змін."""
+    transaction.on_commit(advertisement_pool.invalidate)
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance: Location, **kwargs) -> None:
+    """Переносить локацію в групу фасетів з її новими значеннями."""
+    transaction.on_commit(partial(facet_index.apply, instance.pk, facet_key(instance)))
+
+
+@receiver(post_delete, sender=Location)
+def location_deleted(sender, instance: Location, **kwargs) -> None:
+    """Прибирає локацію з індексу фасетів."""
+    transaction.on_commit(partial(facet_index.apply, instance.pk))
+
+
+@receiver(post_save, sender=Favourite)
+@receiver(post_delete, sender=Favourite)
+def favourite_changed(sender, instance: Favourite, **kwargs) -> None:
+    """Скидає кешований набір улюблених користувача."""
+    invalidate_favourites(instance.user_id)
+    # Повторне скидання після фіксації прибирає старий набір, який
+    # конкурентний запит міг закешувати до завершення транзакції
+    transaction.on_commit(partial(invalidate_favourites, instance.user_id))
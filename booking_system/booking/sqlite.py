@@ -0,0 +1,109 @@
+import random
+import time
+from typing import Callable, Dict, TypeVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+T = TypeVar('T')
+
+# Скільки разів повторювати транзакцію, якщо база даних зайнята іншим записом
+LOCK_RETRIES = getattr(settings, 'BOOKING_LOCK_RETRIES', 8)
+LOCK_RETRY_DELAY = getattr(settings, 'BOOKING_LOCK_RETRY_DELAY', 0.01)
+# Найдовша пауза між повторами (у секундах)
+LOCK_RETRY_MAX_DELAY = getattr(settings, 'BOOKING_LOCK_RETRY_MAX_DELAY', 0.5)
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def is_lock_error(error: OperationalError) -> bool:
+    """
+    Перевіряє, чи помилка спричинена конкурентним записом.
+
+    Args:
+        error (OperationalError): Помилка бази даних.
+
+    Returns:
+        bool: True, якщо транзакцію варто повторити.
+    """
+    message = str(error).lower()
+    return 'locked' in message or 'deadlock' in message
+
+
+def retry_on_lock(
+    func: Callable[[], T],
+    using: str = DEFAULT_DB_ALIAS,
+    retries: int = LOCK_RETRIES,
+    delay: float = LOCK_RETRY_DELAY,
+) -> T:
+    """
+    Виконує функцію, повторюючи її, поки база даних зайнята іншим записом.
+
+    Пауза між спробами випадкова й зростає експоненційно, але не більше
+    `LOCK_RETRY_MAX_DELAY`. Функція має сама відкривати транзакцію:
+    всередині зовнішньої транзакції повтор неможливий, тому помилка
+    піднімається одразу.
+
+    Args:
+        func (Callable[[], T]): Функція із записом у базу даних.
+        using (str): Псевдонім бази даних.
+        retries (int): Найбільша кількість спроб.
+        delay (float): Початкова пауза між спробами (у секундах).
+
+    Raises:
+        OperationalError: Якщо база зайнята після всіх спроб або помилка
+            не пов'язана з блокуванням.
+
+    Returns:
+        T: Результат функції.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except OperationalError as error:
+            attempt += 1
+            if (
+                not is_lock_error(error)
+                or connections[using].in_atomic_block
+                or attempt >= retries
+            ):
+                raise
+        backoff = min(delay * 2 ** (attempt - 1), LOCK_RETRY_MAX_DELAY)
+        time.sleep(random.uniform(0, backoff))
+
+
+def checkpoint(using: str = DEFAULT_DB_ALIAS, mode: str = 'TRUNCATE') -> Dict[str, int]:
+    """
+    Переносить журнал WAL в основний файл бази даних.
+
+    Args:
+        using (str): Псевдонім бази даних.
+        mode (str): Режим `PRAGMA wal_checkpoint`.
+
+    Raises:
+        ValueError: Якщо режим невідомий.
+
+    Returns:
+        Dict[str, int]: Чи заважали читачі (`busy`), кількість сторінок у
+            журналі (`log`) та перенесених сторінок (`checkpointed`).
+    """
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f'Невідомий режим контрольної точки: {mode}')
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'PRAGMA wal_checkpoint({mode})')
+        busy, log, checkpointed = cursor.fetchone()
+    return {'busy': busy, 'log': log, 'checkpointed': checkpointed}
+
+
+def analyze(using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Оновлює статистику індексів для планувальника запитів.
+
+    Args:
+        using (str): Псевдонім бази даних.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute('ANALYZE')
+        cursor.execute('PRAGMA optimize')
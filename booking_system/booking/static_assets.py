@@ -0,0 +1,369 @@
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# Файли з хешем у назві ніколи не змінюються, тому кешуються на рік
+STATIC_IMMUTABLE_MAX_AGE = getattr(
+    settings, 'STATIC_IMMUTABLE_MAX_AGE', 365 * 24 * 60 * 60
+)
+# Файли без хешу (посилання з листів, сторонніх сторінок) перевіряються частіше
+STATIC_MAX_AGE = getattr(settings, 'STATIC_MAX_AGE', 60)
+STATIC_COMPRESSIBLE_EXTENSIONS: Tuple[str, ...] = tuple(
+    getattr(
+        settings,
+        'STATIC_COMPRESSIBLE_EXTENSIONS',
+        ('.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml'),
+    )
+)
+# Стиснута копія зберігається, лише якщо вона менша принаймні на 5 %
+STATIC_COMPRESSION_RATIO = 0.95
+
+# Кодування у порядку переваги та суфікси їхніх файлів
+ENCODINGS: Tuple[Tuple[str, str], ...] = (('br', '.br'), ('gzip', '.gz'))
+COMPRESSED_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+
+
+def compress(data: bytes) -> Dict[str, bytes]:
+    """
+    Стискає вміст усіма підтримуваними кодуваннями.
+
+    Args:
+        data (bytes): Вміст файлу.
+
+    Returns:
+        Dict[str, bytes]: Суфікс файлу та стиснутий вміст.
+    """
+    import brotli
+
+    return {
+        # Нульовий час у заголовку gzip робить результат відтворюваним
+        '.gz': gzip.compress(data, compresslevel=9, mtime=0),
+        '.br': brotli.compress(data, quality=11),
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Сховище статичних файлів з хешем вмісту в назвах та стиснутими копіями.
+
+    Під час `collectstatic` поруч із кожним текстовим файлом (і оригіналом,
+    і версією з хешем) записуються `.gz` та `.br`, які віддає
+    `StaticAssetsMiddleware` без стиснення на льоту.
+    """
+
+    def stored_name(self, name: str) -> str:
+        """
+        Повертає назву файлу з хешем.
+
+        До першого `collectstatic` (розробка, тести) маніфесту немає, тож
+        повертається назва без хешу замість помилки.
+
+        Args:
+            name (str): Назва файлу.
+
+        Returns:
+            str: Назва файлу з хешем, якщо вона відома.
+        """
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(
+        self, paths: Dict, dry_run: bool = False, **options
+    ) -> Iterator[Tuple[str, str, bool]]:
+        """
+        Додає до файлів хеш вмісту, а потім записує стиснуті копії.
+
+        Args:
+            paths (Dict): Зібрані файли.
+            dry_run (bool): Лише показати, що буде зроблено.
+
+        Yields:
+            Tuple[str, str, bool]: Назва файлу, оброблений файл та ознака
+                обробки, як очікує `collectstatic`.
+        """
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        # Оригінал і копія з хешем часто однакові, тож стискаються один раз
+        compressed: Dict[str, Dict[str, bytes]] = {}
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(STATIC_COMPRESSIBLE_EXTENSIONS):
+                for written in self.compress(name, compressed):
+                    yield name, written, True
+
+    def compress(self, name: str, compressed: Dict[str, Dict[str, bytes]]) -> List[str]:
+        """
+        Записує стиснуті копії файлу, якщо стиснення має сенс.
+
+        Args:
+            name (str): Назва файлу у сховищі.
+            compressed (Dict[str, Dict[str, bytes]]): Уже стиснутий вміст за
+                його хешем.
+
+        Returns:
+            List[str]: Назви записаних копій.
+        """
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in compressed:
+            compressed[digest] = compress(data)
+        written = []
+        for suffix, payload in compressed[digest].items():
+            target = path.with_name(path.name + suffix)
+            if len(payload) >= len(data) * STATIC_COMPRESSION_RATIO:
+                # Застаріла копія не повинна пережити зміну файлу
+                target.unlink(missing_ok=True)
+                continue
+            target.write_bytes(payload)
+            written.append(name + suffix)
+        return written
+
+
+def accepted_encodings(header: str) -> FrozenSet[str]:
+    """
+    Розбирає заголовок `Accept-Encoding`.
+
+    Args:
+        header (str): Значення заголовка.
+
+    Returns:
+        FrozenSet[str]: Кодування, які приймає клієнт (без `q=0`).
+    """
+    accepted = set()
+    for part in header.split(','):
+        coding, _, parameters = part.partition(';')
+        quality = re.search(r'q=([0-9.]+)', parameters)
+        if quality and float(quality[1]) == 0:
+            continue
+        accepted.add(coding.strip().lower())
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return frozenset(accepted)
+
+
+def hashed_names(root: Path) -> FrozenSet[str]:
+    """
+    Читає з маніфесту назви файлів, які містять хеш вмісту.
+
+    Args:
+        root (Path): Каталог `STATIC_ROOT`.
+
+    Returns:
+        FrozenSet[str]: Назви файлів з хешем (порожньо без маніфесту).
+    """
+    storage = CompressedManifestStaticFilesStorage(location=root)
+    return frozenset(storage.hashed_files.values())
+
+
+class StaticAsset:
+    """Зібраний статичний файл та його стиснуті копії."""
+
+    def __init__(self, path: Path, immutable: bool) -> None:
+        self.path = path
+        self.immutable = immutable
+        self.content_type = mimetypes.guess_type(path.name)[0] or (
+            'application/octet-stream'
+        )
+        self.mtime = path.stat().st_mtime
+        self.encodings: Dict[str, Path] = {}
+        for encoding, suffix in ENCODINGS:
+            compressed = path.with_name(path.name + suffix)
+            if compressed.is_file():
+                self.encodings[encoding] = compressed
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], Path]:
+        """
+        Обирає найменшу копію, яку приймає клієнт.
+
+        Args:
+            accept_encoding (str): Заголовок `Accept-Encoding`.
+
+        Returns:
+            Tuple[Optional[str], Path]: Кодування (None без стиснення) та файл.
+        """
+        if self.encodings:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, path in self.encodings.items():
+                if encoding in accepted:
+                    return encoding, path
+        return None, self.path
+
+
+class StaticAssetsMiddleware:
+    """
+    Віддає зібрані статичні файли з `STATIC_ROOT` без вебсервера.
+
+    Клієнт отримує `.br` або `.gz` копію відповідно до `Accept-Encoding`.
+    Файли з хешем у назві (з маніфесту `collectstatic`) кешуються як
+    `immutable`, тож браузер не перевіряє їх при кожному перегляді сторінки,
+    а решта кешується на `STATIC_MAX_AGE` секунд. Знайдений файл щоразу
+    перевіряється за часом зміни, а маніфест перечитується після його зміни,
+    тож після `collectstatic` сервер не потрібно перезапускати.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        static_url = urlsplit(settings.STATIC_URL or '')
+        if not settings.STATIC_ROOT or static_url.netloc:
+            raise MiddlewareNotUsed
+        self.prefix = static_url.path
+        self.root = Path(settings.STATIC_ROOT).resolve()
+        self.manifest = self.root / CompressedManifestStaticFilesStorage.manifest_name
+        self.manifest_mtime: Optional[float] = None
+        self.immutable: FrozenSet[str] = frozenset()
+        # Знайдені файли; відсутні не запам'ятовуються, бо можуть з'явитися
+        self.assets: Dict[str, StaticAsset] = {}
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def immutable_names(self) -> FrozenSet[str]:
+        """
+        Повертає назви файлів з хешем, перечитуючи змінений маніфест.
+
+        Returns:
+            FrozenSet[str]: Назви файлів з хешем.
+        """
+        try:
+            mtime: Optional[float] = self.manifest.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self.manifest_mtime:
+            self.immutable = hashed_names(self.root)
+            self.manifest_mtime = mtime
+        return self.immutable
+
+    def find(self, path_info: str) -> Optional[StaticAsset]:
+        """
+        Знаходить файл за шляхом запиту.
+
+        Запам'ятований файл повторно використовується, лише доки не
+        змінився час його зміни, інакше він і його стиснуті копії
+        перевіряються знову. Стиснуті копії та маніфест напряму не
+        віддаються: копія без `Content-Encoding` пошкодила б вміст, а
+        маніфест розкриває назви всіх файлів.
+
+        Args:
+            path_info (str): Шлях запиту.
+
+        Returns:
+            Optional[StaticAsset]: Файл або None, якщо його немає чи його
+                не можна віддавати.
+        """
+        asset = self.assets.get(path_info)
+        if asset is not None:
+            try:
+                if asset.path.stat().st_mtime == asset.mtime:
+                    return asset
+            except FileNotFoundError:
+                pass
+
+        name = path_info[len(self.prefix) :]
+        path = (self.root / name).resolve()
+        if (
+            self.root not in path.parents
+            or not path.is_file()
+            or path == self.manifest
+            or path.name.endswith(COMPRESSED_SUFFIXES)
+        ):
+            self.assets.pop(path_info, None)
+            return None
+        relative = path.relative_to(self.root).as_posix()
+        asset = self.assets[path_info] = StaticAsset(
+            path, relative in self.immutable_names()
+        )
+        return asset
+
+    def serve(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """
+        Формує відповідь зі статичним файлом.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            Optional[HttpResponse]: Відповідь або None, якщо запит не до
+                зібраного статичного файлу.
+        """
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(
+            self.prefix
+        ):
+            return None
+        asset = self.find(request.path_info)
+        if asset is None:
+            return None
+
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), asset.mtime
+        ):
+            response = HttpResponseNotModified()
+        else:
+            encoding, path = asset.select(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            # Статичні файли невеликі, тож читаються повністю: так відповідь
+            # однаково працює під WSGI та ASGI
+            response = HttpResponse(
+                path.read_bytes() if request.method == 'GET' else b'',
+                content_type=asset.content_type,
+            )
+            response['Content-Length'] = path.stat().st_size
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(asset.mtime)
+        if asset.encodings:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if asset.immutable:
+            patch_cache_control(
+                response, public=True, max_age=STATIC_IMMUTABLE_MAX_AGE, immutable=True
+            )
+        else:
+            patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE)
+        return response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Віддає статичний файл або передає запит далі.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.serve(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Асинхронна версія `__call__`.
+
+        Args:
+            request (HttpRequest): Запит.
+
+        Returns:
+            HttpResponse: Відповідь сервера.
+        """
+        response = self.serve(request)
+        return response if response is not None else await self.get_response(request)
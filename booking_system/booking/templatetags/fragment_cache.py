@@ -0,0 +1,72 @@
+from django import template
+from django.core.cache import cache
+from django.template.base import FilterExpression, NodeList, Parser, Token
+
+from ..fragment_cache import (
+    FRAGMENT_CACHE_TIMEOUT,
+    HITS_KEY,
+    MISSES_KEY,
+    count,
+    fragment_key,
+)
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+    """Вузол шаблону, який кешує фрагмент за версією вмісту об'єкта."""
+
+    def __init__(
+        self,
+        nodelist: NodeList,
+        name: FilterExpression,
+        obj: FilterExpression,
+        vary_on: list,
+    ) -> None:
+        self.nodelist = nodelist
+        self.name = name
+        self.obj = obj
+        self.vary_on = vary_on
+
+    def render(self, context: template.Context) -> str:
+        key = fragment_key(
+            self.name.resolve(context),
+            self.obj.resolve(context),
+            [value.resolve(context) for value in self.vary_on],
+        )
+        content = cache.get(key)
+        if content is not None:
+            count(HITS_KEY)
+            return content
+
+        count(MISSES_KEY)
+        content = self.nodelist.render(context)
+        cache.set(key, content, FRAGMENT_CACHE_TIMEOUT)
+        return content
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser: Parser, token: Token) -> VersionedCacheNode:
+    """
+    Кешує фрагмент, доки не зміниться `content_version` об'єкта.
+
+    Використання::
+
+        {% versioned_cache 'location_card' location [vary_on ...] %}
+            ...
+        {% endversioned_cache %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' потребує щонайменше назву фрагмента та об'єкт."
+        )
+
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    return VersionedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,53 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from django.utils.safestring import SafeString
+
+from ..images import srcset, variant_url, variant_widths
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(
+    digest: str, width: int, src: str, alt: str, sizes: str = '100vw', **attrs: str
+) -> SafeString:
+    """
+    Виводить зображення з варіантами WebP та JPEG різної ширини.
+
+    Якщо варіанти ще не згенеровано (порожній хеш або невідома ширина),
+    виводиться оригінал.
+
+    Використання::
+
+        {% responsive_image location.photo_digest location.photo_width
+           location.photo location.name sizes='33vw' class='card-img-top' %}
+
+    Args:
+        digest (str): Хеш вмісту оригіналу.
+        width (int): Ширина оригіналу.
+        src (str): Адреса оригіналу.
+        alt (str): Альтернативний текст.
+        sizes (str): Значення атрибута `sizes`.
+        **attrs (str): Додаткові атрибути тегу `img`.
+
+    Returns:
+        SafeString: HTML зображення.
+    """
+    if not digest or not width:
+        return format_html('<img src="{}" alt="{}"{}>', src, alt, flatatt(attrs))
+
+    widths = variant_widths(width)
+    # Середня ширина - запасний варіант для браузерів без srcset
+    fallback = widths[len(widths) // 2]
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy"{}></picture>',
+        srcset(digest, 'webp', widths),
+        sizes,
+        variant_url(digest, fallback, 'jpg'),
+        srcset(digest, 'jpg', widths),
+        sizes,
+        alt,
+        flatatt(attrs),
+    )
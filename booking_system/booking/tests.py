@@ -1,3 +1,2352 @@
-from django.test import TestCase
+import base64
+import gzip
+import json
+import os
+import random
+import re
+import smtplib
+import sqlite3
+import tempfile
+import threading
+import urllib.error
+from collections import Counter
+from datetime import date, datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+from unittest import mock
 
-# Create your tests here.
+import brotli
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.utils import ConnectionDoesNotExist
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import localdate, make_aware, now
+
+from . import fragment_cache, images, search, transfer
+from .ads import AdvertisementPool, AliasTable
+from .availability import (
+    AVAILABILITY_VERSION_KEY,
+    AvailabilityIndex,
+    availability,
+    daily_status,
+    nearest_windows,
+)
+from .checks import cache_is_shared, check_shared_cache
+from .facets import (
+    FacetIndex,
+    facet_counts,
+    facet_index,
+    invalidate_facets,
+    top_buckets,
+)
+from .favourites import favourite_ids
+from .holds import expired_holds, start_sweeper, sweep_expired_holds
+from .models import (
+    Advertisement,
+    Booking,
+    Favourite,
+    Location,
+    OutboxEmail,
+    Reaction,
+    Review,
+)
+from .outbox import enqueue_email, send_pending
+from .pagination import encode_cursor
+from .query_budget import (
+    QueryBudgetExceeded,
+    fingerprint,
+    query_budget,
+    record_queries,
+)
+from .reservations import (
+    BookingConflict,
+    HoldExpired,
+    ReservationBusy,
+    confirm_booking,
+    reserve_booking,
+)
+from .routers import (
+    PRIMARY_COOKIE,
+    ReplicaPinningMiddleware,
+    ReplicaRouter,
+    copy_database,
+    mark_replica_synced,
+    use_primary,
+)
+from .sqlite import retry_on_lock
+from .views import LOCATIONS_PAGE_SIZE, REVIEWS_PAGE_SIZE
+
+
+def create_location(name: str = 'Локація', **kwargs) -> Location:
+    """
+    Створює локацію з типовими даними.
+
+    Args:
+        name (str): Назва локації.
+        **kwargs: Поля, які потрібно перевизначити.
+
+    Returns:
+        Location: Створена локація.
+    """
+    fields = {
+        'name': name,
+        'country': 'Україна',
+        'city': 'Київ',
+        'region': 'Київська',
+        'street': 'Хрещатик',
+        'amount': 2,
+        'description': 'Опис',
+        'photo': 'https://example.com/photo.jpg',
+        'price_per_night': 100,
+    }
+    fields.update(kwargs)
+    return Location.objects.create(**fields)
+
+
+class BookingStatusTests(TestCase):
+    """Тести для визначення поточної зайнятості локацій."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', 'user@example.com', 'password')
+
+    def create_locations(self, count: int) -> None:
+        """
+        Створює локації, половина з яких зараз заброньована.
+
+        Args:
+            count (int): Кількість локацій.
+        """
+        current_time = now()
+        for number in range(count):
+            location = create_location(f'Локація {number}')
+            Favourite.objects.create(user=self.user, location=location)
+            Booking.objects.create(
+                user=self.user,
+                location=location,
+                start_time=current_time - timedelta(days=1),
+                end_time=current_time + timedelta(days=1),
+                confirmed=number % 2 == 0,
+            )
+
+    def test_with_booking_status(self) -> None:
+        self.create_locations(4)
+
+        with self.assertNumQueries(1):
+            statuses = {
+                location.name: location.is_booked()
+                for location in Location.objects.with_booking_status()
+            }
+
+        self.assertEqual(
+            statuses,
+            {
+                'Локація 0': True,
+                'Локація 1': False,
+                'Локація 2': True,
+                'Локація 3': False,
+            },
+        )
+
+    def test_index_query_count_does_not_depend_on_page_size(self) -> None:
+        self.client.force_login(self.user)
+        # Прогріває кеш реклами та кількостей фасетів
+        self.client.get(reverse('booking:index'))
+
+        self.create_locations(2)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('booking:index'))
+
+        self.create_locations(30)
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('booking:index'))
+
+        self.assertContains(response, 'Станом на зараз заброньовано')
+        self.assertContains(response, 'Станом на зараз доступно')
+
+
+class RatingAggregationTests(TestCase):
+    """Тести для інкрементального оновлення рейтингу."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.location = create_location()
+        cls.users = [
+            User.objects.create_user(f'user{number}', password='password')
+            for number in range(3)
+        ]
+
+    def test_review_changes_update_aggregates(self) -> None:
+        reviews = [
+            Review.objects.create(user=user, location=self.location, rating=rating)
+            for user, rating in zip(self.users, (5, 4, 4))
+        ]
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.rating_sum, 13)
+        self.assertEqual(self.location.rating_count, 3)
+        self.assertEqual(str(self.location.rating), '4.33')
+
+        reviews[0].rating = 1
+        reviews[0].save()
+        reviews[1].delete()
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.rating_sum, 5)
+        self.assertEqual(self.location.rating_count, 2)
+        self.assertEqual(str(self.location.rating), '2.50')
+
+        Review.objects.all().delete()
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.rating_count, 0)
+        self.assertEqual(self.location.rating, 0)
+
+    def test_rebuild_ratings_command(self) -> None:
+        for user, rating in zip(self.users, (5, 3, 2)):
+            Review.objects.create(user=user, location=self.location, rating=rating)
+        empty_location = create_location('Порожня')
+        Location.objects.update(rating_sum=100, rating_count=1, rating=5)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        self.location.refresh_from_db()
+        empty_location.refresh_from_db()
+        self.assertEqual(self.location.rating_sum, 10)
+        self.assertEqual(self.location.rating_count, 3)
+        self.assertEqual(str(self.location.rating), '3.33')
+        self.assertEqual(empty_location.rating_count, 0)
+        self.assertEqual(empty_location.rating, 0)
+
+    def test_histogram_is_maintained_incrementally(self) -> None:
+        reviews = [
+            Review.objects.create(user=user, location=self.location, rating=rating)
+            for user, rating in zip(self.users, (5, 4, 4))
+        ]
+        reviews[0].rating = 1
+        reviews[0].save()
+        reviews[1].delete()
+
+        self.location.refresh_from_db()
+        with self.assertNumQueries(0):
+            histogram = self.location.rating_histogram()
+        self.assertEqual(
+            histogram, [(5, 0, 0), (4, 1, 50), (3, 0, 0), (2, 0, 0), (1, 1, 50)]
+        )
+
+    def test_rebuild_ratings_restores_histogram(self) -> None:
+        for user, rating in zip(self.users, (5, 5, 2)):
+            Review.objects.create(user=user, location=self.location, rating=rating)
+        Location.objects.update(rating_5_count=0, rating_1_count=7)
+
+        call_command('rebuild_ratings', stdout=StringIO())
+
+        self.location.refresh_from_db()
+        self.assertEqual(
+            [count for _, count, _ in self.location.rating_histogram()],
+            [2, 0, 0, 1, 0],
+        )
+
+
+class ReactionCounterTests(TestCase):
+    """Тести для лічильників лайків та дизлайків."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location()
+        cls.other_location = create_location('Інша')
+
+    def setUp(self) -> None:
+        self.client.force_login(self.user)
+
+    def assertCounts(self, location: Location, likes: int, dislikes: int) -> None:
+        location.refresh_from_db()
+        self.assertEqual(
+            (location.like_count, location.dislike_count), (likes, dislikes)
+        )
+
+    def test_toggle_reactions(self) -> None:
+        self.client.post(reverse('booking:like_location', args=[self.location.pk]))
+        self.assertCounts(self.location, 1, 0)
+
+        self.client.post(reverse('booking:dislike_location', args=[self.location.pk]))
+        self.assertCounts(self.location, 0, 1)
+
+        self.client.post(reverse('booking:dislike_location', args=[self.location.pk]))
+        self.assertCounts(self.location, 0, 0)
+        self.assertCounts(self.other_location, 0, 0)
+
+    def test_concurrent_removal_is_counted_once(self) -> None:
+        url = reverse('booking:like_location', args=[self.location.pk])
+        self.client.post(url)
+        stale = Reaction.objects.get(user=self.user, location=self.location)
+        self.client.post(url)
+        self.assertCounts(self.location, 0, 0)
+
+        # Другий запит прочитав реакцію до того, як перший її видалив
+        with mock.patch.object(
+            Reaction.objects, 'get_or_create', return_value=(stale, False)
+        ):
+            self.client.post(url)
+
+        self.assertCounts(self.location, 0, 0)
+
+    def test_deleting_user_removes_their_reactions_from_counters(self) -> None:
+        other = User.objects.create_user('other', password='password')
+        for user, reaction_type in ((self.user, 'like'), (other, 'like')):
+            Reaction.objects.create(
+                user=user, location=self.location, reaction_type=reaction_type
+            )
+        Reaction.objects.create(
+            user=other, location=self.other_location, reaction_type='dislike'
+        )
+        self.assertCounts(self.location, 2, 0)
+
+        other.delete()
+
+        self.assertCounts(self.location, 1, 0)
+        self.assertCounts(self.other_location, 0, 0)
+
+        # Видалення окремої реакції (як в адмінці) теж зменшує лічильник
+        Reaction.objects.get(user=self.user).delete()
+        self.assertCounts(self.location, 0, 0)
+
+    def test_rebuild_reactions_command(self) -> None:
+        Reaction.objects.create(
+            user=self.user, location=self.location, reaction_type='like'
+        )
+        Location.objects.update(like_count=10, dislike_count=10)
+
+        call_command('rebuild_reactions', stdout=StringIO())
+
+        self.assertCounts(self.location, 1, 0)
+        self.assertCounts(self.other_location, 0, 0)
+
+
+class OutboxTests(TestCase):
+    """Тести для черги листів."""
+
+    def test_create_booking_queues_activation_email(self) -> None:
+        user = User.objects.create_user('user', 'user@example.com', 'password')
+        location = create_location()
+        start_time = now() + timedelta(days=1)
+        self.client.force_login(user)
+
+        response = self.client.post(
+            reverse('booking:create_booking', args=[location.pk]),
+            {
+                'start_time': start_time.strftime('%Y-%m-%dT%H:%M'),
+                'end_time': (start_time + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M'),
+            },
+        )
+
+        self.assertRedirects(response, reverse('booking:index'))
+        self.assertEqual(len(mail.outbox), 0)
+        booking = Booking.objects.get()
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, ['user@example.com'])
+        self.assertIn(str(booking.activation_code), email.html_message)
+
+        call_command('send_outbox', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.SENT)
+
+    def test_failed_email_is_retried_later(self) -> None:
+        email = enqueue_email('Тема', 'Текст', None, ['user@example.com'])
+
+        with (
+            mock.patch('booking.outbox.get_connection') as get_connection,
+            self.assertLogs('booking.outbox', 'WARNING'),
+        ):
+            get_connection.return_value.open.side_effect = OSError('SMTP недоступний')
+            self.assertEqual(send_pending(), 1)
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, now())
+        self.assertEqual(send_pending(), 0)
+
+    def test_only_delivery_errors_are_retried(self) -> None:
+        refused = enqueue_email('Тема', 'Текст', None, ['user@example.com'])
+
+        with (
+            mock.patch(
+                'booking.outbox.EmailMultiAlternatives.send',
+                side_effect=smtplib.SMTPRecipientsRefused({}),
+            ),
+            self.assertLogs('booking.outbox', 'WARNING'),
+        ):
+            send_pending()
+
+        refused.refresh_from_db()
+        self.assertEqual((refused.status, refused.attempts), (OutboxEmail.PENDING, 1))
+
+        enqueue_email('Тема', 'Текст', None, ['user@example.com'])
+        with (
+            mock.patch(
+                'booking.outbox.EmailMultiAlternatives.send', side_effect=TypeError
+            ),
+            self.assertRaises(TypeError),
+        ):
+            send_pending()
+
+
+class LocationPaginationTests(TestCase):
+    """Тести для посторінкового виведення локацій."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for number in range(LOCATIONS_PAGE_SIZE * 2 + 5):
+            create_location(
+                f'Локація {number % 7}',
+                price_per_night=number % 4 * 100,
+                rating=number % 5,
+            )
+
+    def collect_pages(self, sort_by: str) -> list:
+        """
+        Проходить усі сторінки локацій та збирає їхні ідентифікатори.
+
+        Args:
+            sort_by (str): Варіант сортування.
+
+        Returns:
+            list: Ідентифікатори локацій у порядку виведення.
+        """
+        response = self.client.get(reverse('booking:index'), {'sort_by': sort_by})
+        pks = [location.pk for location in response.context['locations']]
+        next_url = response.context['next_page_url']
+
+        while next_url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(next_url).json()
+            self.assertFalse(
+                any('OFFSET' in query['sql'] for query in queries.captured_queries)
+            )
+            pks += [
+                int(pk)
+                for pk in re.findall(r'location/(\d+)/" class="text-deco', data['html'])
+            ]
+            next_url = data['next_url']
+        return pks
+
+    def test_pages_cover_all_locations_in_order(self) -> None:
+        for sort_by, ordering in (
+            ('name', ['name', 'id']),
+            ('price', ['price_per_night', 'id']),
+            ('rating', ['-rating', 'id']),
+        ):
+            with self.subTest(sort_by=sort_by):
+                expected = Location.objects.order_by(*ordering).values_list(
+                    'pk', flat=True
+                )
+                self.assertEqual(self.collect_pages(sort_by), list(expected))
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get(
+            reverse('booking:load_more_locations'),
+            {'sort_by': 'price', 'cursor': 'not-a-cursor'},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_tampered_cursors_are_rejected_on_every_endpoint(self) -> None:
+        user = User.objects.create_user('user', password='password')
+        self.client.force_login(user)
+        location = Location.objects.first()
+        # Коректний base64 і JSON, але значення не підходять полям сортування
+        cursors = [
+            encode_cursor(['x', 'abc']),
+            base64.urlsafe_b64encode(b'[[1], {"a": 1}]').decode(),
+        ]
+        detail = reverse('booking:location_detail', args=[location.pk])
+        requests = [
+            (reverse('booking:load_more_locations'), {'sort_by': sort_by}, 'cursor')
+            for sort_by in ('name', 'price', 'rating')
+        ] + [
+            (
+                reverse('booking:load_more_locations'),
+                {'q': location.name, 'sort_by': 'relevance'},
+                'cursor',
+            ),
+            (
+                reverse('booking:flexible_locations'),
+                {'date': localdate().isoformat()},
+                'cursor',
+            ),
+            (detail, {}, 'reviews'),
+            (reverse('accounts:profile'), {}, 'upcoming'),
+            (reverse('accounts:profile'), {}, 'past'),
+        ]
+
+        for url, params, name in requests:
+            for cursor in cursors:
+                with self.subTest(url=url, params=params, cursor=cursor):
+                    response = self.client.get(url, {**params, name: cursor})
+                    self.assertEqual(response.status_code, 400)
+
+
+class SearchTests(TestCase):
+    """Тести для повнотекстового пошуку локацій."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.lake = create_location('Будиночок біля озера', city='Львів')
+        cls.forest = create_location(
+            'Лісова хата', description='Поруч велике озеро та ліс'
+        )
+        cls.city = create_location('Апартаменти', city='Одеса', street='Дерибасівська')
+
+    def search(self, query: str) -> list:
+        locations = search.search_locations(Location.objects.all(), query)
+        return list(locations.order_by('search_rank', 'id'))
+
+    def test_search_by_all_fields_with_prefix(self) -> None:
+        self.assertEqual(self.search('озер'), [self.lake, self.forest])
+        self.assertEqual(self.search('львів'), [self.lake])
+        self.assertEqual(self.search('дериб одес'), [self.city])
+        self.assertEqual(self.search('море'), [])
+
+    def test_index_follows_location_changes(self) -> None:
+        self.city.description = 'Вид на море'
+        self.city.save()
+        self.lake.delete()
+
+        self.assertEqual(self.search('море'), [self.city])
+        self.assertEqual(self.search('озеро'), [self.forest])
+
+    def test_fallback_without_fts(self) -> None:
+        with mock.patch.object(search, '_fts_available', False):
+            self.assertEqual(self.search('озер'), [self.lake, self.forest])
+            self.assertEqual(self.search('Одеса'), [self.city])
+
+    def test_index_orders_by_relevance(self) -> None:
+        response = self.client.get(reverse('booking:index'), {'q': 'озер'})
+
+        self.assertEqual(response.context['sort_by'], 'relevance')
+        self.assertEqual(list(response.context['locations']), [self.lake, self.forest])
+
+    def test_relevance_pages(self) -> None:
+        for number in range(LOCATIONS_PAGE_SIZE + 5):
+            create_location(f'Котедж {number}', description='озеро ' * (number % 4 + 1))
+
+        response = self.client.get(reverse('booking:index'), {'q': 'озеро'})
+        pks = [location.pk for location in response.context['locations']]
+        data = self.client.get(response.context['next_page_url']).json()
+        pks += [
+            int(pk)
+            for pk in re.findall(r'location/(\d+)/" class="text-deco', data['html'])
+        ]
+
+        expected = search.search_locations(Location.objects.all(), 'озеро').order_by(
+            'search_rank', 'id'
+        )
+        self.assertEqual(pks, [location.pk for location in expected])
+        self.assertIsNone(data['next_url'])
+
+
+class AdvertisementPoolTests(TestCase):
+    """Тести для кешованого пулу реклами."""
+
+    def create_advertisement(self, title: str, **kwargs) -> Advertisement:
+        return Advertisement.objects.create(
+            title=title,
+            link='https://example.com',
+            image_url='https://example.com/ad.jpg',
+            **kwargs,
+        )
+
+    def test_alias_table_follows_weights(self) -> None:
+        table = AliasTable([1, 3, 6])
+        rng = random.Random(1)
+        counts = Counter(table.sample(rng) for _ in range(20000))
+
+        for index, share in enumerate((0.1, 0.3, 0.6)):
+            self.assertAlmostEqual(counts[index] / 20000, share, delta=0.02)
+
+    def test_pick_pair_uses_cache(self) -> None:
+        first = self.create_advertisement('Перша')
+        second = self.create_advertisement('Друга')
+        self.create_advertisement('Неактивна', is_active=False)
+        pool = AdvertisementPool()
+
+        with self.assertNumQueries(1):
+            pool.pick_pair()
+        with self.assertNumQueries(0):
+            pairs = {pool.pick_pair() for _ in range(50)}
+
+        self.assertEqual(pairs, {(first, second), (second, first)})
+
+    def test_impression_cap(self) -> None:
+        advertisement = self.create_advertisement('Обмежена', max_impressions=3)
+        pool = AdvertisementPool()
+
+        shown = [pool.pick_pair() for _ in range(10)]
+
+        self.assertEqual(sum(advertisement in pair for pair in shown), 3)
+        pool.flush_impressions()
+        advertisement.refresh_from_db()
+        self.assertEqual(advertisement.impressions, 3)
+
+    def test_banners_are_not_loaded_without_rendering(self) -> None:
+        advertisement = self.create_advertisement('Реклама')
+
+        with mock.patch(
+            'booking.ads.advertisement_pool.pick_pair',
+            return_value=(advertisement, advertisement),
+        ) as pick_pair:
+            self.client.get(reverse('booking:load_more_locations'))
+            pick_pair.assert_not_called()
+
+            self.client.get(reverse('booking:index'))
+            pick_pair.assert_called_once()
+
+
+class FragmentCacheTests(TestCase):
+    """Тести для кешування фрагментів локацій за версією вмісту."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_version_changes_on_related_writes(self) -> None:
+        versions = [self.location.content_version]
+
+        self.location.name = 'Нова назва'
+        self.location.save()
+        versions.append(self.location.content_version)
+        Review.objects.create(user=self.user, location=self.location, rating=5)
+        Reaction.objects.create(
+            user=self.user, location=self.location, reaction_type='like'
+        )
+        Booking.objects.create(
+            user=self.user,
+            location=self.location,
+            start_time=now(),
+            end_time=now() + timedelta(days=1),
+            confirmed=True,
+        )
+        self.location.refresh_from_db()
+        versions.append(self.location.content_version)
+
+        self.assertEqual(versions, [0, 1, 4])
+
+    def test_cards_are_served_from_cache_until_location_changes(self) -> None:
+        self.client.get(reverse('booking:index'))
+        self.assertEqual(fragment_cache.stats()['misses'], 2)
+
+        response = self.client.get(reverse('booking:index'))
+        self.assertEqual(fragment_cache.stats()['hits'], 2)
+        self.assertContains(response, 'Локація')
+
+        self.location.name = 'Оновлена локація'
+        self.location.save()
+        response = self.client.get(reverse('booking:index'))
+        self.assertEqual(fragment_cache.stats()['misses'], 4)
+        self.assertContains(response, 'Оновлена локація')
+
+    def test_favourite_heart_is_not_cached(self) -> None:
+        self.client.force_login(self.user)
+        self.client.get(reverse('booking:index'))
+
+        Favourite.objects.create(user=self.user, location=self.location)
+        response = self.client.get(reverse('booking:index'))
+
+        self.assertEqual(fragment_cache.stats()['hits'], 2)
+        self.assertContains(response, 'fa-solid fa-heart')
+
+    def test_comment_edit_refreshes_review_fragment(self) -> None:
+        review = Review.objects.create(
+            user=self.user, location=self.location, rating=4, comment='Добре'
+        )
+        url = reverse('booking:location_detail', args=[self.location.pk])
+        self.client.get(url)
+
+        review.comment = 'Чудово'
+        review.save()
+        response = self.client.get(url)
+
+        self.assertContains(response, 'Чудово')
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.rating_count, 1)
+
+    def test_author_profile_update_refreshes_review_fragment(self) -> None:
+        Review.objects.create(
+            user=self.user, location=self.location, rating=4, comment='Добре'
+        )
+        url = reverse('booking:location_detail', args=[self.location.pk])
+        self.client.get(url)
+
+        self.user.first_name, self.user.last_name = 'Олена', 'Коваль'
+        self.user.save()
+        response = self.client.get(url)
+
+        self.assertContains(response, 'Олена Коваль')
+
+    def test_stats_command_requires_shared_cache(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command('fragment_cache_stats', stdout=StringIO())
+
+        with tempfile.TemporaryDirectory() as directory:
+            shared = {
+                'default': {
+                    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                    'LOCATION': directory,
+                }
+            }
+            with override_settings(CACHES=shared):
+                fragment_cache.count(fragment_cache.HITS_KEY)
+                out = StringIO()
+                call_command('fragment_cache_stats', stdout=out)
+
+        self.assertEqual(json.loads(out.getvalue())['hits'], 1)
+
+
+class ReservationTests(TestCase):
+    """Тести для бронювання під блокуванням локації."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user(
+            'user', email='user@example.com', password='password'
+        )
+        cls.location = create_location()
+
+    def setUp(self) -> None:
+        availability.invalidate()
+        self.start = now() + timedelta(days=1)
+
+    def new_booking(self, days: int = 2, offset: int = 0) -> Booking:
+        return Booking(
+            user=self.user,
+            location=self.location,
+            start_time=self.start + timedelta(days=offset),
+            end_time=self.start + timedelta(days=offset + days),
+        )
+
+    def test_second_confirmation_of_overlapping_stay_is_rejected(self) -> None:
+        first = reserve_booking(self.new_booking())
+        second = reserve_booking(self.new_booking(offset=1))
+
+        confirm_booking(first)
+        with self.assertRaises(BookingConflict):
+            confirm_booking(second)
+
+        second.refresh_from_db()
+        self.assertFalse(second.confirmed)
+        with self.assertRaises(BookingConflict):
+            reserve_booking(self.new_booking(offset=1))
+
+    def test_activation_view_reports_conflict(self) -> None:
+        first = reserve_booking(self.new_booking())
+        second = reserve_booking(self.new_booking(offset=1))
+        confirm_booking(first)
+
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('booking:activation', args=[second.activation_code])
+        )
+
+        self.assertEqual(response.status_code, 409)
+        self.assertContains(response, 'Цей час уже зайнятий', status_code=409)
+
+    def test_create_booking_view_saves_booking_and_queues_email(self) -> None:
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('booking:create_booking', args=[self.location.pk]),
+            {
+                'start_time': self.start.strftime('%Y-%m-%dT%H:%M'),
+                'end_time': (self.start + timedelta(days=2)).strftime('%Y-%m-%dT%H:%M'),
+            },
+        )
+
+        self.assertRedirects(response, reverse('booking:index'))
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_unconfirmed_hold_keeps_shared_version(self) -> None:
+        version = cache.get(AVAILABILITY_VERSION_KEY)
+        content_version = self.location.content_version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = reserve_booking(self.new_booking())
+        self.location.refresh_from_db()
+        self.assertEqual(cache.get(AVAILABILITY_VERSION_KEY), version)
+        self.assertEqual(self.location.content_version, content_version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            confirm_booking(booking)
+        self.location.refresh_from_db()
+        self.assertEqual(cache.get(AVAILABILITY_VERSION_KEY), version + 1)
+        self.assertEqual(self.location.content_version, content_version + 1)
+
+        # Скасування підтвердження звільняє проміжок в індексі всіх процесів
+        booking.confirmed = False
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.save()
+        self.assertEqual(cache.get(AVAILABILITY_VERSION_KEY), version + 2)
+
+    def test_other_processes_catch_up_from_the_change_log(self) -> None:
+        # Окремий екземпляр індексу відтворює інший процес
+        other = AvailabilityIndex()
+        end = self.start + timedelta(days=2)
+        self.assertTrue(other.is_free(self.location.pk, self.start, end))
+
+        booking = reserve_booking(self.new_booking())
+        with self.captureOnCommitCallbacks(execute=True):
+            confirm_booking(booking)
+
+        with (
+            mock.patch.object(other, '_build') as build,
+            self.assertNumQueries(0),
+        ):
+            self.assertFalse(other.is_free(self.location.pk, self.start, end))
+        build.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.delete()
+        self.assertTrue(other.is_free(self.location.pk, self.start, end))
+
+        # Масова зміна не має запису в журналі, тож індекс перебудовується
+        availability.invalidate()
+        with mock.patch.object(other, '_build', wraps=other._build) as build:
+            other.is_free(self.location.pk, self.start, end)
+        build.assert_called_once()
+
+
+class SharedCacheCheckTests(TestCase):
+    """Тести для перевірки спільного кешу перед розгортанням."""
+
+    def test_process_local_cache_is_rejected(self) -> None:
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['booking.E001'])
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                'LOCATION': 'redis://localhost:6379/0',
+            }
+        }
+    )
+    def test_shared_cache_passes(self) -> None:
+        self.assertTrue(cache_is_shared())
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class ReservationStressTests(TransactionTestCase):
+    """
+    Перевірка конкурентних бронювань на відсутність подвійних підтверджень.
+
+    Пропускна здатність вимірюється в `benchmarks.reservations`.
+    """
+
+    THREADS = 8
+    ATTEMPTS = 2000
+
+    def test_concurrent_attempts_never_double_book(self) -> None:
+        user = User.objects.create_user('user', password='password')
+        locations = [create_location(f'Локація {number}') for number in range(2)]
+        start = now() + timedelta(days=1)
+        results = Counter()
+        results_lock = threading.Lock()
+
+        def worker(seed: int) -> None:
+            rng = random.Random(seed)
+            outcomes = Counter()
+            try:
+                for _ in range(self.ATTEMPTS // self.THREADS):
+                    offset = rng.randrange(60)
+                    booking = Booking(
+                        user=user,
+                        location=rng.choice(locations),
+                        start_time=start + timedelta(days=offset),
+                        end_time=start + timedelta(days=offset + rng.randint(1, 5)),
+                    )
+                    try:
+                        confirm_booking(reserve_booking(booking))
+                    except BookingConflict:
+                        outcomes['conflicts'] += 1
+                    except ReservationBusy:
+                        outcomes['busy'] += 1
+                    else:
+                        outcomes['confirmed'] += 1
+            finally:
+                connection.close()
+            with results_lock:
+                results.update(outcomes)
+
+        threads = [
+            threading.Thread(target=worker, args=(seed,))
+            for seed in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(results.values()), self.ATTEMPTS)
+        for location in locations:
+            confirmed = list(
+                Booking.objects.filter(location=location, confirmed=True)
+                .order_by('start_time')
+                .values_list('start_time', 'end_time')
+            )
+            for previous, current in zip(confirmed, confirmed[1:]):
+                self.assertLessEqual(previous[1], current[0])
+        self.assertEqual(
+            Booking.objects.filter(confirmed=True).count(), results['confirmed']
+        )
+
+
+class AvailabilityCalendarTests(TestCase):
+    """Тести для календаря зайнятості локації."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location()
+        cls.first_day = localdate() + timedelta(days=1)
+
+    def book(self, offset: int, days: int) -> Booking:
+        start = make_aware(
+            datetime.combine(
+                self.first_day + timedelta(days=offset), datetime.min.time()
+            )
+        )
+        return Booking.objects.create(
+            user=self.user,
+            location=self.location,
+            start_time=start + timedelta(hours=14),
+            end_time=start + timedelta(days=days, hours=12),
+            confirmed=True,
+        )
+
+    def url(self, **params) -> str:
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return f'{reverse("booking:location_availability", args=[self.location.pk])}?{query}'
+
+    def test_sweep_marks_every_overlapped_day_once(self) -> None:
+        day = make_aware(datetime(2025, 1, 1))
+        bookings = [
+            (day + timedelta(days=1), day + timedelta(days=3)),
+            (day + timedelta(days=2), day + timedelta(days=4, hours=1)),
+            (day + timedelta(days=8), day + timedelta(days=20)),
+        ]
+
+        booked = daily_status(bookings, date(2025, 1, 1), date(2025, 1, 10))
+
+        self.assertEqual(
+            booked, [False, True, True, True, True, False, False, False, True, True]
+        )
+
+    def test_endpoint_returns_daily_status(self) -> None:
+        self.book(offset=2, days=2)
+        self.book(offset=3, days=1)
+        Booking.objects.create(
+            user=self.user,
+            location=self.location,
+            start_time=make_aware(
+                datetime.combine(self.first_day, datetime.min.time())
+            ),
+            end_time=make_aware(
+                datetime.combine(
+                    self.first_day + timedelta(days=1), datetime.min.time()
+                )
+            ),
+        )
+
+        last_day = self.first_day + timedelta(days=6)
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url(**{'from': self.first_day, 'to': last_day})
+            )
+
+        days = response.json()['days']
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[0]['date'], self.first_day.isoformat())
+        self.assertEqual(
+            [day['status'] for day in days],
+            ['free', 'free', 'booked', 'booked', 'booked', 'free', 'free'],
+        )
+
+    def test_etag_changes_only_when_bookings_change(self) -> None:
+        url = self.url(**{'from': self.first_day})
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.book(offset=1, days=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_range_is_limited_to_a_year(self) -> None:
+        response = self.client.get(
+            self.url(
+                **{'from': self.first_day, 'to': self.first_day + timedelta(days=366)}
+            )
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(self.url(**{'from': 'вчора'}))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(self.url())
+        self.assertEqual(len(response.json()['days']), 31)
+
+
+class FlexibleDatesTests(TestCase):
+    """Тести для пошуку найближчих вільних проміжків."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.locations = [create_location(f'Локація {number}') for number in range(3)]
+        cls.target = make_aware(
+            datetime.combine(localdate() + timedelta(days=10), datetime.min.time())
+        )
+
+    def book(self, location: Location, offset: int, days: int) -> Booking:
+        return Booking.objects.create(
+            user=self.user,
+            location=location,
+            start_time=self.target + timedelta(days=offset),
+            end_time=self.target + timedelta(days=offset + days),
+            confirmed=True,
+        )
+
+    def test_windows_are_found_in_gaps_nearest_first(self) -> None:
+        day = timedelta(days=1)
+        bookings = [
+            (self.target - 2 * day, self.target + day),
+            (self.target + 3 * day, self.target + 5 * day),
+        ]
+
+        windows = nearest_windows(
+            bookings,
+            self.target,
+            2 * day,
+            4,
+            self.target - 30 * day,
+            self.target + 30 * day,
+        )
+
+        self.assertEqual(
+            [(start - self.target).days for start, _ in windows], [1, -4, -5, 5]
+        )
+        self.assertEqual(windows[0][1], self.target + 3 * day)
+
+    def test_api_returns_windows_for_page_in_one_bookings_query(self) -> None:
+        busy, free, _ = self.locations
+        self.book(busy, offset=0, days=3)
+        self.book(free, offset=-5, days=2)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse('booking:flexible_locations'),
+                {'date': self.target.date().isoformat(), 'nights': 2, 'count': 2},
+            )
+
+        windows = {
+            location['id']: [window['start'][:10] for window in location['windows']]
+            for location in response.json()['locations']
+        }
+        day = timedelta(days=1)
+        self.assertEqual(
+            windows[busy.pk],
+            [
+                (self.target - 2 * day).date().isoformat(),
+                (self.target - 3 * day).date().isoformat(),
+            ],
+        )
+        self.assertEqual(windows[free.pk][0], self.target.date().isoformat())
+
+    def test_invalid_parameters_are_rejected(self) -> None:
+        url = reverse('booking:flexible_locations')
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {'date': '2025-01-01', 'nights': 0}).status_code, 400
+        )
+
+    def test_index_keeps_booked_locations_in_flexible_mode(self) -> None:
+        for location in self.locations:
+            self.book(location, offset=0, days=2)
+        params = {
+            'start_date': self.target.date().isoformat(),
+            'end_date': (self.target + timedelta(days=2)).date().isoformat(),
+        }
+
+        response = self.client.get(reverse('booking:index'), params)
+        self.assertContains(response, 'Нічого не знайдено')
+
+        response = self.client.get(
+            reverse('booking:index'), {**params, 'flexible': '1'}
+        )
+        self.assertContains(response, 'Найближчі вільні дати', count=3)
+        self.assertContains(
+            response, (self.target + timedelta(days=2)).strftime('%d.%m'), count=3
+        )
+
+
+class TransferTests(TestCase):
+    """Тести для потокового імпорту та експорту даних."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+
+    def import_csv(self, kind: str, text: str, batch_size: int = 2):
+        errors = []
+        created = transfer.import_rows(
+            kind,
+            transfer.read_rows(StringIO(text), 'csv'),
+            lambda line, message: errors.append((line, message)),
+            batch_size,
+        )
+        return created, errors
+
+    def test_rows_with_errors_are_reported_and_skipped(self) -> None:
+        created, errors = self.import_csv(
+            'locations',
+            'name,country,city,region,street,amount,description,photo,price_per_night\n'
+            'Хата,Україна,Львів,Львівська,Зелена,2,Затишна хата,https://example.com/1.jpg,500\n'
+            'Без ціни,Україна,Львів,Львівська,Зелена,2,Опис,https://example.com/2.jpg,\n'
+            'Вілла,Україна,Одеса,Одеська,Морська,багато,Опис,не-посилання,900\n'
+            'Котедж,Україна,Київ,Київська,Лісова,4,Біля озера,https://example.com/3.jpg,700\n',
+        )
+
+        self.assertEqual(created, 2)
+        self.assertEqual([line for line, _ in errors], [3, 4])
+        self.assertIn('price_per_night', errors[0][1])
+        self.assertIn('amount', errors[1][1])
+        self.assertIn('photo', errors[1][1])
+        # Тригери FTS5 індексують імпортовані рядки
+        self.assertEqual(
+            list(
+                search.search_locations(Location.objects.all(), 'озера').values_list(
+                    'name', flat=True
+                )
+            ),
+            ['Котедж'],
+        )
+
+    def test_database_errors_are_reported_per_row(self) -> None:
+        existing = create_location('Наявна')
+        header = 'id,name,country,city,region,street,amount,description,photo,price_per_night\n'
+        row = '{},{},Україна,Львів,Львівська,Зелена,2,Опис,https://example.com/1.jpg,500\n'
+
+        created, errors = self.import_csv(
+            'locations',
+            header
+            + row.format(existing.pk + 1, 'Перша')
+            + row.format(existing.pk, 'Дубль')
+            + row.format(existing.pk + 2, 'Друга'),
+            batch_size=10,
+        )
+
+        self.assertEqual(created, 2)
+        self.assertEqual([line for line, _ in errors], [3])
+        self.assertEqual(
+            set(Location.objects.values_list('name', flat=True)),
+            {'Наявна', 'Перша', 'Друга'},
+        )
+
+    def test_booking_import_checks_relations_and_refreshes_state(self) -> None:
+        location = create_location()
+        availability.invalidate()
+        start = now() + timedelta(days=5)
+        self.assertTrue(
+            availability.is_free(location.pk, start, start + timedelta(days=1))
+        )
+
+        rows = [
+            {
+                'user_id': self.user.pk,
+                'location_id': location.pk,
+                'start_time': start.isoformat(),
+                'end_time': (start + timedelta(days=2)).isoformat(),
+                'confirmed': True,
+            },
+            {
+                'user_id': self.user.pk,
+                'location_id': location.pk + 100,
+                'start_time': start.isoformat(),
+                'end_time': (start + timedelta(days=2)).isoformat(),
+            },
+            {
+                'user_id': self.user.pk,
+                'location_id': location.pk,
+                'start_time': start.isoformat(),
+                'end_time': start.isoformat(),
+            },
+        ]
+        text = '\n'.join(json.dumps(row) for row in rows) + '\nне json\n'
+        errors = []
+        created = transfer.import_rows(
+            'bookings',
+            transfer.read_rows(StringIO(text), 'jsonl'),
+            lambda line, message: errors.append(line),
+        )
+
+        self.assertEqual(created, 1)
+        self.assertEqual(errors, [3, 4, 2])
+        location.refresh_from_db()
+        self.assertEqual(location.content_version, 1)
+        self.assertFalse(
+            availability.is_free(location.pk, start, start + timedelta(days=1))
+        )
+
+    def test_clashing_bookings_are_rejected(self) -> None:
+        location = create_location()
+        start = (now() + timedelta(days=5)).replace(microsecond=0)
+        Booking.objects.create(
+            user=self.user,
+            location=location,
+            start_time=start,
+            end_time=start + timedelta(days=2),
+            confirmed=True,
+        )
+        header = 'user_id,location_id,start_time,end_time,confirmed\n'
+        row = f'{self.user.pk},{location.pk},{{}},{{}},{{}}\n'
+
+        def days(first: int, last: int, confirmed: bool = True) -> str:
+            return row.format(
+                (start + timedelta(days=first)).isoformat(),
+                (start + timedelta(days=last)).isoformat(),
+                confirmed,
+            )
+
+        created, errors = self.import_csv(
+            'bookings',
+            header
+            + days(1, 3)
+            + days(2, 4)
+            + days(3, 5, confirmed=False)
+            + days(4, 6)
+            + f'{self.user.pk},{location.pk}\n',
+            batch_size=3,
+        )
+
+        # Рядок 4 перетинається з рядком 3 того самого пакета
+        self.assertEqual(created, 2)
+        self.assertEqual([line for line, _ in errors], [2, 4, 6])
+        self.assertIn('зайнятий', errors[0][1])
+        self.assertIn('Очікувалося полів: 5', errors[-1][1])
+        self.assertEqual(Booking.objects.filter(confirmed=True).count(), 3)
+
+    def test_export_and_import_round_trip_through_commands(self) -> None:
+        for number in range(5):
+            location = create_location(
+                f'Локація {number}', price_per_night=100 + number
+            )
+            Booking.objects.create(
+                user=self.user,
+                location=location,
+                start_time=now() + timedelta(days=number),
+                end_time=now() + timedelta(days=number + 1),
+                confirmed=bool(number % 2),
+            )
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = {
+                kind: os.path.join(directory, f'{kind}.{data_format}')
+                for kind, data_format in (('locations', 'csv'), ('bookings', 'jsonl'))
+            }
+            for kind, path in paths.items():
+                call_command(
+                    'export_data',
+                    kind,
+                    output=path,
+                    format=path.rsplit('.', 1)[1],
+                    chunk_size=2,
+                    stdout=StringIO(),
+                )
+            expected = list(Booking.objects.order_by('pk').values())
+
+            Location.objects.all().delete()
+            output = StringIO()
+            for kind, path in paths.items():
+                call_command('import_data', kind, path, batch_size=2, stdout=output)
+
+        self.assertIn('Імпортовано записів: 5, помилок: 0', output.getvalue())
+        self.assertEqual(list(Booking.objects.order_by('pk').values()), expected)
+        self.assertEqual(
+            list(
+                Location.objects.order_by('pk').values_list(
+                    'price_per_night', flat=True
+                )
+            ),
+            [100, 101, 102, 103, 104],
+        )
+
+
+class QueryBudgetTests(TestCase):
+    """Тести для обліку запитів до бази даних."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        for number in range(3):
+            Booking.objects.create(
+                user=cls.user,
+                location=create_location(f'Локація {number}'),
+                start_time=now(),
+                end_time=now() + timedelta(days=1),
+            )
+
+    def test_fingerprint_ignores_parameters_and_in_list_length(self) -> None:
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s)\n  AND a = %s'),
+            fingerprint('SELECT * FROM t WHERE id IN (%s) AND a = %s'),
+        )
+
+    def test_budget_reports_duplicates_with_template_line(self) -> None:
+        template = Template(
+            '{% for booking in bookings %}\n{{ booking.location.name }}\n{% endfor %}'
+        )
+
+        with self.assertRaises(QueryBudgetExceeded) as error:
+            with query_budget(2):
+                template.render(Context({'bookings': Booking.objects.all()}))
+
+        message = str(error.exception)
+        self.assertIn('4 запитів', message)
+        self.assertIn('3× SELECT', message)
+        self.assertIn('шаблон <unknown source>:2', message)
+
+    @query_budget(1)
+    def test_decorator_passes_within_budget(self) -> None:
+        self.assertEqual(len(Booking.objects.select_related('location')), 3)
+
+    @override_settings(QUERY_BUDGETS={'booking:location_detail': 1})
+    def test_middleware_logs_requests_over_budget(self) -> None:
+        location = Location.objects.first()
+
+        with self.assertLogs('booking.query_budget', 'WARNING') as logs:
+            self.client.get(reverse('booking:location_detail', args=[location.pk]))
+
+        self.assertIn('booking:location_detail', logs.output[0])
+        self.assertIn('ліміт 1', logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=False, QUERY_BUDGETS={'booking:location_detail': 1}
+    )
+    def test_middleware_is_off_unless_enabled(self) -> None:
+        location = Location.objects.first()
+
+        with self.assertNoLogs('booking.query_budget', 'WARNING'):
+            self.client.get(reverse('booking:location_detail', args=[location.pk]))
+
+    def test_report_lists_template_line_of_every_execution(self) -> None:
+        template = Template(
+            '{{ first.location.name }}\n'
+            '{% for booking in bookings %}\n{{ booking.location.name }}\n{% endfor %}'
+        )
+        context = Context(
+            {'first': Booking.objects.last(), 'bookings': Booking.objects.all()}
+        )
+
+        with record_queries() as recorder:
+            template.render(context)
+
+        report = recorder.report()
+        self.assertIn('4× SELECT', report)
+        self.assertIn('шаблон <unknown source>:1', report)
+        self.assertIn('шаблон <unknown source>:3', report)
+
+
+class FacetTests(TestCase):
+    """Тести для фасетного фільтрування локацій."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        for number, price in enumerate((400, 800, 1500)):
+            create_location(f'Київ {number}', price_per_night=price, amount=2)
+        create_location(
+            'Львів 0', city='Львів', region='Львівська', price_per_night=400, amount=4
+        )
+        create_location(
+            'Львів 1', city='Львів', region='Львівська', price_per_night=6000, amount=8
+        )
+
+    def setUp(self) -> None:
+        # on_commit у TestCase не виконується, тому кеш скидається вручну
+        invalidate_facets()
+
+    def counts(self, facets, name: str):
+        facet = next(facet for facet in facets if facet['name'] == name)
+        return {bucket['value']: bucket['count'] for bucket in facet['buckets']}
+
+    def test_counts_ignore_own_selection_but_apply_others(self) -> None:
+        facet_counts({})
+        # Для пошуку один раз читаються ідентифікатори знайдених локацій
+        with self.assertNumQueries(1):
+            facets = facet_counts({'city': ['Київ']}, 'Опис')
+        with self.assertNumQueries(0):
+            facet_counts({'city': ['Львів']}, 'Опис')
+
+        self.assertEqual(self.counts(facets, 'city'), {'Київ': 3, 'Львів': 2})
+        self.assertEqual(self.counts(facets, 'region'), {'Київська': 3})
+        self.assertEqual(
+            self.counts(facets, 'price'),
+            {'0-500': 1, '500-1000': 1, '1000-2000': 1, '2000-5000': 0, '5000+': 0},
+        )
+
+        facets = facet_counts({'city': ['Львів'], 'capacity': ['7+']}, 'Опис')
+        self.assertEqual(self.counts(facets, 'city'), {'Львів': 1})
+        self.assertEqual(self.counts(facets, 'capacity')['3-4'], 1)
+        self.assertEqual(self.counts(facets, 'price')['5000+'], 1)
+
+    def test_excluded_locations_are_subtracted_without_queries(self) -> None:
+        facet_counts({})
+        booked = frozenset(
+            Location.objects.filter(name__in=['Київ 0', 'Львів 1']).values_list(
+                'pk', flat=True
+            )
+        )
+
+        with self.assertNumQueries(0):
+            facets = facet_counts({}, excluded=booked)
+
+        self.assertEqual(self.counts(facets, 'city'), {'Київ': 2, 'Львів': 1})
+        self.assertEqual(self.counts(facets, 'price')['5000+'], 0)
+
+        facets = facet_counts({}, 'Львів', booked)
+        self.assertEqual(self.counts(facets, 'city'), {'Львів': 1})
+
+    def test_value_buckets_are_capped_but_keep_selection(self) -> None:
+        counts = {'Київ': 3, 'Львів': 2, 'Одеса': 2, 'Ужгород': 1}
+
+        self.assertEqual(top_buckets(counts, [], limit=2), [('Київ', 3), ('Львів', 2)])
+        self.assertEqual(
+            top_buckets(counts, ['Ужгород', 'Рівне'], limit=2),
+            [('Київ', 3), ('Львів', 2), ('Ужгород', 1), ('Рівне', 0)],
+        )
+
+    def test_index_filters_by_selected_facets(self) -> None:
+        response = self.client.get(
+            reverse('booking:index'), {'city': ['Київ', 'Львів'], 'price': '0-500'}
+        )
+
+        names = sorted(location.name for location in response.context['locations'])
+        self.assertEqual(names, ['Київ 0', 'Львів 0'])
+        content = response.content.decode()
+        self.assertIn('Львів (1)', content)
+        self.assertIn('до 500 грн (2)', content)
+        self.assertIn('від 5000 грн (1)', content)
+
+    def test_catalogue_counts_are_cached_until_invalidated(self) -> None:
+        with self.assertNumQueries(1):
+            facet_counts({})
+        with self.assertNumQueries(0):
+            facets = facet_counts({'city': ['Київ']})
+        self.assertEqual(self.counts(facets, 'city'), {'Київ': 3, 'Львів': 2})
+
+        create_location('Одеса 0', city='Одеса', region='Одеська')
+        invalidate_facets()
+
+        facets = facet_counts({})
+        self.assertEqual(
+            self.counts(facets, 'city'), {'Київ': 3, 'Львів': 2, 'Одеса': 1}
+        )
+
+    def test_location_changes_are_applied_without_rebuilding(self) -> None:
+        # Окремий екземпляр індексу відтворює інший процес
+        other = FacetIndex()
+        other.rows()
+        facet_counts({})
+        moved = Location.objects.get(name='Київ 0')
+        moved.city, moved.region, moved.price_per_night = 'Одеса', 'Одеська', 6000
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.save()
+            Location.objects.get(name='Львів 1').delete()
+
+        with (
+            mock.patch.object(FacetIndex, '_build') as build,
+            self.assertNumQueries(0),
+        ):
+            facets = facet_counts({})
+            rows = other.rows()
+        build.assert_not_called()
+        self.assertEqual(
+            self.counts(facets, 'city'), {'Київ': 2, 'Львів': 1, 'Одеса': 1}
+        )
+        self.assertEqual(self.counts(facets, 'price')['5000+'], 1)
+        self.assertEqual(sum(row['total'] for row in rows), 4)
+
+        # Масова зміна не має запису в журналі, тож індекс перебудовується
+        invalidate_facets()
+        with mock.patch.object(other, '_build', wraps=other._build) as build:
+            other.rows()
+        build.assert_called_once()
+
+
+class AsyncViewTests(TestCase):
+    """Тести для сторінок під ASGI."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location('Асинхронна локація')
+        Favourite.objects.create(user=cls.user, location=cls.location)
+        Review.objects.create(
+            user=cls.user, location=cls.location, rating=4, comment='Добре'
+        )
+        Booking.objects.create(
+            user=cls.user,
+            location=cls.location,
+            start_time=now(),
+            end_time=now() + timedelta(days=2),
+            confirmed=True,
+        )
+
+    async def test_pages_render_under_asgi(self) -> None:
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('booking:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['favourites'], [self.location])
+        self.assertIn('Асинхронна локація', response.content.decode())
+
+        response = await self.async_client.get(
+            reverse('booking:location_detail', args=[self.location.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user_review'].comment, 'Добре')
+        self.assertIn('Добре', response.content.decode())
+
+        response = await self.async_client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Асинхронна локація', response.content.decode())
+
+    async def test_anonymous_index_and_login_redirect(self) -> None:
+        response = await self.async_client.get(reverse('booking:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['favourites'])
+
+        response = await self.async_client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(QUERY_BUDGETS={'booking:location_detail': 1})
+    async def test_query_budget_middleware_records_async_requests(self) -> None:
+        with self.assertLogs('booking.query_budget', 'WARNING') as logs:
+            await self.async_client.get(
+                reverse('booking:location_detail', args=[self.location.pk])
+            )
+
+        self.assertIn('booking:location_detail', logs.output[0])
+
+
+class AsyncParallelReadsTests(TransactionTestCase):
+    """Тести для паралельних читань асинхронних представлень."""
+
+    # TransactionTestCase: потоки пулу мають власні з'єднання й не бачать
+    # незафіксованих даних транзакції TestCase
+    def setUp(self) -> None:
+        cache.clear()
+        patcher = mock.patch('booking.async_helpers.ASYNC_PARALLEL_READS', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user('user', password='password')
+        self.location = create_location('Паралельна локація')
+        Favourite.objects.create(user=self.user, location=self.location)
+        Booking.objects.create(
+            user=self.user,
+            location=self.location,
+            start_time=now() + timedelta(days=1),
+            end_time=now() + timedelta(days=2),
+        )
+
+    async def test_pages_read_in_worker_threads(self) -> None:
+        await self.async_client.aforce_login(self.user)
+        threads = set()
+        rows = facet_index.rows
+
+        def record_thread(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return rows(*args, **kwargs)
+
+        with mock.patch.object(facet_index, 'rows', side_effect=record_thread):
+            response = await self.async_client.get(reverse('booking:index'))
+        self.assertEqual(response.context['favourites'], [self.location])
+        # Інакше читання виконувалися б у потоці тесту (thread_sensitive)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread().ident, threads)
+
+        response = await self.async_client.get(
+            reverse('booking:location_detail', args=[self.location.pk])
+        )
+        self.assertContains(response, 'Паралельна локація')
+
+        response = await self.async_client.get(reverse('accounts:profile'))
+        self.assertContains(response, 'Паралельна локація')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """Тести для читання з реплік та закріплення за основною базою."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_reads_go_to_replica_and_writes_to_primary(self) -> None:
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_read(Location), 'replica')
+        self.assertEqual(router.db_for_write(Location), 'default')
+        with use_primary():
+            self.assertEqual(router.db_for_read(Location), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'booking'))
+        # Сесії та користувачі завжди читаються з основної бази
+        self.assertEqual(router.db_for_read(User), 'default')
+        self.assertEqual(router.db_for_read(Session), 'default')
+
+    def test_conflict_checks_read_from_primary(self) -> None:
+        availability.invalidate()
+        booking = Booking(
+            user=self.user,
+            location=self.location,
+            start_time=now() + timedelta(days=1),
+            end_time=now() + timedelta(days=2),
+        )
+
+        # Псевдонім replica не налаштовано, тож читання з нього впало б
+        with use_primary():
+            reserve_booking(booking)
+        confirm_booking(booking)
+
+        self.assertTrue(Booking.objects.using('default').get(pk=booking.pk).confirmed)
+
+    def test_client_is_pinned_to_primary_after_post(self) -> None:
+        detail = reverse('booking:location_detail', args=[self.location.pk])
+        # Без закріплення сторінка читає з неналаштованої репліки
+        with self.assertRaises(ConnectionDoesNotExist):
+            self.client.get(detail)
+
+        with use_primary():
+            self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('booking:like_location', args=[self.location.pk])
+        )
+        written_at = float(response.cookies[PRIMARY_COOKIE].value)
+
+        # Репліку ще не оновлювали або оновили до запису
+        for synced_at in (None, written_at - 60):
+            if synced_at is not None:
+                mark_replica_synced('replica', synced_at)
+            response = self.client.get(detail)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'Лайк (1)')
+
+        # Після оновлення репліки читання повертаються до неї
+        mark_replica_synced('replica', written_at + 1)
+        with self.assertRaises(ConnectionDoesNotExist):
+            self.client.get(detail)
+
+        # Застаріле закріплення прибирається
+        request = RequestFactory().get(detail)
+        request.COOKIES[PRIMARY_COOKIE] = str(written_at)
+        response = ReplicaPinningMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]['max-age'], 0)
+
+
+class ReplicaCopyTests(TransactionTestCase):
+    """Тести для копіювання основної бази в локальну SQLite-репліку."""
+
+    # TransactionTestCase: відкрита транзакція TestCase блокувала б копіювання
+    def test_copy_database_creates_sqlite_replica(self) -> None:
+        create_location('Скопійована локація')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            copy_database('default', path)
+
+            replica = sqlite3.connect(path)
+            try:
+                tables = {
+                    name
+                    for (name,) in replica.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table'"
+                    )
+                }
+                names = replica.execute('SELECT name FROM booking_location').fetchall()
+            finally:
+                replica.close()
+
+        self.assertIn('booking_booking', tables)
+        self.assertEqual(names, [('Скопійована локація',)])
+
+
+class SqliteProfileTests(TestCase):
+    """Тести для повторів під час блокування та обслуговування SQLite."""
+
+    def failing(self, errors):
+        calls = []
+
+        def func() -> str:
+            calls.append(1)
+            if len(calls) <= errors:
+                raise OperationalError('database is locked')
+            return 'готово'
+
+        return func, calls
+
+    @mock.patch('booking.sqlite.time.sleep')
+    def test_lock_errors_are_retried_with_bounded_backoff(self, sleep) -> None:
+        func, calls = self.failing(errors=3)
+
+        # Повтор можливий лише поза транзакцією
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(retry_on_lock(func, retries=4, delay=1), 'готово')
+            self.assertEqual(len(calls), 4)
+            self.assertTrue(all(call.args[0] <= 0.5 for call in sleep.call_args_list))
+
+            func, calls = self.failing(errors=5)
+            with self.assertRaises(OperationalError):
+                retry_on_lock(func, retries=3)
+            self.assertEqual(len(calls), 3)
+
+    def test_other_errors_and_outer_transactions_are_not_retried(self) -> None:
+        calls = []
+
+        def broken() -> None:
+            calls.append(1)
+            raise OperationalError('no such table: missing')
+
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            with self.assertRaises(OperationalError):
+                retry_on_lock(broken)
+        self.assertEqual(len(calls), 1)
+
+        # TestCase виконує тест у транзакції
+        func, calls = self.failing(errors=1)
+        with self.assertRaises(OperationalError):
+            retry_on_lock(func)
+        self.assertEqual(len(calls), 1)
+
+
+class SqliteMaintenanceTests(TransactionTestCase):
+    """Тести для команди обслуговування SQLite."""
+
+    # TransactionTestCase: ANALYZE не виконується у відкритій транзакції тесту
+    def test_maintenance_command_checkpoints_and_analyzes(self) -> None:
+        create_location()
+        out = StringIO()
+
+        call_command('sqlite_maintenance', '--mode', 'PASSIVE', stdout=out)
+
+        self.assertIn('Контрольна точка PASSIVE', out.getvalue())
+        self.assertIn('Статистику індексів оновлено', out.getvalue())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class HoldExpiryTests(TestCase):
+    """Тести для терміну дії непідтверджених бронювань та їх прибирання."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location()
+
+    def setUp(self) -> None:
+        availability.invalidate()
+        self.start = now() + timedelta(days=1)
+
+    def reserve(self, offset: int = 0, expired: bool = False) -> Booking:
+        booking = reserve_booking(
+            Booking(
+                user=self.user,
+                location=self.location,
+                start_time=self.start + timedelta(days=offset),
+                end_time=self.start + timedelta(days=offset + 1),
+            )
+        )
+        if expired:
+            Booking.objects.filter(pk=booking.pk).update(
+                expires_at=now() - timedelta(minutes=1)
+            )
+        return booking
+
+    def test_reserved_booking_gets_hold_ttl_and_confirmation_clears_it(self) -> None:
+        booking = self.reserve()
+        self.assertGreater(booking.expires_at, now())
+
+        confirm_booking(booking)
+
+        booking.refresh_from_db()
+        self.assertTrue(booking.confirmed)
+        self.assertIsNone(booking.expires_at)
+
+    def test_expired_code_is_rejected(self) -> None:
+        booking = self.reserve(expired=True)
+
+        with self.assertRaises(HoldExpired):
+            confirm_booking(booking)
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('booking:activation', args=[booking.activation_code])
+        )
+
+        self.assertContains(response, 'Час на підтвердження', status_code=410)
+        booking.refresh_from_db()
+        self.assertFalse(booking.confirmed)
+
+    def test_swept_booking_cannot_be_confirmed(self) -> None:
+        booking = self.reserve(expired=True)
+        sweep_expired_holds()
+
+        with self.assertRaises(HoldExpired):
+            confirm_booking(booking)
+
+    def test_sweeper_deletes_only_expired_holds_in_batches(self) -> None:
+        expired = [self.reserve(offset, expired=True) for offset in range(5)]
+        live = self.reserve(offset=10)
+        confirmed = confirm_booking(self.reserve(offset=20))
+        Booking.objects.filter(pk=confirmed.pk).update(
+            expires_at=now() - timedelta(minutes=1)
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            swept = sweep_expired_holds(batch_size=2)
+
+        self.assertEqual(swept, len(expired))
+        self.assertEqual(
+            set(Booking.objects.values_list('pk', flat=True)), {live.pk, confirmed.pk}
+        )
+        deletes = [q for q in queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+        self.assertFalse(expired_holds().exists())
+
+    def test_sweeping_holds_keeps_location_version(self) -> None:
+        self.reserve(expired=True)
+        version = Location.objects.get(pk=self.location.pk).content_version
+
+        sweep_expired_holds()
+
+        self.assertEqual(
+            Location.objects.get(pk=self.location.pk).content_version, version
+        )
+
+    def test_command_archives_swept_holds(self) -> None:
+        booking = self.reserve(expired=True)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'holds.jsonl')
+            out = StringIO()
+            call_command('sweep_holds', '--archive', path, stdout=out)
+            with open(path, encoding='utf-8') as stream:
+                rows = [json.loads(line) for line in stream]
+
+        self.assertIn('Видалено прострочених бронювань: 1', out.getvalue())
+        self.assertEqual([row['id'] for row in rows], [booking.pk])
+        self.assertEqual(rows[0]['activation_code'], str(booking.activation_code))
+        self.assertFalse(rows[0]['confirmed'])
+
+    def test_expiry_query_uses_partial_index(self) -> None:
+        plan = expired_holds().values('pk').explain()
+
+        self.assertIn('booking_hold_expiry_idx', plan)
+
+    def test_sweeper_thread_is_disabled_without_interval(self) -> None:
+        self.assertIsNone(start_sweeper(0))
+
+
+class ProfileBookingsTests(TestCase):
+    """Тести для зафіксованої ціни та історії бронювань у профілі."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.location = create_location(price_per_night=100)
+
+    def setUp(self) -> None:
+        availability.invalidate()
+        self.client.force_login(self.user)
+
+    def add_past_bookings(self, count: int) -> None:
+        start = now() - timedelta(days=3 * count + 10)
+        Booking.objects.bulk_create(
+            Booking(
+                user=self.user,
+                location=self.location,
+                start_time=start + timedelta(days=3 * number),
+                end_time=start + timedelta(days=3 * number + 2),
+                confirmed=True,
+                nightly_rate=100,
+                nights=2,
+                price_total=200,
+            )
+            for number in range(count)
+        )
+
+    def profile_queries(self, params: Optional[dict] = None) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('accounts:profile'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_price_is_captured_at_reservation(self) -> None:
+        start = now() + timedelta(days=1)
+        booking = reserve_booking(
+            Booking(
+                user=self.user,
+                location=self.location,
+                start_time=start,
+                end_time=start + timedelta(days=3),
+            )
+        )
+        Location.objects.filter(pk=self.location.pk).update(price_per_night=500)
+
+        booking = Booking.objects.get(pk=booking.pk)
+        with self.assertNumQueries(0):
+            total = booking.total_price()
+
+        self.assertEqual((booking.nightly_rate, booking.nights), (100, 3))
+        self.assertEqual(total, 300)
+
+    def test_profile_query_count_does_not_grow_with_history(self) -> None:
+        self.add_past_bookings(5)
+        self.profile_queries()  # Прогріває кеш реклами
+        small = self.profile_queries()
+        self.add_past_bookings(1000)
+
+        self.assertEqual(self.profile_queries(), small)
+
+    def test_profile_splits_and_paginates_bookings(self) -> None:
+        self.add_past_bookings(15)
+        start = now() + timedelta(days=1)
+        upcoming = Booking.objects.create(
+            user=self.user,
+            location=self.location,
+            start_time=start,
+            end_time=start + timedelta(days=1),
+            confirmed=True,
+        )
+
+        response = self.client.get(reverse('accounts:profile'))
+
+        self.assertEqual(response.context['upcoming_bookings'], [upcoming])
+        self.assertIsNone(response.context['upcoming_next_url'])
+        past = response.context['past_bookings']
+        self.assertEqual(len(past), 10)
+        self.assertEqual(past, sorted(past, key=lambda b: b.start_time, reverse=True))
+
+        response = self.client.get(
+            reverse('accounts:profile') + response.context['past_next_url']
+        )
+        self.assertEqual(len(response.context['past_bookings']), 5)
+        self.assertEqual(response.context['upcoming_bookings'], [upcoming])
+        self.assertIsNone(response.context['past_next_url'])
+
+    def test_invalid_cursor_is_rejected(self) -> None:
+        response = self.client.get(reverse('accounts:profile'), {'past': '!!!'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class FavouriteIdsTests(TestCase):
+    """Тести для закешованого набору улюблених локацій користувача."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.user = User.objects.create_user('user', password='password')
+        cls.locations = [create_location(f'Локація {number}') for number in range(3)]
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_ids_are_cached_until_favourites_change(self) -> None:
+        Favourite.objects.create(user=self.user, location=self.locations[0])
+
+        self.assertEqual(favourite_ids(self.user.pk), {self.locations[0].pk})
+        with self.assertNumQueries(0):
+            favourite_ids(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('booking:favourite_location', args=[self.locations[1].pk])
+            )
+        self.assertEqual(
+            favourite_ids(self.user.pk),
+            {self.locations[0].pk, self.locations[1].pk},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('booking:favourite_location', args=[self.locations[0].pk])
+            )
+        self.assertEqual(favourite_ids(self.user.pk), {self.locations[1].pk})
+
+    def test_detail_page_marks_favourite(self) -> None:
+        Favourite.objects.create(user=self.user, location=self.locations[0])
+
+        response = self.client.get(
+            reverse('booking:location_detail', args=[self.locations[0].pk])
+        )
+        self.assertContains(response, 'Прибрати з улюблених')
+
+        response = self.client.get(
+            reverse('booking:location_detail', args=[self.locations[1].pk])
+        )
+        self.assertContains(response, 'Додати до улюблених')
+
+    def test_many_favourites_do_not_add_queries_to_card_pages(self) -> None:
+        extra = Location.objects.bulk_create(
+            Location(
+                name=f'Улюблена {number}',
+                country='Україна',
+                city='Київ',
+                region='Київська',
+                street='Хрещатик',
+                amount=2,
+                description='Опис',
+                photo='https://example.com/photo.jpg',
+                price_per_night=100,
+            )
+            for number in range(500)
+        )
+        Favourite.objects.bulk_create(
+            Favourite(user=self.user, location=location) for location in extra
+        )
+        url = reverse('booking:load_more_locations')
+        cursor = self.client.get(reverse('booking:index')).context['next_page_url']
+        cursor = cursor.split('cursor=')[1]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'cursor': cursor})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [query for query in queries if 'booking_favourite' in query['sql']]
+        )
+        self.assertEqual(
+            response.json()['html'].count('fa-solid fa-heart'), LOCATIONS_PAGE_SIZE
+        )
+
+
+class ReviewPaginationTests(TestCase):
+    """Тести для посторінкового виведення відгуків локації."""
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        cls.location = create_location()
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def add_reviews(self, count: int, offset: int = 0) -> None:
+        users = User.objects.bulk_create(
+            User(username=f'reviewer{offset + number}', first_name='Ім’я')
+            for number in range(count)
+        )
+        for number, user in enumerate(users):
+            Review.objects.create(
+                user=user,
+                location=self.location,
+                rating=number % 5 + 1,
+                comment=f'Відгук {offset + number}',
+            )
+
+    def detail(self, params: Optional[dict] = None):
+        return self.client.get(
+            reverse('booking:location_detail', args=[self.location.pk]), params or {}
+        )
+
+    def test_reviews_are_paginated_newest_first(self) -> None:
+        self.add_reviews(REVIEWS_PAGE_SIZE + 5)
+
+        response = self.detail()
+        first_page = response.context['reviews']
+        self.assertEqual(len(first_page), REVIEWS_PAGE_SIZE)
+        self.assertEqual(first_page[0].comment, f'Відгук {REVIEWS_PAGE_SIZE + 4}')
+
+        next_url = response.context['next_reviews_url']
+        response = self.client.get(
+            reverse('booking:location_detail', args=[self.location.pk]) + next_url
+        )
+        second_page = response.context['reviews']
+        self.assertEqual(len(second_page), 5)
+        self.assertEqual(second_page[-1].comment, 'Відгук 0')
+        self.assertIsNone(response.context['next_reviews_url'])
+        self.assertFalse({r.pk for r in first_page} & {r.pk for r in second_page})
+
+    def test_query_count_does_not_depend_on_review_count(self) -> None:
+        self.add_reviews(3)
+        self.detail()  # Прогріває кеш реклами
+        with CaptureQueriesContext(connection) as few:
+            self.detail()
+
+        self.add_reviews(60, offset=3)
+        with CaptureQueriesContext(connection) as many:
+            response = self.detail()
+
+        self.assertEqual(len(many), len(few))
+        self.assertContains(response, '5 ★')
+
+    def test_invalid_cursor_is_rejected(self) -> None:
+        self.assertEqual(self.detail({'reviews': '!!!'}).status_code, 400)
+
+
+class ImagePipelineTests(TestCase):
+    """Тести для генерації та видачі зменшених варіантів зображень."""
+
+    def setUp(self) -> None:
+        from PIL import Image
+
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for patch in (
+            mock.patch.object(images, 'IMAGE_FETCHER', 'booking.images.fetch_file'),
+            mock.patch.object(
+                images, 'IMAGE_CACHE_ROOT', Path(self.directory, 'cache')
+            ),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.large = os.path.join(self.directory, 'large.png')
+        Image.new('RGB', (2000, 1000), 'teal').save(self.large)
+        # Та сама картинка за іншою адресою має спільні варіанти
+        self.copy = os.path.join(self.directory, 'copy.png')
+        with open(self.large, 'rb') as source, open(self.copy, 'wb') as target:
+            target.write(source.read())
+        self.small = os.path.join(self.directory, 'small.png')
+        Image.new('RGB', (200, 100), 'orange').save(self.small)
+
+    def build(self, *args: str) -> str:
+        out, err = StringIO(), StringIO()
+        call_command('build_images', '--workers', '1', *args, stdout=out, stderr=err)
+        return out.getvalue() + err.getvalue()
+
+    def test_command_generates_content_addressed_variants(self) -> None:
+        from PIL import Image
+
+        first = create_location('Перша', photo=self.large)
+        second = create_location('Друга', photo=self.copy)
+        small = create_location('Мала', photo=self.small)
+        broken = create_location('Без фото', photo='/missing.png')
+
+        output = self.build()
+
+        for location in (first, second, small, broken):
+            location.refresh_from_db()
+        self.assertIn('Оброблено зображень: 3, помилок: 1', output)
+        self.assertEqual(len(first.photo_digest), 64)
+        self.assertEqual(first.photo_digest, second.photo_digest)
+        self.assertEqual(broken.photo_digest, '')
+        self.assertEqual(first.content_version, 1)
+        with Image.open(images.variant_path(first.photo_digest, 320, 'webp')) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 160)))
+        self.assertEqual((first.photo_width, small.photo_width), (2000, 200))
+        # Вужчий за всі ширини оригінал має один варіант у власній ширині
+        with Image.open(images.variant_path(small.photo_digest, 200, 'jpg')) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (200, 100)))
+        self.assertFalse(images.variant_path(small.photo_digest, 320, 'jpg').exists())
+
+        self.assertIn('Оброблено зображень: 0, помилок: 1', self.build())
+
+    def test_command_uses_process_pool(self) -> None:
+        location = create_location(photo=self.large)
+
+        call_command('build_images', '--workers', '2', stdout=StringIO())
+
+        location.refresh_from_db()
+        self.assertTrue(
+            images.variant_path(location.photo_digest, 1280, 'jpg').exists()
+        )
+
+    def test_templates_emit_srcset_and_variants_are_cached_forever(self) -> None:
+        location = create_location(photo=self.large)
+        self.build()
+        location.refresh_from_db()
+        digest = location.photo_digest
+
+        response = self.client.get(reverse('booking:index'))
+        self.assertContains(response, f'/images/{digest}/320.webp 320w')
+        self.assertContains(response, f'src="/images/{digest}/640.jpg"')
+
+        response = self.client.get(f'/images/{digest}/640.webp')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertTrue(b''.join(response.streaming_content))
+        self.assertEqual(self.client.get(f'/images/{digest}/641.webp').status_code, 404)
+        self.assertEqual(self.client.get('/images/../640.webp').status_code, 404)
+
+    def test_srcset_lists_only_generated_widths(self) -> None:
+        location = create_location(photo=self.small)
+        self.build()
+        location.refresh_from_db()
+        digest = location.photo_digest
+
+        response = self.client.get(reverse('booking:index'))
+        self.assertContains(response, f'srcset="/images/{digest}/200.webp 200w"')
+        self.assertContains(response, f'src="/images/{digest}/200.jpg"')
+        self.assertNotContains(response, f'/images/{digest}/320.webp')
+        self.assertEqual(images.variant_widths(1000), [320, 640, 1000])
+        self.assertEqual(images.variant_widths(1280), [320, 640, 1280])
+
+    def test_fetch_errors_are_reported_and_others_propagate(self) -> None:
+        with mock.patch(
+            'booking.images.fetch_file',
+            side_effect=urllib.error.URLError('timed out'),
+        ):
+            url, digest, width, error = images.process_source(
+                'https://example.com/a.jpg', 'booking.images.fetch_file'
+            )
+        self.assertEqual((digest, width), (None, 0))
+        self.assertIn('timed out', error)
+
+        with (
+            mock.patch('booking.images.fetch_file', side_effect=KeyError('bug')),
+            self.assertRaises(KeyError),
+        ):
+            images.process_source(self.large, 'booking.images.fetch_file')
+
+    def test_changing_photo_clears_digest(self) -> None:
+        location = create_location(photo=self.large)
+        self.build()
+        location.refresh_from_db()
+
+        location.photo = self.small
+        location.save()
+
+        location.refresh_from_db()
+        self.assertEqual((location.photo_digest, location.photo_width), ('', 0))
+        response = self.client.get(reverse('booking:index'))
+        self.assertContains(response, f'src="{self.small}"')
+
+
+class StaticAssetsTests(TestCase):
+    """Тести для статичних файлів з хешем, стисненням та кешуванням."""
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        # Лише файли проєкту, щоб не стискати статику адмінки в кожному тесті
+        settings = override_settings(
+            STATIC_ROOT=self.root,
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.url = Template("{% load static %}{% static 'js/loader.js' %}").render(
+            Context()
+        )
+        self.original = (self.root / 'js' / 'loader.js').read_bytes()
+
+    def test_collectstatic_writes_hashed_and_compressed_copies(self) -> None:
+        self.assertRegex(self.url, r'^/static/js/loader\.[0-9a-f]{12}\.js$')
+        path = self.root / self.url.removeprefix('/static/')
+        self.assertEqual(path.read_bytes(), self.original)
+        self.assertEqual(
+            gzip.decompress(Path(f'{path}.gz').read_bytes()), self.original
+        )
+        self.assertEqual(
+            brotli.decompress(Path(f'{path}.br').read_bytes()), self.original
+        )
+        # Зображення вже стиснуті, тому копій для них немає
+        self.assertTrue((self.root / 'images' / 'cute.png').exists())
+        self.assertFalse((self.root / 'images' / 'cute.png.gz').exists())
+
+    def test_middleware_negotiates_encoding(self) -> None:
+        decoders = {'br': brotli.decompress, 'gzip': gzip.decompress, None: bytes}
+        for header, encoding in (
+            ('gzip, deflate, br', 'br'),
+            ('gzip', 'gzip'),
+            ('br;q=0, gzip', 'gzip'),
+            ('*', 'br'),
+            ('', None),
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(response['Content-Type'], 'text/javascript')
+                self.assertEqual(int(response['Content-Length']), len(response.content))
+                self.assertEqual(decoders[encoding](response.content), self.original)
+
+    def test_hashed_files_are_immutable(self) -> None:
+        hashed = self.client.get(self.url)
+        original = self.client.get('/static/js/loader.js')
+
+        self.assertIn('immutable', hashed['Cache-Control'])
+        self.assertIn('max-age=31536000', hashed['Cache-Control'])
+        self.assertNotIn('immutable', original['Cache-Control'])
+        self.assertIn('max-age=60', original['Cache-Control'])
+        revalidated = self.client.get(
+            '/static/js/loader.js', HTTP_IF_MODIFIED_SINCE=original['Last-Modified']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_changed_files_are_picked_up_without_restart(self) -> None:
+        path = self.root / 'js' / 'loader.js'
+        first = self.client.get('/static/js/loader.js', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+
+        # Новий вміст без стиснутих копій, як після зміни файлу на диску
+        path.write_bytes(b'console.log(1);')
+        Path(f'{path}.gz').unlink()
+        Path(f'{path}.br').unlink()
+        os.utime(path, (path.stat().st_atime, path.stat().st_mtime + 10))
+        second = self.client.get('/static/js/loader.js', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertIsNone(second.get('Content-Encoding'))
+        self.assertEqual(second.content, b'console.log(1);')
+        self.assertNotEqual(second['Last-Modified'], first['Last-Modified'])
+
+        path.unlink()
+        self.assertEqual(self.client.get('/static/js/loader.js').status_code, 404)
+
+    def test_missing_and_outside_files_fall_through(self) -> None:
+        self.assertEqual(self.client.get('/static/js/missing.js').status_code, 404)
+        self.assertEqual(self.client.get('/static/../manage.py').status_code, 404)
+
+    def test_compressed_copies_and_manifest_are_not_served(self) -> None:
+        path = self.root / self.url.removeprefix('/static/')
+        for suffix in ('.gz', '.br'):
+            self.assertTrue(Path(f'{path}{suffix}').is_file())
+            response = self.client.get(f'{self.url}{suffix}')
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/static/staticfiles.json').status_code, 404)
+        head = self.client.head(self.url)
+        self.assertEqual(head.status_code, 200)
+        self.assertEqual(head.content, b'')
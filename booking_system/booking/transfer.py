@@ -0,0 +1,432 @@
+import csv
+import json
+from itertools import islice
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+    Type,
+)
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.utils.timezone import is_naive, make_aware
+
+from .availability import LocationIntervals, availability
+from .facets import invalidate_facets
+from .models import Booking, Location
+from .routers import use_primary
+
+# Поля, які імпортуються та експортуються для кожного типу даних
+TRANSFER_FIELDS: Dict[str, Tuple[Type[models.Model], List[str]]] = {
+    'locations': (
+        Location,
+        [
+            'id',
+            'name',
+            'country',
+            'city',
+            'region',
+            'street',
+            'amount',
+            'description',
+            'photo',
+            'price_per_night',
+        ],
+    ),
+    'bookings': (
+        Booking,
+        [
+            'id',
+            'user_id',
+            'location_id',
+            'start_time',
+            'end_time',
+            'confirmed',
+            'activation_code',
+            'expires_at',
+            'nightly_rate',
+            'nights',
+            'price_total',
+        ],
+    ),
+}
+FORMATS = ('csv', 'jsonl')
+
+ErrorHandler = Callable[[int, str], None]
+
+
+def read_rows(
+    stream: IO[str], data_format: str
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Читає записи з потоку по одному, не завантажуючи файл у пам'ять.
+
+    Args:
+        stream (IO[str]): Текстовий потік.
+        data_format (str): Формат даних (`csv` або `jsonl`).
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, Any]]]: Номер рядка у файлі та запис.
+    """
+    if data_format == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        for values in reader:
+            if not values:
+                continue
+            try:
+                row = dict(zip(header, values, strict=True))
+            except ValueError:
+                row = {
+                    '__error__': f'Очікувалося полів: {len(header)}, '
+                    f'отримано: {len(values)}.'
+                }
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            row = {'__error__': f'Некоректний JSON: {error}'}
+        yield line_number, row
+
+
+def build_instance(
+    model: Type[models.Model], names: List[str], row: Dict[str, Any]
+) -> models.Model:
+    """
+    Створює об'єкт моделі із запису та перевіряє значення полів.
+
+    Зовнішні ключі перевіряються лише на формат, їхнє існування перевіряє
+    `import_rows` одним запитом на пакет.
+
+    Args:
+        model (Type[models.Model]): Модель.
+        names (List[str]): Поля, які можна імпортувати.
+        row (Dict[str, Any]): Запис із файлу.
+
+    Raises:
+        ValidationError: Якщо значення некоректні.
+
+    Returns:
+        models.Model: Незбережений об'єкт моделі.
+    """
+    if not isinstance(row, dict):
+        raise ValidationError('Запис має бути об’єктом.')
+    if '__error__' in row:
+        raise ValidationError(row['__error__'])
+
+    values = {}
+    errors = {}
+    for name in names:
+        raw = row.get(name)
+        field = model._meta.get_field(name)
+        if raw in (None, ''):
+            if field.primary_key or field.has_default() or field.null:
+                continue
+            errors[name] = 'Обов’язкове поле.'
+            continue
+
+        try:
+            if field.is_relation:
+                value = field.target_field.to_python(raw)
+            else:
+                value = field.clean(raw, None)
+        except ValidationError as error:
+            errors[name] = ' '.join(error.messages)
+            continue
+
+        if isinstance(field, models.DateTimeField) and is_naive(value):
+            value = make_aware(value)
+        values[field.attname] = value
+
+    if errors:
+        raise ValidationError(
+            '; '.join(f'{name}: {message}' for name, message in errors.items())
+        )
+
+    instance = model(**values)
+    if isinstance(instance, Booking) and instance.start_time >= instance.end_time:
+        raise ValidationError('Дата закінчення має бути пізніше дати початку.')
+    return instance
+
+
+def missing_relations(
+    model: Type[models.Model], instances: List[models.Model]
+) -> Dict[str, Set[Any]]:
+    """
+    Знаходить значення зовнішніх ключів пакета, яких немає в базі даних.
+
+    Args:
+        model (Type[models.Model]): Модель.
+        instances (List[models.Model]): Об'єкти пакета.
+
+    Returns:
+        Dict[str, Set[Any]]: Відсутні значення для кожного зовнішнього ключа.
+    """
+    missing = {}
+    for field in model._meta.concrete_fields:
+        if not field.is_relation:
+            continue
+        values = {getattr(instance, field.attname) for instance in instances}
+        existing = set(
+            field.related_model._base_manager.filter(pk__in=values).values_list(
+                'pk', flat=True
+            )
+        )
+        missing[field.attname] = values - existing
+    return missing
+
+
+def refresh_locations(model: Type[models.Model], saved: List[models.Model]) -> None:
+    """
+    Збільшує версії локацій збережених бронювань.
+
+    bulk_create не надсилає сигнали, тому версії оновлюються явно.
+
+    Args:
+        model (Type[models.Model]): Модель.
+        saved (List[models.Model]): Збережені об'єкти.
+    """
+    if model is Booking and saved:
+        Location.objects.filter(
+            pk__in={booking.location_id for booking in saved}
+        ).bump_version()
+
+
+def reject_conflicts(
+    batch: List[Tuple[int, Booking]], on_error: ErrorHandler
+) -> List[Tuple[int, Booking]]:
+    """
+    Відкидає бронювання, які перетинаються з підтвердженими.
+
+    Перевірка та сама, що й у `reserve_booking`: проміжок не може
+    перетинатися з підтвердженим бронюванням у базі даних або з
+    підтвердженим бронюванням, імпортованим раніше в цьому ж файлі.
+    Викликається в транзакції пакета, тому локації блокуються до коміту.
+
+    Args:
+        batch (List[Tuple[int, Booking]]): Номери рядків та бронювання.
+        on_error (ErrorHandler): Обробник помилок рядків.
+
+    Returns:
+        List[Tuple[int, Booking]]: Бронювання без конфліктів.
+    """
+    # reservations імпортує holds, а той - цей модуль
+    from .reservations import BookingConflict, lock_location
+
+    location_ids = sorted({booking.location_id for _, booking in batch})
+    for location_id in location_ids:
+        lock_location(location_id)
+
+    confirmed = Booking.objects.filter(
+        location_id__in=location_ids,
+        confirmed=True,
+        start_time__lt=max(booking.end_time for _, booking in batch),
+        end_time__gt=min(booking.start_time for _, booking in batch),
+    ).values_list('pk', 'location_id', 'start_time', 'end_time')
+    intervals: Dict[int, LocationIntervals] = {}
+    for booking_id, location_id, start, end in confirmed:
+        intervals.setdefault(location_id, LocationIntervals()).add(
+            booking_id, start, end
+        )
+
+    accepted = []
+    for line, booking in batch:
+        location = intervals.setdefault(booking.location_id, LocationIntervals())
+        if location.overlaps(booking.start_time, booking.end_time):
+            on_error(line, str(BookingConflict()))
+            continue
+        if booking.confirmed:
+            location.add(booking.pk, booking.start_time, booking.end_time)
+        accepted.append((line, booking))
+    return accepted
+
+
+def save_rows(
+    model: Type[models.Model],
+    rows: List[Tuple[int, models.Model]],
+    on_error: ErrorHandler,
+) -> int:
+    """
+    Зберігає об'єкти по одному, кожен у власній точці збереження.
+
+    Використовується, коли пакет не вдалося зберегти цілком: помилка
+    одного рядка (наприклад, дубльований id) не відкидає решту пакета.
+
+    Args:
+        model (Type[models.Model]): Модель.
+        rows (List[Tuple[int, models.Model]]): Номери рядків та об'єкти.
+        on_error (ErrorHandler): Обробник помилок рядків.
+
+    Returns:
+        int: Кількість збережених об'єктів.
+    """
+    saved = []
+    with transaction.atomic():
+        for line, instance in rows:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([instance])
+            except DatabaseError as error:
+                on_error(line, f'не збережено: {error}')
+            else:
+                saved.append(instance)
+        refresh_locations(model, saved)
+    return len(saved)
+
+
+def save_batch(
+    model: Type[models.Model],
+    batch: List[Tuple[int, models.Model]],
+    on_error: ErrorHandler,
+) -> int:
+    """
+    Зберігає пакет об'єктів однією транзакцією.
+
+    Бронювання, що перетинаються з підтвердженими, відкидаються так само,
+    як під час бронювання на сайті. Якщо база даних відхиляє пакет, рядки
+    зберігаються по одному, і помилку отримує лише рядок, який її спричинив.
+
+    Args:
+        model (Type[models.Model]): Модель.
+        batch (List[Tuple[int, models.Model]]): Номери рядків та об'єкти.
+        on_error (ErrorHandler): Обробник помилок рядків.
+
+    Returns:
+        int: Кількість збережених об'єктів.
+    """
+    missing = missing_relations(model, [instance for _, instance in batch])
+    valid = []
+    for line, instance in batch:
+        broken = [
+            f'{name}: запис {getattr(instance, name)} не існує'
+            for name, values in missing.items()
+            if getattr(instance, name) in values
+        ]
+        if broken:
+            on_error(line, '; '.join(broken))
+        else:
+            valid.append((line, instance))
+    if not valid:
+        return 0
+
+    with use_primary(), transaction.atomic():
+        if model is Booking:
+            valid = reject_conflicts(valid, on_error)
+            if not valid:
+                return 0
+
+        instances = [instance for _, instance in valid]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(instances)
+                refresh_locations(model, instances)
+        except DatabaseError:
+            return save_rows(model, valid, on_error)
+        return len(instances)
+
+
+def import_rows(
+    kind: str,
+    rows: Iterable[Tuple[int, Dict[str, Any]]],
+    on_error: ErrorHandler,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Імпортує записи пакетами, кожен пакет в окремій транзакції.
+
+    Рядки з помилками пропускаються й передаються в `on_error`, решта
+    зберігається. Після імпорту індекс зайнятості позначається застарілим.
+
+    Args:
+        kind (str): Тип даних (`locations` або `bookings`).
+        rows (Iterable[Tuple[int, Dict[str, Any]]]): Номери рядків і записи.
+        on_error (ErrorHandler): Обробник помилок рядків.
+        batch_size (int): Кількість записів у пакеті.
+
+    Returns:
+        int: Кількість збережених записів.
+    """
+    model, names = TRANSFER_FIELDS[kind]
+    rows = iter(rows)
+    created = 0
+
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        batch = []
+        for line, row in chunk:
+            try:
+                batch.append((line, build_instance(model, names, row)))
+            except ValidationError as error:
+                on_error(line, ' '.join(error.messages))
+        if batch:
+            created += save_batch(model, batch, on_error)
+
+    if model is Booking and created:
+        availability.invalidate()
+    if model is Location and created:
+        invalidate_facets()
+    return created
+
+
+def export_rows(
+    kind: str, stream: IO[str], data_format: str, chunk_size: int = 2000
+) -> int:
+    """
+    Записує всі записи в потік, читаючи базу даних частинами.
+
+    Args:
+        kind (str): Тип даних (`locations` або `bookings`).
+        stream (IO[str]): Текстовий потік.
+        data_format (str): Формат даних (`csv` або `jsonl`).
+        chunk_size (int): Кількість записів, які читаються за раз.
+
+    Returns:
+        int: Кількість експортованих записів.
+    """
+    model, names = TRANSFER_FIELDS[kind]
+    values = model.objects.order_by('pk').values_list(*names)
+    writer = csv.writer(stream) if data_format == 'csv' else None
+    if writer:
+        writer.writerow(names)
+
+    exported = 0
+    for values_row in values.iterator(chunk_size=chunk_size):
+        row = serialize_row(values_row)
+        if writer:
+            writer.writerow(row)
+        else:
+            record = dict(zip(names, row, strict=True))
+            stream.write(json.dumps(record, default=str) + '\n')
+        exported += 1
+    return exported
+
+
+def serialize_row(values_row: Iterable[Any]) -> List[Any]:
+    """
+    Перетворює значення полів на придатні для CSV та JSON.
+
+    Args:
+        values_row (Iterable[Any]): Значення полів запису.
+
+    Returns:
+        List[Any]: Значення з датами у форматі ISO 8601.
+    """
+    return [
+        value.isoformat() if hasattr(value, 'isoformat') else value
+        for value in values_row
+    ]
@@ -6,7 +6,14 @@ app_name = 'booking'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('locations/more/', views.load_more_locations, name='load_more_locations'),
+    path('locations/flexible/', views.flexible_locations, name='flexible_locations'),
     path('location/<int:pk>/', views.location_detail, name='location_detail'),
+    path(
+        'location/<int:pk>/availability',
+        views.location_availability,
+        name='location_availability',
+    ),
     path('location/<int:pk>/book', views.create_booking, name='create_booking'),
     path('activate/<uuid:code>/', views.activate_booking, name='activation'),
     path('like/<int:location_id>/', views.like_location, name='like_location'),
@@ -17,4 +24,5 @@ urlpatterns = [
         name='favourite_location',
     ),
     path('review/<int:review_id>/delete/', views.delete_review, name='delete_review'),
+    path('images/<str:digest>/<str:name>', views.image_variant, name='image_variant'),
 ]
@@ -1,86 +1,390 @@
-from datetime import datetime
+import asyncio
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
-from django.db.models import F
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, redirect, render
-from django.utils.timezone import make_aware, now
-
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+)
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.functional import SimpleLazyObject
+from django.utils.timezone import localdate, localtime, make_aware, now
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from .async_helpers import aread, arender, arequest_user
+from .availability import (
+    CALENDAR_MAX_DAYS,
+    availability,
+    daily_status,
+    free_windows,
+)
+from .facets import facet_counts, filter_by_facets, selected_facets
+from .favourites import (
+    favourite_ids,
+    favourite_locations,
+    mark_favourites,
+)
 from .forms import BookingForm, ReviewForm
+from .images import (
+    DIGEST_PATTERN,
+    IMAGE_CACHE_MAX_AGE,
+    IMAGE_FORMATS,
+    VARIANT_PATTERN,
+    variant_path,
+)
 from .models import Booking, Favourite, Location, Reaction, Review
-
-
-def index(request: HttpRequest) -> HttpResponse:
+from .outbox import enqueue_email
+from .pagination import InvalidCursor, keyset_paginate
+from .reservations import (
+    HoldExpired,
+    ReservationError,
+    confirm_booking,
+    reserve_booking,
+)
+from .routers import use_primary
+from .search import search_locations
+from .signals import reactions_counted
+from .sqlite import retry_on_lock
+
+# Поля сортування списку локацій, `id` гарантує однозначний порядок
+ORDERING_OPTIONS = {
+    'name': ['name', 'id'],
+    'price': ['price_per_night', 'id'],
+    'rating': ['-rating', 'id'],
+    'relevance': ['search_rank', 'id'],
+}
+LOCATIONS_PAGE_SIZE = 24
+REVIEWS_PAGE_SIZE = 20
+# Відгуки від найновіших; id розрізняє відгуки з однаковим часом
+REVIEWS_ORDERING = ['-created_at', '-id']
+# Скільки днів показує календар зайнятості без параметра `to`
+CALENDAR_DEFAULT_DAYS = 31
+# Кількість вільних проміжків на локацію в режимі гнучких дат
+FLEXIBLE_WINDOWS = 3
+FLEXIBLE_MAX_WINDOWS = 10
+FLEXIBLE_MAX_NIGHTS = 60
+
+
+def filter_locations(request: HttpRequest) -> Tuple[QuerySet, Dict[str, Any]]:
     """
-    Відображає головну сторінку зі списком локацій.
+    Фільтрує локації за параметрами запиту.
 
     Args:
         request (HttpRequest): Запит.
 
     Returns:
-        HttpResponse: Відповідь сервера зі списком локацій.
+        Tuple[QuerySet, Dict[str, Any]]: Локації та параметри фільтрування.
     """
-    locations = Location.objects.all()
+    locations = Location.objects.with_booking_status()
 
     # Параметри сортування та фільтрування
-    sort_by = request.GET.get('sort_by', 'name')
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
+    sort_by = request.GET.get('sort_by', 'relevance' if query else 'name')
+    if sort_by not in ORDERING_OPTIONS or (sort_by == 'relevance' and not query):
+        sort_by = 'name'
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
+    # У режимі гнучких дат зайняті локації не приховуються
+    flexible = bool(start_date and end_date and request.GET.get('flexible'))
 
-    # Сортування
-    ordering_options = {
-        'name': 'name',
-        'price': 'price_per_night',
-        'rating': '-rating',
-    }
-    if sort_by in ordering_options:
-        locations = locations.order_by(ordering_options[sort_by])
-
-    # Фільтрування за пошуковим запитом
+    # Повнотекстовий пошук за назвою, адресою та описом
     if query:
-        locations = locations.filter(name__icontains=query)
+        locations = search_locations(locations, query)
 
     # Фільтрування за датами
-    if start_date and end_date:
+    booked: FrozenSet[int] = frozenset()
+    if start_date and end_date and not flexible:
         start_dt = make_aware(datetime.strptime(start_date, '%Y-%m-%d'))
         end_dt = make_aware(datetime.strptime(end_date, '%Y-%m-%d'))
-        booked_location_ids = Booking.objects.filter(
-            confirmed=True, start_time__lt=end_dt, end_time__gt=start_dt
-        ).values_list('location_id', flat=True)
-        locations = locations.exclude(id__in=booked_location_ids)
-
-    # Улюблені локації
-    favourites = (
-        Location.objects.filter(favourites__user=request.user)
-        if request.user.is_authenticated
-        else None
+        booked = frozenset(availability.booked_location_ids(start_dt, end_dt))
+        locations = locations.exclude(id__in=booked)
+
+    # Кількості фасетів рахуються до фільтрування за ними і лише за потреби:
+    # індекс фасетів звужується до знайдених пошуком і вільних на дати локацій
+    facets = selected_facets(request)
+    locations = filter_by_facets(locations, facets)
+
+    return locations, {
+        'sort_by': sort_by,
+        'query': query,
+        'start_date': start_date,
+        'end_date': end_date,
+        'flexible': flexible,
+        'selected_facets': facets,
+        'facets': SimpleLazyObject(lambda: facet_counts(facets, query, booked)),
+    }
+
+
+def attach_free_windows(
+    locations: List[Location],
+    target: datetime,
+    length: timedelta,
+    count: int = FLEXIBLE_WINDOWS,
+) -> List[Location]:
+    """
+    Додає локаціям найближчі вільні проміжки в атрибут `free_windows`.
+
+    Args:
+        locations (List[Location]): Локації сторінки.
+        target (datetime): Бажаний початок перебування.
+        length (timedelta): Тривалість перебування.
+        count (int): Скільки проміжків знайти для кожної локації.
+
+    Returns:
+        List[Location]: Ті самі локації.
+    """
+    windows = free_windows(
+        [location.pk for location in locations], target, length, count
     )
+    for location in locations:
+        location.free_windows = windows[location.pk]
+    return locations
+
+
+def flexible_stay(filters: Dict[str, Any]) -> Tuple[datetime, timedelta]:
+    """
+    Визначає бажаний початок і тривалість перебування з фільтра за датами.
+
+    Args:
+        filters (Dict[str, Any]): Параметри фільтрування.
+
+    Returns:
+        Tuple[datetime, timedelta]: Початок і тривалість перебування.
+    """
+    start_dt = make_aware(datetime.strptime(filters['start_date'], '%Y-%m-%d'))
+    end_dt = make_aware(datetime.strptime(filters['end_date'], '%Y-%m-%d'))
+    return start_dt, max(end_dt - start_dt, timedelta(days=1))
+
+
+def next_page_url(
+    request: HttpRequest,
+    cursor: Optional[str],
+    url_name: str = 'booking:load_more_locations',
+) -> Optional[str]:
+    """
+    Формує посилання на наступну сторінку локацій.
+
+    Args:
+        request (HttpRequest): Запит.
+        cursor (Optional[str]): Курсор наступної сторінки.
+        url_name (str): Назва маршруту наступної сторінки.
+
+    Returns:
+        Optional[str]: Посилання або None, якщо сторінок більше немає.
+    """
+    if cursor is None:
+        return None
+
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return f'{reverse(url_name)}?{params.urlencode()}'
+
+
+def user_favourite_ids(request: HttpRequest) -> Optional[FrozenSet[int]]:
+    """
+    Повертає закешовані ідентифікатори улюблених локацій користувача.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        Optional[FrozenSet[int]]: Ідентифікатори або None для анонімного
+            користувача.
+    """
+    if not request.user.is_authenticated:
+        return None
+
+    return favourite_ids(request.user.pk)
 
-    booked_location_ids = Booking.objects.filter(
-        start_time__lte=now(), end_time__gte=now()
-    ).values_list('location_id', flat=True)
 
-    return render(
+async def auser_favourites(
+    request: HttpRequest,
+) -> Tuple[Optional[FrozenSet[int]], Optional[List[Location]]]:
+    """
+    Асинхронно завантажує улюблені локації користувача.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        Tuple[Optional[FrozenSet[int]], Optional[List[Location]]]:
+            Ідентифікатори та улюблені локації або None для анонімного
+            користувача.
+    """
+    user = await arequest_user(request)
+    if not user.is_authenticated:
+        return None, None
+
+    return await aread(favourite_locations)(user.pk)
+
+
+async def index(request: HttpRequest) -> HttpResponse:
+    """
+    Відображає головну сторінку з першою сторінкою локацій.
+
+    Сторінка локацій, улюблені та кількості фасетів не залежать одне від
+    одного, тому завантажуються одночасно.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        HttpResponse: Відповідь сервера зі списком локацій.
+    """
+    # Індекс зайнятості та пошук можуть звертатися до бази синхронно
+    locations, filters = await aread(filter_locations)(request)
+
+    def first_page() -> Tuple[List[Location], Optional[str]]:
+        page, cursor = keyset_paginate(
+            locations, ORDERING_OPTIONS[filters['sort_by']], None, LOCATIONS_PAGE_SIZE
+        )
+        if filters['flexible']:
+            attach_free_windows(page, *flexible_stay(filters))
+        return page, cursor
+
+    (page, cursor), (ids, favourites), facets = await asyncio.gather(
+        aread(first_page)(),
+        auser_favourites(request),
+        aread(list)(filters['facets']),
+    )
+    mark_favourites(page, ids)
+
+    return await arender(
         request,
         'index.html',
-        context={
-            'locations': locations,
-            'sort_by': sort_by,
-            'booked_location_ids': booked_location_ids,
-            'query': query,
-            'start_date': start_date,
-            'end_date': end_date,
+        {
+            **filters,
+            'locations': page,
+            'next_page_url': next_page_url(request, cursor),
             'favourites': favourites,
+            'facets': facets,
         },
     )
 
 
-def location_detail(request: HttpRequest, pk: int) -> HttpResponse:
+def load_more_locations(request: HttpRequest) -> HttpResponse:
+    """
+    Повертає наступну сторінку карток локацій у форматі JSON.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        HttpResponse: HTML карток та посилання на наступну сторінку.
+    """
+    locations, filters = filter_locations(request)
+    try:
+        locations, cursor = keyset_paginate(
+            locations,
+            ORDERING_OPTIONS[filters['sort_by']],
+            request.GET.get('cursor'),
+            LOCATIONS_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Некоректний курсор.')
+    if filters['flexible']:
+        attach_free_windows(locations, *flexible_stay(filters))
+    mark_favourites(locations, user_favourite_ids(request))
+
+    html = render_to_string(
+        '_location_cards.html',
+        {'locations': locations, 'flexible': filters['flexible']},
+        request=request,
+    )
+    return JsonResponse({'html': html, 'next_url': next_page_url(request, cursor)})
+
+
+def flexible_locations(request: HttpRequest) -> HttpResponse:
+    """
+    Повертає найближчі вільні проміжки локацій для гнучких дат у форматі JSON.
+
+    Параметри: `date` (бажаний день заїзду), `nights` (кількість ночей),
+    `count` (скільки проміжків на локацію) та фільтри списку локацій.
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Returns:
+        HttpResponse: Локації сторінки з вільними проміжками.
+    """
+    try:
+        target = make_aware(datetime.strptime(request.GET['date'], '%Y-%m-%d'))
+        nights = int(request.GET.get('nights', 1))
+        count = int(request.GET.get('count', FLEXIBLE_WINDOWS))
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest('Некоректні параметри пошуку.')
+    if not 1 <= nights <= FLEXIBLE_MAX_NIGHTS or not 1 <= count <= FLEXIBLE_MAX_WINDOWS:
+        return HttpResponseBadRequest('Некоректні параметри пошуку.')
+
+    locations, filters = filter_locations(request)
+    try:
+        locations, cursor = keyset_paginate(
+            locations,
+            ORDERING_OPTIONS[filters['sort_by']],
+            request.GET.get('cursor'),
+            LOCATIONS_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Некоректний курсор.')
+    attach_free_windows(locations, target, timedelta(days=nights), count)
+
+    return JsonResponse(
+        {
+            'locations': [
+                {
+                    'id': location.pk,
+                    'name': location.name,
+                    'windows': [
+                        {'start': start.isoformat(), 'end': end.isoformat()}
+                        for start, end in location.free_windows
+                    ],
+                }
+                for location in locations
+            ],
+            'next_url': next_page_url(request, cursor, 'booking:flexible_locations'),
+        }
+    )
+
+
+def reviews_page_url(request: HttpRequest, cursor: Optional[str]) -> Optional[str]:
     """
-    Відображає деталі локації та список відгуків.
+    Формує посилання на наступну сторінку відгуків локації.
+
+    Args:
+        request (HttpRequest): Запит.
+        cursor (Optional[str]): Курсор наступної сторінки.
+
+    Returns:
+        Optional[str]: Посилання або None, якщо відгуків більше немає.
+    """
+    if cursor is None:
+        return None
+
+    params = request.GET.copy()
+    params['reviews'] = cursor
+    return f'?{params.urlencode()}'
+
+
+async def location_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    Відображає деталі локації та сторінку відгуків.
+
+    Відгуки виводяться сторінками за курсором (параметр `reviews`), а
+    гістограма оцінок береться з лічильників локації. Сторінка відгуків,
+    відгук користувача та улюблені локації завантажуються одночасно.
 
     Args:
         request (HttpRequest): Запит.
@@ -89,46 +393,68 @@ def location_detail(request: HttpRequest, pk: int) -> HttpResponse:
     Returns:
         HttpResponse: Відповідь сервера з деталями локації.
     """
-    location = get_object_or_404(Location, pk=pk)
-    reviews = location.reviews.all()
-    user_review = (
-        Review.objects.filter(user=request.user, location=location).first()
-        if request.user.is_authenticated
-        else None
+    location, user = await asyncio.gather(
+        aget_object_or_404(Location.objects.with_booking_status(), pk=pk),
+        arequest_user(request),
     )
 
-    # Улюблені локації
-    favourites = (
-        Location.objects.filter(favourites__user=request.user)
-        if request.user.is_authenticated
-        else None
-    )
+    async def load_user_review() -> Optional[Review]:
+        if not user.is_authenticated:
+            return None
+        return await Review.objects.filter(user=user, location=location).afirst()
+
+    async def load_favourite_ids() -> Optional[FrozenSet[int]]:
+        if not user.is_authenticated:
+            return None
+        return await aread(favourite_ids)(user.pk)
+
+    try:
+        (reviews, cursor), user_review, ids = await asyncio.gather(
+            aread(keyset_paginate)(
+                location.reviews.select_related('user'),
+                REVIEWS_ORDERING,
+                request.GET.get('reviews'),
+                REVIEWS_PAGE_SIZE,
+            ),
+            load_user_review(),
+            load_favourite_ids(),
+        )
+    except InvalidCursor:
+        return HttpResponseBadRequest('Некоректний курсор.')
+    mark_favourites([location], ids)
 
     if request.method == 'POST' and not user_review:
         review_form = ReviewForm(request.POST)
         if review_form.is_valid():
             review = review_form.save(commit=False)
-            review.user = request.user
+            review.user = user
             review.location = location
-            review.save()
+            await review.asave()
             return redirect('booking:location_detail', pk=pk)
     else:
         review_form = ReviewForm()
 
-    return render(
+    return await arender(
         request,
         'location_detail.html',
-        context={
+        {
             'location': location,
             'reviews': reviews,
+            'next_reviews_url': reviews_page_url(request, cursor),
             'review_form': review_form,
             'user_review': user_review,
-            'favourites': favourites,
         },
     )
 
 
 def send_activation_email(request: HttpRequest, booking: Booking) -> None:
+    """
+    Ставить лист з посиланням для підтвердження бронювання в чергу.
+
+    Args:
+        request (HttpRequest): Запит.
+        booking (Booking): Бронювання.
+    """
     subject = f'Підтведіть бронювання: {booking.location.name}'
     base_url = f'{request.scheme}://{request.get_host()}'
     activation_link = f'{base_url}/activate/{booking.activation_code}/'
@@ -149,6 +475,7 @@ def send_activation_email(request: HttpRequest, booking: Booking) -> None:
                     <a href="{activation_link}" style="display: inline-block; padding: 12px 24px; background-color: #28a745; color: #ffffff; text-decoration: none; font-size: 16px; font-weight: bold; border-radius: 5px;">Підтвердити бронювання</a>
                 </p>
                 <p style="color: #555; line-height: 1.5;">Ваше бронювання з <strong>{booking.start_time.strftime('%d.%m.%Y')}</strong> по <strong>{booking.end_time.strftime('%d.%m.%Y')}</strong>.</p>
+                <p style="color: #555; line-height: 1.5;">Посилання дійсне до <strong>{localtime(booking.expires_at).strftime('%d.%m.%Y %H:%M')}</strong>.</p>
                 <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
                 <p style="font-size: 12px; color: #777; line-height: 1.5;">Якщо ви не здійснювали це бронювання - проігноруйте цей лист.</p>
             </div>
@@ -156,7 +483,7 @@ def send_activation_email(request: HttpRequest, booking: Booking) -> None:
     </html>
     """
 
-    send_mail(
+    enqueue_email(
         subject,
         '',
         settings.EMAIL_HOST_USER,
@@ -165,7 +492,104 @@ def send_activation_email(request: HttpRequest, booking: Booking) -> None:
     )
 
 
+def calendar_range(request: HttpRequest) -> Tuple[date, date]:
+    """
+    Визначає проміжок календаря з параметрів `from` та `to` (включно).
+
+    Args:
+        request (HttpRequest): Запит.
+
+    Raises:
+        ValueError: Якщо дати некоректні або проміжок довший за рік.
+
+    Returns:
+        Tuple[date, date]: Перший та останній день.
+    """
+    first_day = date.fromisoformat(request.GET.get('from') or localdate().isoformat())
+    last_day = (
+        date.fromisoformat(request.GET['to'])
+        if request.GET.get('to')
+        else first_day + timedelta(days=CALENDAR_DEFAULT_DAYS - 1)
+    )
+    if not 0 <= (last_day - first_day).days < CALENDAR_MAX_DAYS:
+        raise ValueError('Некоректний проміжок дат.')
+    return first_day, last_day
+
+
+def availability_etag(request: HttpRequest, pk: int) -> Optional[str]:
+    """
+    Формує ETag календаря з версії вмісту локації та проміжку дат.
+
+    Версія змінюється після кожного збереження чи видалення бронювання,
+    тому повторний запит без змін отримує 304 без читання бронювань.
+
+    Args:
+        request (HttpRequest): Запит.
+        pk (int): Ідентифікатор локації.
+
+    Returns:
+        Optional[str]: ETag або None, якщо локації немає чи дати некоректні.
+    """
+    try:
+        first_day, last_day = calendar_range(request)
+    except ValueError:
+        return None
+
+    version = (
+        Location.objects.filter(pk=pk).values_list('content_version', flat=True).first()
+    )
+    if version is None:
+        return None
+    return f'{pk}-{version}-{first_day}-{last_day}'
+
+
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=availability_etag)
+def location_availability(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    Повертає зайнятість локації по днях для календаря.
+
+    Args:
+        request (HttpRequest): Запит.
+        pk (int): Ідентифікатор локації.
+
+    Returns:
+        HttpResponse: JSON зі статусом кожного дня.
+    """
+    try:
+        first_day, last_day = calendar_range(request)
+    except ValueError:
+        return HttpResponseBadRequest('Некоректний проміжок дат.')
+
+    location = get_object_or_404(Location.objects.only('pk'), pk=pk)
+    start = make_aware(datetime.combine(first_day, time.min))
+    end = make_aware(datetime.combine(last_day + timedelta(days=1), time.min))
+    bookings = (
+        location.bookings.filter(confirmed=True, start_time__lt=end, end_time__gt=start)
+        .order_by('start_time')
+        .values_list('start_time', 'end_time')
+    )
+    booked = daily_status(bookings, first_day, last_day)
+
+    return JsonResponse(
+        {
+            'location': location.pk,
+            'from': first_day.isoformat(),
+            'to': last_day.isoformat(),
+            'days': [
+                {
+                    'date': (first_day + timedelta(days=offset)).isoformat(),
+                    'status': 'booked' if is_booked else 'free',
+                }
+                for offset, is_booked in enumerate(booked)
+            ],
+        }
+    )
+
+
 @login_required
+@use_primary()
 def activate_booking(request: HttpRequest, code: int) -> HttpResponse:
     """
     Активує бронювання за кодом активації.
@@ -178,13 +602,21 @@ def activate_booking(request: HttpRequest, code: int) -> HttpResponse:
         HttpResponse: Відповідь сервера.
     """
     booking = get_object_or_404(Booking, activation_code=code)
-    booking.confirmed = True
-    booking.save()
+    try:
+        confirm_booking(booking)
+    except ReservationError as error:
+        return render(
+            request,
+            'activation_page.html',
+            {'error': str(error)},
+            status=410 if isinstance(error, HoldExpired) else 409,
+        )
 
     return render(request, 'activation_page.html', {'booking': booking.id})
 
 
 @login_required
+@use_primary()
 def create_booking(request: HttpRequest, pk: int) -> HttpResponse:
     """
     Створює бронювання для локації.
@@ -205,18 +637,14 @@ def create_booking(request: HttpRequest, pk: int) -> HttpResponse:
         booking.location = location
         booking.confirmed = False
 
-        if Booking.objects.filter(
-            location=location,
-            confirmed=True,
-            start_time__lt=booking.end_time,
-            end_time__gt=booking.start_time,
-        ).exists():
-            form.add_error(
-                None, 'Цей час уже зайнятий. Будь ласка, оберіть інший період.'
+        try:
+            # Лист надсилає фоновий обробник (команда send_outbox)
+            reserve_booking(
+                booking, lambda booking: send_activation_email(request, booking)
             )
+        except ReservationError as error:
+            form.add_error(None, str(error))
         else:
-            send_activation_email(request, booking)
-            booking.save()
             return redirect('booking:index')
 
     return render(request, 'booking_form.html', {'form': form, 'location': location})
@@ -239,12 +667,45 @@ def delete_review(request: HttpRequest, review_id: int) -> HttpResponse:
     if review.user == request.user or request.user.is_staff:
         location_id = review.location.id
         review.delete()
-        review.location.update_rating()
         return redirect('booking:location_detail', pk=location_id)
 
     return HttpResponse(status=403)
 
 
+def toggle_reaction(user: User, location: Location, reaction_type: str) -> None:
+    """
+    Ставить або знімає реакцію користувача та оновлює лічильники локації.
+
+    Нова реакція збільшує лічильник сигналом створення. Зняття реакції
+    зменшує лічильник на кількість справді видалених рядків (сигнал
+    видалення тут вимкнено), тож якщо конкурентний запит уже зняв реакцію,
+    повторне зняття нічого не віднімає.
+
+    Args:
+        user (User): Користувач.
+        location (Location): Локація.
+        reaction_type (str): Тип реакції (`like` або `dislike`).
+    """
+    opposite = 'dislike' if reaction_type == 'like' else 'like'
+    with transaction.atomic(), reactions_counted():
+        reaction, created = Reaction.objects.get_or_create(
+            user=user, location=location, reaction_type=reaction_type
+        )
+        if created:  # Знімає протилежну реакцію, якщо вона вже є
+            removed_type = opposite
+            deleted, _ = Reaction.objects.filter(
+                user=user, location=location, reaction_type=opposite
+            ).delete()
+        else:  # Знімає реакцію, якщо вона вже є
+            removed_type = reaction_type
+            deleted, _ = Reaction.objects.filter(pk=reaction.pk).delete()
+
+        if deleted:
+            Location.objects.filter(pk=location.pk).adjust_reactions(
+                **{f'{removed_type}_delta': -deleted}
+            )
+
+
 @login_required
 def like_location(request: HttpRequest, location_id: int) -> HttpResponse:
     """
@@ -258,20 +719,8 @@ def like_location(request: HttpRequest, location_id: int) -> HttpResponse:
         HttpResponse: Відповідь сервера.
     """
     location = get_object_or_404(Location, pk=location_id)
-    like, created = Reaction.objects.get_or_create(
-        user=request.user, location=location, reaction_type='like'
-    )
-
-    if not created:  # Видаляє лайк, якщо він вже існує
-        like.delete()
-    else:  # Видаляє дизлайк, якщо він вже існує
-        Reaction.objects.filter(
-            user=request.user, location=location, reaction_type='dislike'
-        ).delete()
-
-    # Оновлює кількість лайків та дизлайків
-    location.update_like_count()
-    location.update_dislike_count()
+    # Транзакція повторюється, якщо базу даних тримає інший запис
+    retry_on_lock(lambda: toggle_reaction(request.user, location, 'like'))
 
     return redirect('booking:location_detail', pk=location_id)
 
@@ -289,20 +738,8 @@ def dislike_location(request: HttpRequest, location_id: int) -> HttpResponse:
         HttpResponse: Відповідь сервера.
     """
     location = get_object_or_404(Location, pk=location_id)
-    dislike, created = Reaction.objects.get_or_create(
-        user=request.user, location=location, reaction_type='dislike'
-    )
-
-    if not created:  # Видаляє дизлайк, якщо він вже існує
-        dislike.delete()
-    else:  # Видаляє лайк, якщо він вже існує
-        Reaction.objects.filter(
-            user=request.user, location=location, reaction_type='like'
-        ).delete()
-
-    # Оновлює кількість лайків та дизлайків
-    location.update_like_count()
-    location.update_dislike_count()
+    # Транзакція повторюється, якщо базу даних тримає інший запис
+    retry_on_lock(lambda: toggle_reaction(request.user, location, 'dislike'))
 
     return redirect('booking:location_detail', pk=location_id)
 
@@ -320,11 +757,54 @@ def favourite_location(request: HttpRequest, location_id: int) -> HttpResponse:
         HttpResponse: Відповідь сервера.
     """
     location = get_object_or_404(Location, pk=location_id)
-    favourite, created = Favourite.objects.get_or_create(
-        user=request.user, location=location
-    )
 
-    if not created:
-        favourite.delete()
+    def toggle() -> None:
+        with transaction.atomic():
+            favourite, created = Favourite.objects.get_or_create(
+                user=request.user, location=location
+            )
+            if not created:
+                favourite.delete()
+
+    retry_on_lock(toggle)
 
     return redirect('booking:location_detail', pk=location_id)
+
+
+@require_GET
+def image_variant(request: HttpRequest, digest: str, name: str) -> HttpResponse:
+    """
+    Віддає згенерований варіант зображення.
+
+    Вміст файлу визначається хешем у URL і ніколи не змінюється, тому
+    відповідь кешується браузером на рік без повторних перевірок. У
+    продакшні цей каталог краще віддавати вебсервером напряму.
+
+    Args:
+        request (HttpRequest): Запит.
+        digest (str): Хеш оригіналу.
+        name (str): Назва варіанта (`<ширина>.<webp|jpg>`).
+
+    Raises:
+        Http404: Якщо варіанта не існує.
+
+    Returns:
+        HttpResponse: Файл зображення.
+    """
+    variant = VARIANT_PATTERN.match(name)
+    if not DIGEST_PATTERN.match(digest) or not variant:
+        raise Http404('Зображення не знайдено.')
+
+    extension = variant['extension']
+    path = variant_path(digest, int(variant['width']), extension)
+    try:
+        response = FileResponse(
+            path.open('rb'), content_type=IMAGE_FORMATS[extension][1]
+        )
+    except FileNotFoundError:
+        raise Http404('Зображення не знайдено.') from None
+
+    patch_cache_control(
+        response, public=True, max_age=IMAGE_CACHE_MAX_AGE, immutable=True
+    )
+    return response
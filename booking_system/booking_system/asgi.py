@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'booking_system.settings')
 
 application = get_asgi_application()
+
+# The hold sweeper runs in web server processes only, not in every manage.py
+# command (BOOKING_HOLD_SWEEP_INTERVAL=0 disables it)
+from booking.holds import start_sweeper  # noqa: E402
+
+start_sweeper()
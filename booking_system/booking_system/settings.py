@@ -32,6 +32,43 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
+# Email outbox (python manage.py send_outbox --loop)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+
+# Unconfirmed bookings expire after this many seconds (python manage.py sweep_holds)
+BOOKING_HOLD_TTL = 30 * 60
+# Sweep expired bookings in a background thread of each web server process
+# (wsgi.py/asgi.py) every N seconds (0 disables)
+BOOKING_HOLD_SWEEP_INTERVAL = int(os.getenv('BOOKING_HOLD_SWEEP_INTERVAL', 0))
+
+# Shared cache. The availability index, advertisement pool, favourite IDs and
+# fragment cache statistics keep version keys and counters here, so every
+# worker process must see the same cache. LocMemCache is per-process and only
+# suits a single process (runserver, tests); `manage.py check --deploy` fails
+# without REDIS_URL.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Advertisement pool cache lifetime (seconds)
+ADVERTISEMENT_CACHE_TTL = 60
+
+# Location card/detail fragments are keyed by Location.content_version (seconds)
+FRAGMENT_CACHE_TIMEOUT = 24 * 60 * 60
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -62,6 +99,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'booking.static_assets.StaticAssetsMiddleware',
+    'booking.query_budget.QueryBudgetMiddleware',
+    'booking.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,6 +110,20 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Ліміти запитів до бази даних для маршрутів, перевищення журналюються
+QUERY_BUDGETS = {
+    'booking:index': 8,
+    'booking:load_more_locations': 8,
+    'booking:flexible_locations': 6,
+    'booking:location_detail': 10,
+    'booking:location_availability': 4,
+    'booking:create_booking': 14,
+    'accounts:profile': 8,
+}
+QUERY_BUDGET_DEFAULT = 20
+# Облік кожного запиту коштує часу, тому типово працює лише в розробці
+QUERY_BUDGET_ENABLED = DEBUG
+
 ROOT_URLCONF = 'booking_system.urls'
 
 TEMPLATES = [
@@ -102,6 +156,54 @@ DATABASES = {
     }
 }
 
+# Репліки лише для читання: шляхи до файлів SQLite через os.pathsep,
+# наприклад BOOKING_REPLICAS=replica.sqlite3 (оновлюються sync_replicas)
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv('BOOKING_REPLICAS', '').split(os.pathsep)), start=1
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / path,
+        # У тестах репліка використовує тестову основну базу
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+# Профіль SQLite для конкурентних записів: BOOKING_SQLITE_PROFILE=production
+SQLITE_PROFILE = os.getenv('BOOKING_SQLITE_PROFILE', 'default')
+SQLITE_PRODUCTION_PRAGMAS = [
+    # Читачі не блокують записувача, а записувач - читачів
+    'PRAGMA journal_mode=WAL',
+    # У режимі WAL fsync потрібен лише під час контрольної точки
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',  # 256 МБ
+    'PRAGMA cache_size=-65536',  # 64 МБ
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=5000',
+]
+if SQLITE_PROFILE == 'production':
+    for database in DATABASES.values():
+        database['OPTIONS'] = {
+            # BEGIN IMMEDIATE бере блокування запису на початку транзакції, тому
+            # конкурентні записувачі чекають у busy_timeout, а не отримують
+            # "database is locked" під час спроби підвищити блокування
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': ';'.join(SQLITE_PRODUCTION_PRAGMAS),
+        }
+
+# Асинхронні представлення виконують незалежні читання паралельно в потоках
+# пулу, кожне зі своїм з'єднанням. Без WAL запис у SQLite блокує таких
+# читачів, тому типово це ввімкнено лише для профілю production
+ASYNC_PARALLEL_READS = (
+    os.getenv(
+        'BOOKING_ASYNC_PARALLEL_READS', '1' if SQLITE_PROFILE == 'production' else '0'
+    )
+    == '1'
+)
+
+DATABASE_ROUTERS = ['booking.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -139,6 +241,23 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# collectstatic writes content-hashed copies plus .gz/.br siblings;
+# StaticAssetsMiddleware serves them with immutable Cache-Control
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'booking.static_assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Resized location and advertisement photos (python manage.py build_images)
+IMAGE_CACHE_ROOT = BASE_DIR / 'media' / 'images'
+IMAGE_CACHE_URL = '/images/'
+IMAGE_WIDTHS = [320, 640, 1280]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -0,0 +1,27 @@
+var availabilityCalendar = document.getElementById("availabilityCalendar");
+
+function renderAvailability(data) {
+    availabilityCalendar.innerHTML = "";
+
+    data.days.forEach(function (day) {
+        var cell = document.createElement("span");
+        cell.className = "badge m-1 " + (day.status === "booked" ? "bg-danger" : "bg-success");
+        cell.title = day.status === "booked" ? "Зайнято" : "Вільно";
+        cell.textContent = day.date.slice(5);
+        availabilityCalendar.appendChild(cell);
+    });
+}
+
+function loadAvailability() {
+    // Браузер сам надсилає If-None-Match і отримує 304, якщо нічого не змінилося
+    fetch(availabilityCalendar.dataset.url, { cache: "no-cache" })
+        .then(function (response) {
+            return response.json();
+        })
+        .then(renderAvailability);
+}
+
+if (availabilityCalendar) {
+    loadAvailability();
+    setInterval(loadAvailability, 60000);
+}
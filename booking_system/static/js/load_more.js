@@ -0,0 +1,25 @@
+var loadMoreButton = document.getElementById("loadMoreButton");
+
+if (loadMoreButton) {
+    loadMoreButton.addEventListener("click", function () {
+        loadMoreButton.disabled = true;
+
+        fetch(loadMoreButton.dataset.nextUrl)
+            .then(function (response) {
+                return response.json();
+            })
+            .then(function (data) {
+                document.getElementById("locations").insertAdjacentHTML("beforeend", data.html);
+
+                if (data.next_url) {
+                    loadMoreButton.dataset.nextUrl = data.next_url;
+                    loadMoreButton.disabled = false;
+                } else {
+                    loadMoreButton.parentElement.remove();
+                }
+            })
+            .catch(function () {
+                loadMoreButton.disabled = false;
+            });
+    });
+}